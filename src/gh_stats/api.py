@@ -1,22 +1,294 @@
 import json
+import os
+import re
 import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import quote
 
-from .noise import is_noise_path
+from .noise import make_path_filter
+from .diffstat import diffstat_from_commit, summarize, unlisted_lines
+from .hedge import Hedger
+from .ratelimit import AdaptiveLimiter, RateBudget
+from .singleflight import SingleFlight
+from .tokens import TokenPool
+
+# Optional on-disk diffstat store (see diffstat.DiffstatStore); None disables persistence
+_diffstat_store = None
+
+def set_diffstat_store(store):
+    """Configure the store used to persist per-file commit diffstats."""
+    global _diffstat_store
+    _diffstat_store = store
+
+# Concurrent API requests: --jobs to start with, adapted up to --max-jobs (AIMD) when set
+DEFAULT_JOBS = 4
+_jobs = DEFAULT_JOBS
+_limiter = AdaptiveLimiter(DEFAULT_JOBS, DEFAULT_JOBS)
+
+def set_jobs(jobs, max_jobs=None):
+    """
+    Configure concurrent API requests: start at `jobs` and adapt up to `max_jobs`
+    (never below `jobs`; None pins the limit). Worker pools are sized for the
+    maximum, and the limiter decides how many of their requests are in flight.
+    """
+    global _jobs, _limiter
+    jobs = max(1, jobs)
+    maximum = max(jobs, max_jobs or jobs)
+    _jobs = maximum
+    _limiter = AdaptiveLimiter(jobs, maximum)
+
+def get_jobs():
+    return _jobs
+
+def get_limiter():
+    return _limiter
+
+# Memoized gh output kept per run, in characters; least recently used output is dropped first
+MEMO_CAPACITY = 64 * 1024 * 1024
+
+# Identical gh calls of a run share one request (see singleflight.SingleFlight)
+_requests = SingleFlight(MEMO_CAPACITY, sizeof=len)
+
+_COMMIT_DETAIL = r'repos/[^/]+/[^/]+/commits/[0-9a-f]{7,40}(?:\?|$)'
+# Not memoized: volatile (rate limits), bulky and already cached compactly (commit details),
+# or bulky and read once per run (commit listing, compare and search pages)
+_UNMEMOIZED = re.compile(rf'^(?:rate_limit$|{_COMMIT_DETAIL}|repos/[^/]+/[^/]+/(?:commits\?|compare/)|search/commits\?)')
+
+# Slow commit detail requests get a duplicate with --hedge (see hedge.Hedger)
+_hedger = None
+
+def set_hedging(budget):
+    """Hedge commit detail requests, with duplicates for at most `budget` percent of them (0: off)."""
+    global _hedger
+    _hedger = Hedger(budget) if budget else None
+
+def get_hedger():
+    return _hedger
+
+# Throttled requests (secondary rate limits) are retried after waiting, this many times
+MAX_THROTTLE_RETRIES = 3
+# Wait for a secondary rate limit response without Retry-After (GitHub asks for a minute)
+DEFAULT_RETRY_AFTER = 60
+
+def _split_response(output):
+    """(status, headers, body) of `gh api -i` output; status is None without a response head."""
+    if not output.startswith('HTTP/'):
+        return None, {}, output
+    head, _, body = output.replace('\r\n', '\n').partition('\n\n')
+    lines = head.split('\n')
+    status_parts = lines[0].split()
+    status = int(status_parts[1]) if len(status_parts) > 1 and status_parts[1].isdigit() else None
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return status, headers, body
+
+def _retry_after(status, headers, body):
+    """Seconds to wait if a response is a throttle (429, 403 secondary rate limit), else None."""
+    if status == 429 or (status == 403 and ('retry-after' in headers or 'secondary rate limit' in body.lower())):
+        try:
+            return float(headers['retry-after'])
+        except (KeyError, ValueError):
+            return DEFAULT_RETRY_AFTER
+    return None
+
+# Several tokens (GH_STATS_TOKENS, --token-file) share the load; None: gh's own auth
+_tokens = None
+
+def set_tokens(tokens):
+    """Route requests over a pool of tokens (see tokens.TokenPool); an empty list uses gh's auth."""
+    global _tokens
+    _tokens = TokenPool(tokens) if tokens else None
+
+def get_token_pool():
+    return _tokens
+
+# gh api options followed by a value
+_VALUE_OPTIONS = ('-H', '--header', '-f', '--raw-field', '-F', '--field', '-X', '--method', '-q', '--jq')
+
+def _endpoint(cmd):
+    """Endpoint of a `gh api` call ('' for other gh commands)."""
+    if cmd[:1] != ['api']:
+        return ''
+    rest = iter(cmd[1:])
+    for arg in rest:
+        if arg in _VALUE_OPTIONS:
+            next(rest, None)
+        elif not arg.startswith('-'):
+            return arg
+    return ''
+
+def _request_scope(cmd):
+    """(API resource, repo full name or None, is about the authenticated user) of a gh call."""
+    if cmd[:1] != ['api']:
+        return 'core', None, False
+    endpoint = _endpoint(cmd)
+    if endpoint == 'graphql':
+        return 'graphql', None, False
+    if endpoint.startswith('search/'):
+        return 'search', None, False
+    repo = re.match(r'repos/([^/?]+/[^/?]+)', endpoint)
+    return 'core', repo.group(1) if repo else None, bool(re.match(r'user(?:[/?]|$)', endpoint))
+
+def _repo_visible(token, repo):
+    """Whether a token can see a repo, by a `repos/{owner}/{repo}` request with it; None if unknown."""
+    status, _, _ = _split_response(_gh_request(['api', f'repos/{repo}'], pinned=token, keep_errors=True) or '')
+    return None if status is None else status not in (401, 403, 404)
+
+def _gh_request(args, pinned=None, on_start=None, keep_errors=False):
+    """
+    Run one gh call under the adaptive limiter, retrying throttled requests.
+    `gh api` calls get `-i` so the status and Retry-After are visible even on errors.
+    With a token pool, a request is retried with the next token, unless it is `pinned`
+    to one, when its token was refused (401, or a 403 other than a rate limit), ran
+    out of budget, or cannot see the repo. Private repos answer 404 to tokens without
+    access, also for everything inside them: a 404 inside a repo is only an answer
+    (a missing file, branch or commit) once the token is known to see the repo, by
+    an earlier success or a `repos/{owner}/{repo}` request. A token is kept off a
+    repo only once such a request confirms it has no access. `on_start` is called each time a request goes out, once the limiter let
+    it through. Returns the stdout, or None if the call failed (the stdout with
+    `keep_errors`).
+    """
+    cmd = ['api', '-i'] + args[1:] if args[:1] == ['api'] and '-i' not in args else args
+    resource, repo, identity = _request_scope(cmd)
+    repo_itself = bool(repo) and re.match(r'repos/[^/?]+/[^/?]+(?:\?|$)', _endpoint(cmd)) is not None
+    throttles = 0
+    tried = []
+    while True:
+        token = pinned or (_tokens.choose(resource, repo, tried, identity) if _tokens else None)
+        env = dict(os.environ, GH_TOKEN=token.value) if token else None
+        _limiter.acquire()
+        if on_start is not None:
+            on_start()
+        started = time.monotonic()
+        try:
+            result = subprocess.run(['gh'] + cmd, capture_output=True, encoding='utf-8', env=env)
+        except BaseException:
+            _limiter.release(time.monotonic() - started)
+            raise
+        status, headers, body = _split_response(result.stdout or '')
+        if token:
+            _tokens.update(token, headers)
+        retry_after = _retry_after(status, headers, body)
+        if retry_after is not None:
+            _limiter.throttle(retry_after)
+            throttles += 1
+            if throttles > MAX_THROTTLE_RETRIES:
+                return None
+            continue
+        _limiter.release(time.monotonic() - started, healthy=not (status and status >= 500))
+        if token and repo and status and 200 <= status < 300:
+            _tokens.grant(token, repo)
+        if token and not pinned and len(tried) + 1 < len(_tokens):
+            exhausted = status == 403 and headers.get('x-ratelimit-remaining') == '0'
+            if status == 404 and repo:
+                denied = refused = repo_itself or (not _tokens.granted(token, repo)
+                                                   and _repo_visible(token, repo) is False)
+            else:
+                refused = status == 401 or (status == 403 and not exhausted)
+                denied = refused and repo and _repo_visible(token, repo) is False
+            if exhausted or refused:
+                # Another token may have access (private repos, SSO) or budget left
+                if denied:
+                    _tokens.deny(token, repo)
+                tried.append(token)
+                continue
+        return result.stdout if result.returncode == 0 or keep_errors else None
+
+def _gh_output(args):
+    """Stdout of a gh call, or None if it failed. Coalesced and memoized per argument list."""
+    def call():
+        if _hedger is not None and any(re.match(_COMMIT_DETAIL, arg) for arg in args[1:]):
+            return _hedger.run(lambda started: _gh_request(args, on_start=started))
+        return _gh_request(args)
+    memoize = not any(_UNMEMOIZED.match(arg) for arg in args[1:])
+    return _requests.do(tuple(args), call, memoize=memoize)
+
+def get_request_stats():
+    """(gh calls made, calls answered by an in-flight or earlier identical call)."""
+    return _requests.calls, _requests.saved
 
 def run_gh_cmd(args, silent=False):
+    # Every caller parses its own copy, so shared results can't be mutated by another
+    output = _gh_output(args)
+    if output is None:
+        return None
     try:
-        result = subprocess.run(['gh'] + args, capture_output=True, encoding='utf-8', check=True)
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError:
+        return json.loads(_split_response(output)[2])
+    except json.JSONDecodeError:
         return None
+
+def run_gh_cmd_with_headers(args):
+    """
+    Like run_gh_cmd for `gh api` calls, but includes the response headers (`gh api -i`).
+    
+    Returns:
+        (headers, data): headers with lower-case names; data is None on error
+    """
+    output = _gh_output(['api', '-i'] + args[1:])
+    if output is None:
+        return {}, None
+    _, headers, body = _split_response(output)
+    try:
+        return headers, json.loads(body)
     except json.JSONDecodeError:
+        return headers, None
+
+def last_page_from_link(link_header):
+    """Page number of the rel="last" link in a Link header, or None."""
+    match = re.search(r'[?&]page=(\d+)[^>]*>;\s*rel="last"', link_header or '')
+    return int(match.group(1)) if match else None
+
+def count_listing(endpoint):
+    """
+    Count the items of a paginated list endpoint with a single request: with per_page=1,
+    the Link header's last page number is the item count. Returns None on error.
+    """
+    separator = '&' if '?' in endpoint else '?'
+    headers, data = run_gh_cmd_with_headers(['api', f'{endpoint}{separator}per_page=1'])
+    if data is None:
         return None
+    last_page = last_page_from_link(headers.get('link'))
+    return last_page if last_page is not None else len(data)
+
+def get_rate_limits():
+    """
+    Remaining requests per API: {'core': (remaining, limit, reset_epoch), 'search': ..., 'graphql': ...}.
+    With a token pool, remaining and limit are summed over the tokens (reset: the earliest).
+    """
+    if _tokens is None:
+        payloads = [run_gh_cmd(['api', 'rate_limit'], silent=True)]
+    else:
+        payloads = []
+        for token in _tokens.tokens:
+            output = _gh_request(['api', 'rate_limit'], pinned=token)
+            try:
+                payloads.append(json.loads(_split_response(output)[2]) if output else None)
+            except json.JSONDecodeError:
+                pass
+    limits = {}
+    for data in payloads:
+        resources = (data or {}).get('resources') or {}
+        for name, info in resources.items():
+            if name not in ('core', 'search', 'graphql'):
+                continue
+            remaining, limit, reset = limits.get(name, (0, 0, 0))
+            reset = min(reset, info.get('reset', 0)) if reset else info.get('reset', 0)
+            limits[name] = (remaining + info.get('remaining', 0), limit + info.get('limit', 0), reset)
+    return limits
 
 def get_current_user():
     data = run_gh_cmd(['api', 'user'])
     return data['login'] if data else None
 
-def get_user_repos(username, limit=None, is_self=True):
+def _stopped(should_stop):
+    """Whether a stop check (e.g. schedule.Deadline) says to skip the next page."""
+    return should_stop is not None and should_stop()
+
+def get_user_repos(username, limit=None, is_self=True, should_stop=None):
     """
     Fetch repositories for a user.
     
@@ -25,6 +297,7 @@ def get_user_repos(username, limit=None, is_self=True):
         limit: Max repos to fetch (None = unlimited)
         is_self: If True, query authenticated user (includes private repos).
                  If False, query other user (public repos only).
+        should_stop: Optional callable checked before each page; True ends the listing
     
     Returns:
         List of repository objects
@@ -41,7 +314,7 @@ def get_user_repos(username, limit=None, is_self=True):
         endpoint = f'users/{username}/repos'
         query_params = 'type=owner'
     
-    while True:
+    while not _stopped(should_stop):
         data = run_gh_cmd(['api', f'{endpoint}?per_page=100&page={page}&{query_params}&sort=pushed&direction=desc'], silent=True)
         if not data: break
         repos.extend(data)
@@ -51,10 +324,11 @@ def get_user_repos(username, limit=None, is_self=True):
         page += 1
     return repos
 
-def get_org_repos(org, limit=None):
+def get_org_repos(org, limit=None, should_stop=None):
+    """Fetch an org's repositories, most recently pushed first (see get_user_repos for the arguments)."""
     repos = []
     page = 1
-    while True:
+    while not _stopped(should_stop):
         data = run_gh_cmd(['api', f'orgs/{org}/repos?per_page=100&page={page}&sort=pushed&direction=desc'], silent=True)
         if not data: break
         repos.extend(data)
@@ -64,49 +338,229 @@ def get_org_repos(org, limit=None):
         page += 1
     return repos
 
+def get_repo_info(repo_full_name):
+    """Fetch repository metadata (fork, parent, default_branch, ...); memoized with the other requests."""
+    return run_gh_cmd(['api', f'repos/{repo_full_name}'], silent=True) or {}
+
+def get_org_members(org):
+    """Fetch the logins of all members of an organization."""
+    members = set()
+    page = 1
+    while True:
+        data = run_gh_cmd(['api', f'orgs/{org}/members?per_page=100&page={page}'], silent=True)
+        if not data: break
+        members.update(m['login'] for m in data if m.get('login'))
+        if len(data) < 100: break
+        page += 1
+    return members
+
 import datetime
 
-def get_user_active_branches(username):
+# The Events API returns at most 300 events (3 pages of 100) from the last 90 days
+EVENTS_MAX_PAGES = 3
+
+def get_user_events(username, max_pages=EVENTS_MAX_PAGES):
     """
-    Fetch recent PushEvents to find which branches were active.
-    Returns a dict: {repo_full_name: set(branch_names)}
+    Fetch the user's recent events, newest first.
+    
+    Returns:
+        (events, complete): `complete` is True when the feed was read to its end,
+        i.e. the events cover the whole Events API horizon
     """
-    active_branches = {}
+    events = []
     page = 1
-    # Check last 300 events or so (3 pages) to cover 'today' and 'week' activity adequately
-    max_pages = 3 
-    
     while page <= max_pages:
         data = run_gh_cmd(['api', f'users/{username}/events?per_page=100&page={page}'], silent=True)
-        if not data: break
+        if data is None:
+            return events, False
+        events.extend(data)
+        if len(data) < 100:
+            return events, True
+        page += 1
+    return events, False
+
+def active_branches_from_events(events):
+    """
+    Collect the branches PushEvents and branch CreateEvents touched.
+    Returns a dict: {repo_full_name: set(branch_names)}
+    """
+    active_branches = {}
+    for event in events:
+        repo_name = event['repo']['name']
+        
+        if event['type'] == 'PushEvent':
+            # payload.ref looks like 'refs/heads/main' or 'refs/heads/feature-x'
+            ref = event['payload'].get('ref', '')
+            if ref.startswith('refs/heads/'):
+                branch = ref.replace('refs/heads/', '')
+                if repo_name not in active_branches:
+                    active_branches[repo_name] = set()
+                active_branches[repo_name].add(branch)
         
-        for event in data:
-            repo_name = event['repo']['name']
-            
-            if event['type'] == 'PushEvent':
-                # payload.ref looks like 'refs/heads/main' or 'refs/heads/feature-x'
-                ref = event['payload'].get('ref', '')
-                if ref.startswith('refs/heads/'):
-                    branch = ref.replace('refs/heads/', '')
+        elif event['type'] == 'CreateEvent':
+            # extensive support for new branches
+            if event['payload'].get('ref_type') == 'branch':
+                branch = event['payload'].get('ref')
+                if branch:
                     if repo_name not in active_branches:
                         active_branches[repo_name] = set()
                     active_branches[repo_name].add(branch)
-            
-            elif event['type'] == 'CreateEvent':
-                # extensive support for new branches
-                if event['payload'].get('ref_type') == 'branch':
-                    branch = event['payload'].get('ref')
-                    if branch:
-                        if repo_name not in active_branches:
-                            active_branches[repo_name] = set()
-                        active_branches[repo_name].add(branch)
-        
-        if len(data) < 100: break
-        page += 1
-        
     return active_branches
 
-def get_repo_commits(repo_full_name, author, since_date, until_date, branches=None):
+def get_user_active_branches(username, events_archive=None):
+    """
+    Fetch recent PushEvents to find which branches were active.
+    Every fetched page is also appended to `events_archive` (see events.EventsArchive).
+    Returns a dict: {repo_full_name: set(branch_names)}
+    """
+    # Check last 300 events or so (3 pages) to cover 'today' and 'week' activity adequately
+    events, complete = get_user_events(username)
+    if events_archive is not None:
+        events_archive.add(username, events, complete)
+    return active_branches_from_events(events)
+
+# How --all-branches finds branches: the user's Events feed (last ~300 events, 90 days)
+# or one GraphQL query per batch of repos over every branch ref
+BRANCH_DISCOVERY_STRATEGIES = ("events", "graphql")
+# Repositories per GraphQL branch-discovery query, and branch refs per page
+GRAPHQL_REPO_BATCH = 10
+GRAPHQL_REFS_PER_PAGE = 100
+
+def run_graphql(query):
+    """Run a GraphQL query through `gh api graphql`; returns the `data` object or None."""
+    data = run_gh_cmd(['api', 'graphql', '-f', f'query={query}'], silent=True)
+    return data.get('data') if data else None
+
+def get_user_node_id(username):
+    data = run_gh_cmd(['api', f'users/{username}'], silent=True)
+    return data.get('node_id') if data else None
+
+def _branch_refs_query(alias, repo_full_name, since_iso, until_iso, author_id, after=None):
+    owner, name = repo_full_name.split('/', 1)
+    after_arg = f', after: {json.dumps(after)}' if after else ''
+    return (
+        f'{alias}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ '
+        f'refs(refPrefix: "refs/heads/", first: {GRAPHQL_REFS_PER_PAGE}, '
+        f'orderBy: {{field: TAG_COMMIT_DATE, direction: DESC}}{after_arg}) {{ '
+        f'pageInfo {{ hasNextPage endCursor }} '
+        f'nodes {{ name target {{ ... on Commit {{ committedDate '
+        f'history(first: 1, since: "{since_iso}", until: "{until_iso}", author: {{id: {json.dumps(author_id)}}}) '
+        f'{{ totalCount }} }} }} }} }} }}'
+    )
+
+def _active_refs(refs, since_iso):
+    """
+    Branch names from one page of refs whose tip is in range and that carry authored
+    commits in range, plus whether the next page may still hold such branches.
+    """
+    branches = set()
+    tip_in_range = False
+    for node in (refs or {}).get('nodes') or []:
+        target = node.get('target') or {}
+        tip_in_range = (target.get('committedDate') or '') >= since_iso
+        if tip_in_range and (target.get('history') or {}).get('totalCount'):
+            branches.add(node['name'])
+    page_info = (refs or {}).get('pageInfo') or {}
+    more = page_info.get('endCursor') if page_info.get('hasNextPage') and tip_in_range else None
+    return branches, more
+
+def get_repos_active_branches(repo_full_names, username, since_date, until_date):
+    """
+    Find branches with commits by a user in the date range, via GraphQL.
+    
+    Refs are ordered by tip commit date, so paging stops at the first page that reaches
+    a tip older than the range. A batch that fails (e.g. one inaccessible repo) is retried
+    repo by repo.
+    
+    Returns:
+        Dict {repo_full_name: set(branch_names)} for repos with active branches,
+        or None if the user cannot be resolved
+    """
+    author_id = get_user_node_id(username)
+    if not author_id:
+        return None
+    since_iso, until_iso = utc_iso_range(since_date, until_date)
+    repos = [r for r in repo_full_names if '/' in r]
+    active_branches = {}
+    
+    def query_repos(batch, cursors=None):
+        parts = [
+            _branch_refs_query(f'r{i}', repo, since_iso, until_iso, author_id, (cursors or {}).get(repo))
+            for i, repo in enumerate(batch)
+        ]
+        data = run_graphql('query { ' + ' '.join(parts) + ' }')
+        if data is None and len(batch) > 1:
+            for repo in batch:
+                query_repos([repo], cursors)
+            return
+        next_cursors = {}
+        for i, repo in enumerate(batch):
+            branches, cursor = _active_refs(((data or {}).get(f'r{i}') or {}).get('refs'), since_iso)
+            if branches:
+                active_branches.setdefault(repo, set()).update(branches)
+            if cursor:
+                next_cursors[repo] = cursor
+        if next_cursors:
+            query_repos(list(next_cursors), next_cursors)
+    
+    for start in range(0, len(repos), GRAPHQL_REPO_BATCH):
+        query_repos(repos[start:start + GRAPHQL_REPO_BATCH])
+    return active_branches
+
+# contributionsCollection spans at most one year and lists at most 100 repositories
+CONTRIBUTIONS_MAX_DAYS = 365
+CONTRIBUTIONS_MAX_REPOS = 100
+
+def get_contributed_repos(username, since_date, until_date, should_stop=None):
+    """
+    Repositories the user committed to in the range, from GraphQL contributionsCollection
+    (one query per year of range; `should_stop` is checked before each).
+    
+    Returns:
+        (repos, complete): `complete` is False when a query failed, hit the repository
+        cap, reported restricted (hidden private) contributions, or was stopped
+    """
+    repos = set()
+    complete = True
+    window_start = since_date
+    while window_start <= until_date:
+        if _stopped(should_stop):
+            return repos, False
+        window_end = min(until_date, window_start + datetime.timedelta(days=CONTRIBUTIONS_MAX_DAYS - 1))
+        since_iso, until_iso = utc_iso_range(window_start, window_end)
+        data = run_graphql(
+            f'query {{ user(login: {json.dumps(username)}) {{ contributionsCollection(from: "{since_iso}", to: "{until_iso}") {{ '
+            f'restrictedContributionsCount '
+            f'commitContributionsByRepository(maxRepositories: {CONTRIBUTIONS_MAX_REPOS}) {{ repository {{ nameWithOwner }} }} }} }} }}'
+        )
+        collection = ((data or {}).get('user') or {}).get('contributionsCollection')
+        if not collection:
+            complete = False
+        else:
+            by_repo = collection.get('commitContributionsByRepository') or []
+            repos.update(entry['repository']['nameWithOwner'] for entry in by_repo)
+            if len(by_repo) >= CONTRIBUTIONS_MAX_REPOS or collection.get('restrictedContributionsCount'):
+                complete = False
+        window_start = window_end + datetime.timedelta(days=1)
+    return repos, complete
+
+def get_search_commit_count(username, since_date, until_date):
+    """Total deep-search hits for the range (a single one-item search request), or None."""
+    since_iso, until_iso = utc_iso_range(since_date, until_date)
+    _search_budget.acquire()
+    data = run_gh_cmd([
+        'api',
+        '-H', 'Accept: application/vnd.github.cloak-preview+json',
+        f'search/commits?q=author:{username}+committer-date:{since_iso}..{until_iso}&per_page=1'
+    ], silent=True)
+    return data.get('total_count') if data else None
+
+# Branches further ahead of the default branch than this are listed with the dated
+# commits query instead of the compare API (which returns the whole unique history)
+MAX_COMPARE_COMMITS = 250
+
+def utc_iso_range(since_date, until_date):
+    """Local day range -> (since, until) as the UTC ISO 8601 strings the API expects."""
     # Determine local timezone offset
     local_tz = datetime.datetime.now().astimezone().tzinfo
     
@@ -119,96 +573,235 @@ def get_repo_commits(repo_full_name, author, since_date, until_date, branches=No
     until_utc = until_dt.astimezone(datetime.timezone.utc)
     
     # Format as API expects (ISO 8601 with Z)
-    since_iso = since_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
-    until_iso = until_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
-    
+    return since_utc.strftime('%Y-%m-%dT%H:%M:%SZ'), until_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def _list_commits(repo_full_name, query, ref=None, paths=None, should_stop=None):
+    """Paginate the commits API for one ref, once per path (results may repeat across paths)."""
     commits = []
-    seen_shas = set()
-    
-    # If no specific branches provided, default to None (which implies default branch)
-    # We always include None to ensure we check the default branch too, 
-    # unless specific branches are strictly required. 
-    # But usually 'branches' list passed here will be supplementary to default.
-    # actually, let's just make target_refs list.
-    
-    target_refs = set()
-    target_refs.add(None) # None means default branch
-    if branches:
-        target_refs.update(branches)
-        
-    for ref in target_refs:
+    for path in (paths or [None]):
         page = 1
-        while True:
+        while not _stopped(should_stop):
             cmd = [
                 'api', 
-                f'repos/{repo_full_name}/commits?author={author}&since={since_iso}&until={until_iso}&per_page=100&page={page}'
+                f'repos/{repo_full_name}/commits?{query}&per_page=100&page={page}'
             ]
             if ref:
                 cmd[-1] += f"&sha={ref}"
+            if path:
+                cmd[-1] += f"&path={quote(path)}"
                 
             data = run_gh_cmd(cmd, silent=True)
             if not data: break
-            
-            for commit in data:
-                sha = commit['sha']
-                if sha not in seen_shas:
-                    seen_shas.add(sha)
-                    commits.append(commit)
-            
+            commits.extend(data)
             if len(data) < 100: break
             page += 1
-            
     return commits
 
-def get_repo_all_commits(repo_full_name, since_date, until_date):
-    """Get all commits from a repo without filtering by author."""
-    local_tz = datetime.datetime.now().astimezone().tzinfo
+def _dedupe_commits(commit_lists):
+    commits = []
+    seen_shas = set()
+    for commit_list in commit_lists:
+        for commit in commit_list:
+            if commit['sha'] not in seen_shas:
+                seen_shas.add(commit['sha'])
+                commits.append(commit)
+    return commits
+
+def _list_branch_unique_commits(repo_full_name, base, branch, should_stop=None):
+    """
+    Commits on `branch` that are not on `base`, via the compare API.
+    Returns None when the comparison fails or the branch is too far ahead to be worth it.
+    """
+    if _stopped(should_stop):
+        return []
+    endpoint = f'repos/{repo_full_name}/compare/{quote(base)}...{quote(branch)}?per_page=100'
+    data = run_gh_cmd(['api', f'{endpoint}&page=1'], silent=True)
+    if not data:
+        return None
+    total = data.get('total_commits', data.get('ahead_by', 0))
+    if total > MAX_COMPARE_COMMITS:
+        return None
+    commits = list(data.get('commits') or [])
+    page = 2
+    while len(commits) < total and not _stopped(should_stop):
+        data = run_gh_cmd(['api', f'{endpoint}&page={page}'], silent=True)
+        if not data or not data.get('commits'): break
+        commits.extend(data['commits'])
+        page += 1
+    return commits
+
+def commit_matches_author(commit, author):
+    """Local equivalent of the commits API `author=` filter: the GitHub login or the author email."""
+    login = ((commit.get('author') or {}).get('login') or '').lower()
+    email = (commit.get('commit', {}).get('author', {}).get('email') or '').lower()
+    return author.lower() in (login, email)
+
+def _commit_matches(commit, author, since_iso, until_iso):
+    """Local equivalent of the commits API `author=`/`since=`/`until=` filters (author None: any)."""
+    commit_data = commit.get('commit', {})
+    if author and not commit_matches_author(commit, author):
+        return False
+    commit_date = (commit_data.get('committer') or {}).get('date') or commit_data.get('author', {}).get('date') or ''
+    return since_iso <= commit_date <= until_iso
+
+def get_repo_commits(repo_full_name, author, since_date, until_date, branches=None, paths=None, should_stop=None):
+    """
+    List commits by an author (None: by anyone) in a date range.
     
-    since_dt = datetime.datetime.combine(since_date, datetime.time.min, tzinfo=local_tz)
-    until_dt = datetime.datetime.combine(until_date, datetime.time.max, tzinfo=local_tz)
+    Args:
+        branches: Extra branches to list besides the default branch. Only the commits
+                  unique to each branch are fetched (compare API against the default
+                  branch), and the branches are listed concurrently (up to --jobs).
+        paths: Optional list of repo paths; passed as the API `path=` filter so GitHub
+               only returns commits touching them (one listing per path, deduped)
+        should_stop: Optional callable checked before each page; once it returns True
+                     the commits listed so far are returned
+    """
+    since_iso, until_iso = utc_iso_range(since_date, until_date)
+    query = f'since={since_iso}&until={until_iso}'
+    if author:
+        query = f'author={author}&{query}'
     
-    since_utc = since_dt.astimezone(datetime.timezone.utc)
-    until_utc = until_dt.astimezone(datetime.timezone.utc)
+    # None means default branch
+    default_branch = get_repo_info(repo_full_name).get('default_branch') if branches else None
+    target_refs = [None] + sorted(b for b in (branches or ()) if b != default_branch)
     
-    since_iso = since_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
-    until_iso = until_utc.strftime('%Y-%m-%dT%H:%M:%SZ')
+    def list_ref(ref):
+        # The compare API has no path filter; scoped listings walk the branch instead
+        if ref and default_branch and not paths:
+            unique = _list_branch_unique_commits(repo_full_name, default_branch, ref, should_stop)
+            if unique is not None:
+                return [c for c in unique if _commit_matches(c, author, since_iso, until_iso)]
+        return _list_commits(repo_full_name, query, ref, paths, should_stop)
     
-    commits = []
-    page = 1
-    while True:
-        cmd = [
-            'api', 
-            f'repos/{repo_full_name}/commits?since={since_iso}&until={until_iso}&per_page=100&page={page}'
-        ]
-        data = run_gh_cmd(cmd, silent=True)
-        if not data: break
-        commits.extend(data)
-        if len(data) < 100: break
+    if len(target_refs) == 1:
+        return _dedupe_commits([list_ref(None)])
+    with ThreadPoolExecutor(max_workers=_jobs) as executor:
+        return _dedupe_commits(executor.map(list_ref, target_refs))
+
+def get_repo_all_commits(repo_full_name, since_date, until_date, paths=None, branches=None, should_stop=None):
+    """
+    Get all commits from a repo without filtering by author.
+    
+    Args:
+        paths: Optional list of repo paths passed as the API `path=` filter (see get_repo_commits)
+        branches: Extra branches to list besides the default branch (see get_repo_commits)
+        should_stop: Optional callable checked before each page (see get_repo_commits)
+    """
+    return get_repo_commits(repo_full_name, None, since_date, until_date, branches, paths, should_stop)
+
+# The commit endpoint lists at most this many files per page (up to 3000 in total)
+COMMIT_FILES_PER_PAGE = 300
+# Page budget per commit; the remainder of larger commits is estimated by summarize()
+# and the commit is reported as approximate (see diffstat.is_approximate)
+MAX_COMMIT_FILE_PAGES = 4
+
+def _fetch_remaining_file_pages(repo_full_name, sha, diffstat, max_pages):
+    """
+    Fetch further file pages of a huge commit until its line totals are accounted for,
+    the list is complete or the page budget is spent. A page of filtered-out files
+    says nothing about the next one (vendored files may come before the real
+    changes), so filtering never ends the paging early. Also resumes cached records.
+    """
+    added, deleted, files = diffstat
+    files = list(files)
+    page = len(files) // COMMIT_FILES_PER_PAGE + 1
+    while page <= max_pages and any(unlisted_lines((added, deleted, files))):
+        if len(files) % COMMIT_FILES_PER_PAGE != 0:
+            break  # last page was short: the list is complete
+        data = run_gh_cmd(['api', f'repos/{repo_full_name}/commits/{sha}?page={page}'], silent=True)
+        if not data:
+            break
+        page_files = diffstat_from_commit(data)[2]
+        if not page_files:
+            break
+        files.extend(page_files)
         page += 1
-            
-    return commits
+    return added, deleted, files
+
+def get_commit_diffstat(repo_full_name, sha, path_filter=None, max_pages=MAX_COMMIT_FILE_PAGES):
+    """
+    Get the compact per-file diffstat of a commit.
+    Served from the diffstat store when available, otherwise fetched and persisted.
+    
+    Args:
+        path_filter: Filter that will be applied to the files. Without one the commit
+                     totals are authoritative and only the first file page is fetched;
+                     with one, further pages of a truncated file list are fetched lazily.
+        max_pages: Page budget for the file list of a single commit
+    
+    Returns:
+        (added, deleted, [(path, added, deleted), ...]) or None if the fetch failed
+    """
+    diffstat = None
+    if _diffstat_store is not None:
+        diffstat = _diffstat_store.get(repo_full_name, sha)
+    if diffstat is None:
+        data = run_gh_cmd(['api', f'repos/{repo_full_name}/commits/{sha}'], silent=True)
+        if not data:
+            return None
+        diffstat = diffstat_from_commit(data)
+        if _diffstat_store is not None:
+            _diffstat_store.put(repo_full_name, sha, diffstat)
+    if path_filter is not None and any(unlisted_lines(diffstat)):
+        extended = _fetch_remaining_file_pages(repo_full_name, sha, diffstat, max_pages)
+        if len(extended[2]) > len(diffstat[2]):
+            diffstat = extended
+            if _diffstat_store is not None:
+                _diffstat_store.put(repo_full_name, sha, diffstat)
+    return diffstat
+
+def get_cached_diffstat(repo_full_name, sha):
+    """Diffstat from the local diffstat store only (None when not stored or the store is off)."""
+    if _diffstat_store is None:
+        return None
+    return _diffstat_store.get(repo_full_name, sha)
+
+def get_repo_gitattributes(repo_full_name):
+    """
+    Fetch the root .gitattributes of a repository (memoized with the other requests).
+    
+    Returns:
+        File content as text, or '' if the repo has none
+    """
+    import base64
+    content = ''
+    data = run_gh_cmd(['api', f'repos/{repo_full_name}/contents/.gitattributes'], silent=True)
+    if isinstance(data, dict) and data.get('encoding') == 'base64':
+        try:
+            content = base64.b64decode(data.get('content', '')).decode('utf-8', errors='replace')
+        except ValueError:
+            content = ''
+    return content
 
 def get_commit_stats(repo_full_name, sha, exclude_noise=False):
-    data = run_gh_cmd(['api', f'repos/{repo_full_name}/commits/{sha}'], silent=True)
-    if not data:
-        return 0, 0
-    if exclude_noise:
-        files = data.get('files') or []
-        if files:
-            added = 0
-            deleted = 0
-            for file_info in files:
-                filename = file_info.get('filename', '')
-                if filename and is_noise_path(filename):
-                    continue
-                added += file_info.get('additions', 0)
-                deleted += file_info.get('deletions', 0)
-            return added, deleted
-    if 'stats' in data:
-        return data['stats'].get('additions', 0), data['stats'].get('deletions', 0)
-    return 0, 0
+    path_filter = make_path_filter(exclude_noise)
+    diffstat = get_commit_diffstat(repo_full_name, sha, path_filter)
+    return summarize(diffstat, path_filter)
 
-def search_user_commits(username, since_date, until_date):
+# The Search API returns at most 1,000 results per query and allows 30 requests per minute
+SEARCH_RESULT_CAP = 1000
+SEARCH_REQUESTS_PER_MINUTE = 30
+# Windows shorter than this are not split further (their results may stay truncated)
+MIN_SEARCH_WINDOW = datetime.timedelta(minutes=1)
+
+# Shared by every search in the run
+_search_budget = RateBudget(SEARCH_REQUESTS_PER_MINUTE)
+
+def _split_window(window):
+    """Halve a (since_iso, until_iso) window, or return None if it is too short to split."""
+    since = datetime.datetime.strptime(window[0], '%Y-%m-%dT%H:%M:%SZ')
+    until = datetime.datetime.strptime(window[1], '%Y-%m-%dT%H:%M:%SZ')
+    if until - since < 2 * MIN_SEARCH_WINDOW:
+        return None
+    mid = since + (until - since) / 2
+    mid = mid.replace(microsecond=0)
+    return [
+        (window[0], mid.strftime('%Y-%m-%dT%H:%M:%SZ')),
+        ((mid + datetime.timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%SZ'), window[1]),
+    ]
+
+def search_user_commits(username, since_date, until_date, budget=None, hits=None, should_stop=None):
     """
     Use GitHub Search API to find repositories where user has commits.
     This can discover contributions beyond the 90-day Events API limit.
@@ -217,57 +810,81 @@ def search_user_commits(username, since_date, until_date):
         username: GitHub username
         since_date: Start date (date object)
         until_date: End date (date object)
+        budget: ratelimit.RateBudget every search request waits on (defaults to the
+                run-wide 30 requests/minute budget)
+        hits: Optional dict filled with the commit items found, usable as commit lists:
+              {repo_full_name: {'commits': [...], 'complete': bool}}. `complete` is False
+              for repos seen in a window that stayed truncated or when a page failed.
+        should_stop: Optional callable checked before each request; once it returns True
+                     no more windows or pages are fetched (hits are then incomplete)
     
     Returns:
         Set of unique repository full_names (e.g., {'owner/repo1', 'owner/repo2'})
     
-    Note: Search API has stricter rate limits (30 requests/minute).
-          Maximum 1000 results can be returned.
+    Note: A query returns at most 1,000 results, so a committer-date window whose
+          total_count exceeds that is bisected until every sub-window fits. Windows
+          and their pages are fetched concurrently, as fast as the budget allows.
     """
-    import time
-    
+    budget = budget or _search_budget
     repos_found = set()
-    page = 1
-    max_pages = 10  # 100 results per page * 10 = 1000 max results
+    hit_shas = {}
+    incomplete = set()
+    failed = False
     
-    # Format dates for search query: YYYY-MM-DD
-    since_str = since_date.strftime('%Y-%m-%d')
-    until_str = until_date.strftime('%Y-%m-%d')
-    
-    # Search query: author:{username} committer-date:{since}..{until}
-    query = f'author:{username}+committer-date:{since_str}..{until_str}'
-    
-    while page <= max_pages:
+    def fetch(window, page):
+        # Search query: author:{username} committer-date:{since}..{until}
+        query = f'author:{username}+committer-date:{window[0]}..{window[1]}'
         # Search API requires special Accept header for commits
         cmd = [
             'api',
             '-H', 'Accept: application/vnd.github.cloak-preview+json',
             f'search/commits?q={query}&per_page=100&page={page}&sort=committer-date&order=desc'
         ]
-        
-        data = run_gh_cmd(cmd, silent=True)
-        
-        if not data:
-            break
-            
-        items = data.get('items', [])
-        if not items:
-            break
-            
-        for item in items:
-            repo = item.get('repository', {})
-            full_name = repo.get('full_name')
-            if full_name:
-                repos_found.add(full_name)
-        
-        # Check if we've fetched all results
-        total_count = data.get('total_count', 0)
-        if page * 100 >= total_count or page * 100 >= 1000:
-            break
-            
-        page += 1
-        # Small delay to be nice to rate limits
-        time.sleep(0.5)
+        if _stopped(should_stop):
+            return None
+        budget.acquire()
+        # The budget may have kept this request waiting
+        if _stopped(should_stop):
+            return None
+        return run_gh_cmd(cmd, silent=True)
+    
+    full_window = utc_iso_range(since_date, until_date)
+    with ThreadPoolExecutor(max_workers=_jobs) as executor:
+        pending = {executor.submit(fetch, full_window, 1): (full_window, 1)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                window, page = pending.pop(future)
+                data = future.result()
+                if not data:
+                    failed = True
+                    continue
+                
+                total_count = data.get('total_count', 0)
+                halves = _split_window(window) if page == 1 and total_count > SEARCH_RESULT_CAP else None
+                for item in data.get('items', []):
+                    full_name = item.get('repository', {}).get('full_name')
+                    if full_name:
+                        repos_found.add(full_name)
+                        if hits is not None and not halves:
+                            hit_shas.setdefault(full_name, {}).setdefault(item['sha'], item)
+                            if total_count > SEARCH_RESULT_CAP:
+                                incomplete.add(full_name)
+                
+                if page != 1:
+                    continue
+                if halves:
+                    for half in halves:
+                        pending[executor.submit(fetch, half, 1)] = (half, 1)
+                    continue
+                last_page = min(-(-total_count // 100), SEARCH_RESULT_CAP // 100)
+                for next_page in range(2, last_page + 1):
+                    pending[executor.submit(fetch, window, next_page)] = (window, next_page)
     
+    if hits is not None:
+        for full_name, commits_by_sha in hit_shas.items():
+            hits[full_name] = {
+                'commits': list(commits_by_sha.values()),
+                'complete': not failed and full_name not in incomplete,
+            }
     return repos_found
-
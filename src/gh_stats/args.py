@@ -14,6 +14,14 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 from enum import Enum
 
+from .api import BRANCH_DISCOVERY_STRATEGIES, DEFAULT_JOBS
+from .discovery import DISCOVERY_MODES
+from .filters import MERGE_POLICIES
+from .hedge import DEFAULT_HEDGE_BUDGET
+from .date_parser import parse_duration
+from .schedule import SCHEDULES
+from .shaindex import SHARED_COMMIT_POLICIES
+
 
 class ValueSource(Enum):
     """参数值来源"""
@@ -32,6 +40,8 @@ class Entity(Enum):
     E_ARENA = "E_ARENA"         # 竞技场/排名相关
     E_DISPLAY = "E_DISPLAY"     # 显示/输出相关
     E_SERVE = "E_SERVE"         # Web 服务器相关
+    E_CACHE = "E_CACHE"         # 本地缓存相关
+    E_EXECUTION = "E_EXECUTION" # 执行/并发相关
 
 
 @dataclass
@@ -79,6 +89,7 @@ class ParseResult:
 PARAM_ENTITY_MAP = {
     # E_USER
     "user": Entity.E_USER,
+    "users": Entity.E_USER,
     
     # E_DISCOVERY
     "personal": Entity.E_DISCOVERY,
@@ -86,6 +97,16 @@ PARAM_ENTITY_MAP = {
     "personal_limit": Entity.E_DISCOVERY,
     "org_limit": Entity.E_DISCOVERY,
     "all_branches": Entity.E_DISCOVERY,
+    "branch_discovery": Entity.E_DISCOVERY,
+    "commits_from_search": Entity.E_DISCOVERY,
+    "discovery": Entity.E_DISCOVERY,
+    "path": Entity.E_DISCOVERY,
+    "skip_archived": Entity.E_DISCOVERY,
+    "skip_forks": Entity.E_DISCOVERY,
+    "skip_templates": Entity.E_DISCOVERY,
+    "repo_topic": Entity.E_DISCOVERY,
+    "repo_language": Entity.E_DISCOVERY,
+    "repo_glob": Entity.E_DISCOVERY,
     
     # E_DATE
     "since": Entity.E_DATE,
@@ -99,6 +120,10 @@ PARAM_ENTITY_MAP = {
     
     # E_ORG_SUMMARY
     "org_summary": Entity.E_ORG_SUMMARY,
+    "include_authors": Entity.E_ORG_SUMMARY,
+    "exclude_authors": Entity.E_ORG_SUMMARY,
+    "exclude_bots": Entity.E_ORG_SUMMARY,
+    "org_members_only": Entity.E_ORG_SUMMARY,
     
     # E_ARENA
     "arena": Entity.E_ARENA,
@@ -108,6 +133,9 @@ PARAM_ENTITY_MAP = {
     "highlights": Entity.E_DISPLAY,
     "dry_run": Entity.E_DISPLAY,
     "exclude_noise": Entity.E_DISPLAY,
+    "noise_rule": Entity.E_DISPLAY,
+    "merges": Entity.E_DISPLAY,
+    "shared_commits": Entity.E_DISPLAY,
     "dev": Entity.E_DISPLAY,
     
     # E_SERVE
@@ -116,11 +144,25 @@ PARAM_ENTITY_MAP = {
     "no_open": Entity.E_SERVE,
     "serve_output": Entity.E_SERVE,
     "serve_input": Entity.E_SERVE,
+    
+    # E_CACHE
+    "cache_dir": Entity.E_CACHE,
+    "no_cache": Entity.E_CACHE,
+    "collect_events": Entity.E_CACHE,
+    
+    # E_EXECUTION
+    "jobs": Entity.E_EXECUTION,
+    "max_jobs": Entity.E_EXECUTION,
+    "hedge": Entity.E_EXECUTION,
+    "token_file": Entity.E_EXECUTION,
+    "schedule": Entity.E_EXECUTION,
+    "deadline": Entity.E_EXECUTION,
 }
 
 # 参数默认值表
 PARAM_DEFAULTS = {
     "user": None,
+    "users": None,
     "personal": True,
     "orgs": "",
     "since": None,
@@ -129,31 +171,82 @@ PARAM_DEFAULTS = {
     "personal_limit": None,
     "org_limit": None,
     "all_branches": False,
+    "branch_discovery": "events",
+    "commits_from_search": False,
+    "discovery": "prompt",
+    "path": None,
+    "skip_archived": False,
+    "skip_forks": False,
+    "skip_templates": False,
+    "repo_topic": None,
+    "repo_language": None,
+    "repo_glob": None,
     "export_commits": False,
     "full_message": False,
     "output": None,
     "org_summary": None,
+    "include_authors": None,
+    "exclude_authors": None,
+    "exclude_bots": False,
+    "org_members_only": False,
     "arena": False,
     "arena_top": 5,
     "highlights": False,
     "dry_run": False,
     "exclude_noise": False,
+    "noise_rule": None,
+    "merges": "full",
+    "shared_commits": "prefer-upstream",
     "dev": False,
     "serve": False,
     "port": 8080,
     "no_open": False,
     "serve_output": None,
     "serve_input": None,
+    "cache_dir": None,
+    "no_cache": False,
+    "collect_events": False,
+    "jobs": DEFAULT_JOBS,
+    "max_jobs": None,
+    "hedge": 0,
+    "token_file": None,
+    "schedule": "longest-first",
+    "deadline": None,
 }
 
+# 作者过滤参数 (仅在 --org-summary 模式下生效)
+AUTHOR_FILTER_PARAMS = ("include_authors", "exclude_authors", "exclude_bots", "org_members_only")
+
 # 默认的 serve 数据路径
 DEFAULT_SERVE_DATA_PATH = "reports/serve-data.json"
 
 
+def _duration(value: str) -> float:
+    """argparse type for --deadline."""
+    try:
+        seconds = parse_duration(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError("duration must be positive")
+    return seconds
+
+
+def _percent(value: str) -> float:
+    """argparse type for --hedge."""
+    try:
+        percent = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid percentage: '{value}'")
+    if not 0 <= percent <= 100:
+        raise argparse.ArgumentTypeError("percentage must be between 0 and 100")
+    return percent
+
 def create_parser() -> argparse.ArgumentParser:
     """创建参数解析器"""
     parser = argparse.ArgumentParser(description="GitHub contribution statistics")
     parser.add_argument('--user', type=str, help='Target GitHub username (defaults to authenticated user)')
+    parser.add_argument('--users', type=str, metavar='LOGINS', help='Batch mode: per-user reports for comma-separated logins (or @FILE, one per line); repos are listed once for all users and each commit\'s stats fetched once')
     parser.add_argument('--personal', dest='personal', action='store_true', default=True, help='Include personal repos (default)')
     parser.add_argument('--no-personal', dest='personal', action='store_false', help='Exclude personal repos')
     parser.add_argument('--orgs', type=str, default='', help='Comma-separated organization names')
@@ -166,15 +259,32 @@ def create_parser() -> argparse.ArgumentParser:
     parser.add_argument('--personal-limit', type=int, help='Max personal repos to scan (0=unlimited)')
     parser.add_argument('--org-limit', type=int, help='Max repos per org to scan (0=unlimited)')
     parser.add_argument('--all-branches', action='store_true', help='Scan all active branches (found via Events API) instead of just default branch')
+    parser.add_argument('--branch-discovery', choices=BRANCH_DISCOVERY_STRATEGIES, default='events', help='How --all-branches finds active branches: recent Events (fast, last ~300 events) or a GraphQL query over every branch of the scanned repos (implies --all-branches, default: events)')
+    parser.add_argument('--discovery', choices=DISCOVERY_MODES, default='prompt', help='For ranges past 90 days or large orgs: ask which fallback to use, or pick the cheapest strategy with full coverage automatically (default: prompt)')
+    parser.add_argument('--commits-from-search', action='store_true', help='When deep search is used for discovery, use its commit hits as the commit lists instead of listing each repo again')
+    parser.add_argument('--path', action='append', metavar='[REPO_GLOB:]PATH', help='Only count commits and lines under PATH, repeatable; prefix with REPO_GLOB: to scope it to matching repos')
+    parser.add_argument('--skip-archived', action='store_true', help='Do not scan archived repositories')
+    parser.add_argument('--skip-forks', action='store_true', help='Do not scan forked repositories')
+    parser.add_argument('--skip-templates', action='store_true', help='Do not scan template repositories')
+    parser.add_argument('--repo-topic', type=str, metavar='TOPICS', help='Only scan repos with one of these comma-separated topics')
+    parser.add_argument('--repo-language', type=str, metavar='LANGUAGES', help='Only scan repos whose primary language is one of these (comma-separated)')
+    parser.add_argument('--repo-glob', type=str, metavar='GLOBS', help='Only scan repos whose name or owner/name matches one of these comma-separated globs')
     parser.add_argument('--export-commits', action='store_true', help='Export commit messages to a Markdown file')
     parser.add_argument('--full-message', action='store_true', help='Include full commit message body in export')
     parser.add_argument('--output', '-o', type=str, help='Specify output filename for export')
-    parser.add_argument('--org-summary', type=str, metavar='ORG', help='Org summary mode: analyze a single organization (mutually exclusive with --orgs)')
+    parser.add_argument('--org-summary', type=str, metavar='ORGS', help='Org summary mode: analyze comma-separated organizations in one scan, with a section per org and a combined cross-org summary (mutually exclusive with --orgs)')
+    parser.add_argument('--include-authors', type=str, metavar='LOGINS', help='Only count commits by these comma-separated logins (requires --org-summary)')
+    parser.add_argument('--exclude-authors', type=str, metavar='LOGINS', help='Ignore commits by these comma-separated logins (requires --org-summary)')
+    parser.add_argument('--exclude-bots', action='store_true', help='Ignore commits by bots like dependabot, renovate and github-actions (requires --org-summary)')
+    parser.add_argument('--org-members-only', action='store_true', help='Only count commits by members of the organization (requires --org-summary)')
     parser.add_argument('--arena', action='store_true', help='Show competition rankings (requires --org-summary)')
     parser.add_argument('--arena-top', type=int, default=5, metavar='N', help='Number of top contributors to show in arena rankings (0=all, default=5)')
     parser.add_argument('--highlights', action='store_true', help='Show insights like longest streak and most productive day')
     parser.add_argument('--exclude-noise', action='store_true', help='Exclude noisy files like lockfiles and generated artifacts')
-    parser.add_argument('--dry-run', action='store_true', help='Show parameter diagnostics without executing')
+    parser.add_argument('--noise-rule', action='append', metavar='GLOB', help='Extra glob treated as noise, repeatable (implies --exclude-noise)')
+    parser.add_argument('--merges', choices=MERGE_POLICIES, default='full', help='Merge commit policy: skip them, count them without line stats, or fetch full stats (default: full)')
+    parser.add_argument('--shared-commits', choices=SHARED_COMMIT_POLICIES, default='prefer-upstream', help='Attribution of commits listed in several repos (fork and upstream, mirrors); stats are fetched once either way (default: prefer-upstream)')
+    parser.add_argument('--dry-run', action='store_true', help='Show parameter diagnostics and the predicted execution plan (API requests, wall time, rate-limit fit) without executing')
     parser.add_argument('--dev', action='store_true', help='Enable development diagnostic mode: print command, parsing details, and errors before execution')
     
     # Web server options
@@ -196,6 +306,17 @@ def create_parser() -> argparse.ArgumentParser:
         help='Serve from a JSON file without fetching GitHub data (auto-enables --serve). Default: reports/serve-data.json',
     )
     
+    # Local cache options
+    parser.add_argument('--cache-dir', type=str, help='Directory for the local commit diffstat cache (default: ~/.cache/gh-stats)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the local commit diffstat cache')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, metavar='N', help=f'Workers per scan stage (commit listing, commit stats) and for branch listing and search windows (default: {DEFAULT_JOBS})')
+    parser.add_argument('--max-jobs', type=int, default=None, metavar='N', help='Let concurrent API requests grow up to N: starting at --jobs, concurrency grows while GitHub answers promptly and halves on secondary rate limits or sustained latency spikes (default: --jobs, no growth)')
+    parser.add_argument('--hedge', type=_percent, nargs='?', const=DEFAULT_HEDGE_BUDGET, default=0, metavar='PERCENT', help=f'Send a duplicate of commit detail requests slower than the observed p95 latency and use the first answer, for at most PERCENT%% of them (default when given: {DEFAULT_HEDGE_BUDGET:g})')
+    parser.add_argument('--token-file', type=str, metavar='PATH', help='File with GitHub tokens (one per line, # comments) to spread requests over; each request uses the token with the most rate limit left (default: GH_STATS_TOKENS, else gh auth)')
+    parser.add_argument('--schedule', choices=SCHEDULES, default='longest-first', help='Order of repo listing: longest-first starts the repos with the most commits in previous runs (else the largest) first; fifo keeps discovery order (default: longest-first)')
+    parser.add_argument('--deadline', type=_duration, metavar='DURATION', help='Time budget for the run, e.g. 60s, 2m, 1h30m: scanning stops on time and the report is partial, with coverage metadata')
+    parser.add_argument('--collect-events', action='store_true', help='Only append the current Events feed to the local events archive and exit (run periodically, e.g. from cron)')
+    
     return parser
 
 
@@ -252,6 +373,24 @@ def parse_with_diagnostics(argv: Optional[List[str]] = None) -> Tuple[argparse.N
         if Entity.E_SERVE not in [e for e, _ in result.active_entities]:
             result.active_entities.append((Entity.E_SERVE, "--serve-output/--serve-input (derived)"))
     
+    # 推导规则 (D): --noise-rule 自动激活 --exclude-noise
+    if args.noise_rule and not args.exclude_noise:
+        result.params["exclude_noise"].source = ValueSource.DERIVED
+        result.params["exclude_noise"].value = True
+        args.exclude_noise = True
+    
+    # 推导规则 (D): --branch-discovery 非默认值时激活 --all-branches
+    if args.branch_discovery != "events" and not args.all_branches:
+        result.params["all_branches"].source = ValueSource.DERIVED
+        result.params["all_branches"].value = True
+        args.all_branches = True
+    
+    # 推导规则 (D): --max-jobs 不低于 --jobs
+    if args.max_jobs is not None and args.max_jobs < args.jobs:
+        result.params["max_jobs"].source = ValueSource.DERIVED
+        result.params["max_jobs"].value = args.jobs
+        args.max_jobs = args.jobs
+
     # 互斥约束检查 (X): --org-summary 与 --orgs
     orgs = [o.strip() for o in args.orgs.split(',') if o.strip()]
     if args.org_summary and orgs:
@@ -259,12 +398,33 @@ def parse_with_diagnostics(argv: Optional[List[str]] = None) -> Tuple[argparse.N
             "EXCLUSION_CONFLICT: --org-summary and --orgs are mutually exclusive"
         )
     
+    # 互斥约束检查 (X): --users 与 --user / --org-summary / --serve
+    if args.users:
+        for flag, value in (("--user", args.user), ("--org-summary", args.org_summary), ("--serve", args.serve)):
+            if value:
+                result.exclusion_violations.append(
+                    f"EXCLUSION_CONFLICT: --users and {flag} are mutually exclusive"
+                )
+    
+    # 互斥约束检查 (X): --collect-events 与 --no-cache
+    if args.collect_events and args.no_cache:
+        result.exclusion_violations.append(
+            "EXCLUSION_CONFLICT: --collect-events and --no-cache are mutually exclusive"
+        )
+    
     # 依赖检查: --arena 需要 --org-summary
     if args.arena and not args.org_summary:
         result.dependency_errors.append(
             "DEPENDENCY_MISSING: --arena requires --org-summary"
         )
     
+    # 依赖检查: 作者过滤参数需要 --org-summary
+    for flag in AUTHOR_FILTER_PARAMS:
+        if getattr(args, flag) and not args.org_summary:
+            result.dependency_errors.append(
+                f"DEPENDENCY_MISSING: --{flag.replace('_', '-')} requires --org-summary"
+            )
+    
     return args, result
 
 
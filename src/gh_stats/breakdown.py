@@ -0,0 +1,262 @@
+"""
+Language and directory breakdown of line changes, built from per-file diffstats.
+"""
+import os
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+from .diffstat import summarize
+
+
+EXTENSION_LANGUAGES = {
+    ".py": "Python",
+    ".pyi": "Python",
+    ".ipynb": "Jupyter Notebook",
+    ".js": "JavaScript",
+    ".mjs": "JavaScript",
+    ".cjs": "JavaScript",
+    ".jsx": "JavaScript",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".java": "Java",
+    ".kt": "Kotlin",
+    ".kts": "Kotlin",
+    ".scala": "Scala",
+    ".c": "C",
+    ".h": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".cxx": "C++",
+    ".hpp": "C++",
+    ".cs": "C#",
+    ".swift": "Swift",
+    ".m": "Objective-C",
+    ".mm": "Objective-C",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".dart": "Dart",
+    ".lua": "Lua",
+    ".r": "R",
+    ".sh": "Shell",
+    ".bash": "Shell",
+    ".zsh": "Shell",
+    ".ps1": "PowerShell",
+    ".sql": "SQL",
+    ".html": "HTML",
+    ".htm": "HTML",
+    ".css": "CSS",
+    ".scss": "SCSS",
+    ".less": "Less",
+    ".vue": "Vue",
+    ".svelte": "Svelte",
+    ".md": "Markdown",
+    ".rst": "reStructuredText",
+    ".json": "JSON",
+    ".yaml": "YAML",
+    ".yml": "YAML",
+    ".toml": "TOML",
+    ".xml": "XML",
+    ".proto": "Protocol Buffers",
+    ".tf": "HCL",
+}
+
+FILENAME_LANGUAGES = {
+    "dockerfile": "Dockerfile",
+    "makefile": "Makefile",
+    "cmakelists.txt": "CMake",
+    "jenkinsfile": "Groovy",
+}
+
+OTHER_LANGUAGE = "Other"
+ROOT_DIR = "(root)"
+OTHER_DIR = "(other)"
+# Lines of truncated file lists, which have no path or language
+UNLISTED = "(unlisted)"
+
+# Bounds that keep the rollup small no matter how many files are fed into it
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_MAX_CHILDREN = 100
+
+
+def language_for_path(path: str) -> str:
+    filename = path.replace("\\", "/").rsplit("/", 1)[-1].lower()
+    if filename in FILENAME_LANGUAGES:
+        return FILENAME_LANGUAGES[filename]
+    _, ext = os.path.splitext(filename)
+    return EXTENSION_LANGUAGES.get(ext, OTHER_LANGUAGE)
+
+
+class PathTree:
+    """
+    Prefix-tree rollup of line changes by directory.
+
+    Every node accumulates the changes of everything beneath it. Depth and fan-out
+    are capped, so memory is bounded by the tree shape rather than the number of
+    files: deeper paths roll up into their ancestor, and directories beyond
+    `max_children` share an "(other)" bucket.
+
+    Trees spanning several repos are rooted at the repo name (`root`), so the same
+    directory in different repos stays apart; the root level does not count
+    towards `max_depth`.
+    """
+
+    __slots__ = ("added", "deleted", "children", "max_depth", "max_children")
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH, max_children: int = DEFAULT_MAX_CHILDREN):
+        self.added = 0
+        self.deleted = 0
+        self.children: Dict[str, "PathTree"] = {}
+        self.max_depth = max_depth
+        self.max_children = max_children
+
+    def _child(self, name: str) -> "PathTree":
+        child = self.children.get(name)
+        if child is None:
+            if len(self.children) >= self.max_children and name != OTHER_DIR:
+                return self._child(OTHER_DIR)
+            child = PathTree(self.max_depth, self.max_children)
+            self.children[name] = child
+        return child
+
+    def add(self, path: str, added: int, deleted: int, root: Optional[str] = None) -> None:
+        self.added += added
+        self.deleted += deleted
+        node = self
+        if root is not None:
+            node = node._child(root)
+            node.added += added
+            node.deleted += deleted
+        if path == UNLISTED:
+            parts = [UNLISTED]
+        else:
+            parts = path.replace("\\", "/").split("/")[:-1] or [ROOT_DIR]
+        for part in parts[:self.max_depth]:
+            node = node._child(part if part in (ROOT_DIR, UNLISTED) else f"{part}/")
+            node.added += added
+            node.deleted += deleted
+
+    def merge(self, other: "PathTree", root: Optional[str] = None, sign: int = 1) -> None:
+        """Add `other` (sign=-1: take back a tree merged before; emptied directories are dropped)."""
+        self.added += sign * other.added
+        self.deleted += sign * other.deleted
+        children = {root: other} if root is not None else other.children
+        for name, child in children.items():
+            node = self._child(name)
+            node.merge(child, sign=sign)
+            if sign < 0 and not (node.added or node.deleted or node.children):
+                self.children = {k: v for k, v in self.children.items() if v is not node}
+
+    def top(self, n: Optional[int] = None, depth: int = 1) -> List[tuple]:
+        """
+        Directories `depth` levels down as (name, added, deleted), by total changes.
+
+        Deeper names are joined with their ancestors, e.g. "acme/api/src/" for
+        depth 2 of a repo-rooted tree.
+        """
+        nodes = [("", self)]
+        for _ in range(depth):
+            nodes = [
+                (f"{prefix}/{name}" if prefix and not prefix.endswith("/") else prefix + name, child)
+                for prefix, node in nodes
+                for name, child in node.children.items()
+            ]
+        items = sorted(nodes, key=lambda x: x[1].added + x[1].deleted, reverse=True)
+        if n:
+            items = items[:n]
+        return [(name, node.added, node.deleted) for name, node in items]
+
+    def to_list(self) -> List[Dict]:
+        return [
+            {
+                "path": name,
+                "added": node.added,
+                "deleted": node.deleted,
+                **({"children": node.to_list()} if node.children else {}),
+            }
+            for name, node in sorted(self.children.items(), key=lambda x: x[1].added + x[1].deleted, reverse=True)
+        ]
+
+
+class Breakdown:
+    """Line changes by language and by directory for a repo or a user."""
+
+    __slots__ = ("languages", "paths", "rooted")
+
+    def __init__(self):
+        self.languages: Dict[str, List[int]] = {}
+        self.paths = PathTree()
+        # True once paths are rooted at repo names (see PathTree)
+        self.rooted = False
+
+    def __bool__(self) -> bool:
+        return bool(self.languages)
+
+    def add_file(self, path: str, added: int, deleted: int, root: Optional[str] = None) -> None:
+        language = OTHER_LANGUAGE if path == UNLISTED else language_for_path(path)
+        counts = self.languages.setdefault(language, [0, 0])
+        counts[0] += added
+        counts[1] += deleted
+        self.paths.add(path, added, deleted, root)
+        self.rooted = self.rooted or root is not None
+
+    def add_diffstat(self, diffstat, path_filter: Optional[Callable[[str], bool]] = None,
+                     root: Optional[str] = None) -> None:
+        """
+        Feed a compact diffstat (see diffstat.py), honoring the same path filter as the totals.
+
+        Lines the totals count beyond the listed files (truncated file lists) go to
+        an "(unlisted)" bucket, so the breakdown adds up to the totals.
+        """
+        if not diffstat:
+            return
+        listed_added = listed_deleted = 0
+        for path, added, deleted in diffstat[2]:
+            if path_filter is None or path_filter(path):
+                self.add_file(path, added, deleted, root)
+                listed_added += added
+                listed_deleted += deleted
+        total_added, total_deleted = summarize(diffstat, path_filter)
+        rest_added, rest_deleted = max(0, total_added - listed_added), max(0, total_deleted - listed_deleted)
+        if rest_added or rest_deleted:
+            self.add_file(UNLISTED, rest_added, rest_deleted, root)
+
+    def merge(self, other: "Breakdown", root: Optional[str] = None, sign: int = 1) -> None:
+        """Add `other`; sign=-1 takes back a breakdown merged before (see PathTree.merge)."""
+        for language, (added, deleted) in other.languages.items():
+            counts = self.languages.setdefault(language, [0, 0])
+            counts[0] += sign * added
+            counts[1] += sign * deleted
+            if sign < 0 and not any(counts):
+                del self.languages[language]
+        self.paths.merge(other.paths, root, sign)
+        self.rooted = self.rooted or other.rooted or root is not None
+
+    def top_paths(self, n: Optional[int] = None) -> List[tuple]:
+        """Top directories as (name, added, deleted); repo-qualified when rooted at repos."""
+        return self.paths.top(n, depth=2 if self.rooted else 1)
+
+    def top_languages(self, n: Optional[int] = None) -> List[tuple]:
+        """Languages as (name, added, deleted), by total changes."""
+        items = sorted(self.languages.items(), key=lambda x: x[1][0] + x[1][1], reverse=True)
+        if n:
+            items = items[:n]
+        return [(name, added, deleted) for name, (added, deleted) in items]
+
+
+def merge_breakdowns(breakdowns: Iterable[Optional[Breakdown]]) -> Breakdown:
+    combined = Breakdown()
+    for breakdown in breakdowns:
+        if breakdown:
+            combined.merge(breakdown)
+    return combined
+
+
+def merge_repo_breakdowns(stats: Mapping[str, Dict]) -> Breakdown:
+    """Combine the breakdowns of per-repo stats ({repo: {..., breakdown}}), rooted at each repo."""
+    combined = Breakdown()
+    for repo, data in stats.items():
+        breakdown = data.get("breakdown")
+        if breakdown:
+            combined.merge(breakdown, root=repo)
+    return combined
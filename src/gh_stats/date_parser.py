@@ -108,3 +108,17 @@ def parse_date_range(range_str):
         pass
         
     raise ValueError(f"Unknown range: {range_str}")
+
+def parse_duration(duration_str):
+    """
+    Parse durations like '90', '60s', '2m', '1h30m' or '1m30s'.
+    A bare number is seconds. Returns the duration in seconds (float).
+    """
+    units = {'h': 3600, 'm': 60, 's': 1}
+    value = duration_str.strip().lower()
+    if re.match(r'^\d+(?:\.\d+)?$', value):
+        return float(value)
+    parts = re.findall(r'(\d+(?:\.\d+)?)([hms])', value)
+    if not parts or ''.join(num + unit for num, unit in parts) != value:
+        raise ValueError(f"Unknown duration format: {duration_str}")
+    return float(sum(float(num) * units[unit] for num, unit in parts))
@@ -0,0 +1,163 @@
+"""
+Per-file diffstat store.
+
+Commits are immutable, so the per-file line changes of a fetched commit never
+need to be fetched again. The store keeps them on disk in compact form (one
+JSON line per commit, grouped by repository) so that noise exclusion and path
+filters can be re-applied locally without any commit detail requests.
+
+Commit listings are not stored: which commits fall in a range can still change
+(late pushes, rebased branches, new authors), so a re-derived report lists its
+repos again, one request per 100 commits instead of one per commit.
+"""
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Compact record: (added, deleted, [(path, added, deleted), ...])
+Diffstat = Tuple[int, int, List[Tuple[str, int, int]]]
+
+
+def default_cache_dir() -> str:
+    """Resolve the cache directory (GH_STATS_CACHE_DIR > XDG_CACHE_HOME > ~/.cache)."""
+    env_dir = os.environ.get('GH_STATS_CACHE_DIR')
+    if env_dir:
+        return env_dir
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'gh-stats')
+
+
+def diffstat_from_commit(data: Dict) -> Diffstat:
+    """Build a compact diffstat from a `repos/{repo}/commits/{sha}` payload."""
+    stats = data.get('stats') or {}
+    files = []
+    for file_info in data.get('files') or []:
+        filename = file_info.get('filename', '')
+        if not filename:
+            continue
+        files.append((filename, file_info.get('additions', 0), file_info.get('deletions', 0)))
+    return stats.get('additions', 0), stats.get('deletions', 0), files
+
+
+def unlisted_lines(diffstat: Diffstat) -> Tuple[int, int]:
+    """Lines of the commit totals not covered by the (possibly truncated) file list."""
+    added, deleted, files = diffstat
+    listed_added = sum(entry[1] for entry in files)
+    listed_deleted = sum(entry[2] for entry in files)
+    return max(0, added - listed_added), max(0, deleted - listed_deleted)
+
+
+def summarize(diffstat: Optional[Diffstat], path_filter: Optional[Callable[[str], bool]] = None) -> Tuple[int, int]:
+    """
+    Derive (added, deleted) totals from a diffstat.
+
+    Args:
+        diffstat: Compact record, or None for a commit that could not be fetched
+        path_filter: Optional predicate; only files for which it returns True are counted.
+                     When the commit has no file list, the commit totals are used.
+
+    A huge commit may still have a truncated file list once its page budget is spent
+    (see is_approximate): the lines beyond the listed files get the kept share of the
+    listed lines.
+    """
+    if not diffstat:
+        return 0, 0
+    added, deleted, files = diffstat
+    if path_filter is None or not files:
+        return added, deleted
+    rest_added, rest_deleted = unlisted_lines(diffstat)
+    added = deleted = 0
+    listed = 0
+    for path, file_added, file_deleted in files:
+        listed += file_added + file_deleted
+        if path_filter(path):
+            added += file_added
+            deleted += file_deleted
+    if (rest_added or rest_deleted) and listed:
+        share = (added + deleted) / listed
+        added += round(rest_added * share)
+        deleted += round(rest_deleted * share)
+    return added, deleted
+
+
+def is_approximate(diffstat: Optional[Diffstat], path_filter: Optional[Callable[[str], bool]] = None) -> bool:
+    """Whether summarize() has to estimate part of a filtered commit (truncated file list)."""
+    return bool(diffstat and path_filter is not None and diffstat[2] and any(unlisted_lines(diffstat)))
+
+
+class DiffstatStore:
+    """
+    Append-only on-disk store of per-file diffstats, keyed by repo and SHA.
+
+    A repo's file is indexed on first access (SHA -> byte offset of its line) and
+    records are parsed when requested, so memory grows with the number of SHAs, not
+    with their file lists.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.root = os.path.join(cache_dir or default_cache_dir(), 'diffstats')
+        self._index: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _repo_path(self, repo_full_name: str) -> str:
+        owner, _, name = repo_full_name.partition('/')
+        return os.path.join(self.root, owner, f"{name or owner}.jsonl")
+
+    def _load_index(self, repo_full_name: str) -> Dict[str, int]:
+        index = self._index.get(repo_full_name)
+        if index is not None:
+            return index
+        index = {}
+        path = self._repo_path(repo_full_name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    # Lines start with ["<sha>",; a partially written trailing line has no newline
+                    if line.startswith(b'["') and line.endswith(b'\n'):
+                        end = line.find(b'"', 2)
+                        if end > 2:
+                            index[line[2:end].decode('ascii', 'replace')] = offset
+                    offset += len(line)
+        self._index[repo_full_name] = index
+        return index
+
+    def get(self, repo_full_name: str, sha: str) -> Optional[Diffstat]:
+        with self._lock:
+            offset = self._load_index(repo_full_name).get(sha)
+            if offset is None:
+                return None
+            with open(self._repo_path(repo_full_name), 'rb') as f:
+                f.seek(offset)
+                line = f.readline()
+        try:
+            _, added, deleted, files = json.loads(line.decode('utf-8'))
+        except (ValueError, TypeError):
+            return None
+        return added, deleted, [tuple(entry) for entry in files]
+
+    def put(self, repo_full_name: str, sha: str, diffstat: Diffstat) -> None:
+        added, deleted, files = diffstat
+        line = json.dumps([sha, added, deleted, [list(entry) for entry in files]],
+                          ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            index = self._load_index(repo_full_name)
+            path = self._repo_path(repo_full_name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a+b') as f:
+                end = f.seek(0, os.SEEK_END)
+                if end:
+                    # Start a fresh line after an interrupted write
+                    f.seek(end - 1)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+                        end += 1
+                index[sha] = end
+                f.write(line.encode('utf-8'))
+
+    def shas(self, repo_full_name: str) -> List[str]:
+        """List the SHAs stored for a repository."""
+        with self._lock:
+            return list(self._load_index(repo_full_name).keys())
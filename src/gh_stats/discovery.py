@@ -1,15 +1,95 @@
-from datetime import date
-from .api import get_user_active_branches, get_user_repos, get_org_repos, search_user_commits
+from datetime import date, timedelta
+from .api import (
+    get_user_active_branches, get_user_repos, get_org_repos, search_user_commits, get_repos_active_branches,
+    get_contributed_repos, get_search_commit_count, get_repo_info, SEARCH_RESULT_CAP,
+)
 from .ui import Colors
 
+# prompt: ask when a range or an org is too large for the cheap path; auto: decide by estimated cost
+DISCOVERY_MODES = ("prompt", "auto")
+
+# Search requests are limited to 30/minute versus 5,000/hour for the core API,
+# so one search request is weighed like this many core requests
+SEARCH_REQUEST_WEIGHT = 3
+
+# Another user's org repos above this count are filtered (auto) or prompted for
+ORG_REPO_THRESHOLD = 64
+
 def default_prompt_callback(msg):
     return input(msg)
 
-def discover_repositories(username, since_date, until_date, orgs, personal, is_self=True, prompt_callback=default_prompt_callback):
+def in_discovery_scope(full_name, username, orgs, personal, is_self=True):
+    """Whether a repo found by name (Events, archive, contributions) is in the personal/org scope."""
+    owner = full_name.split('/', 1)[0] if '/' in full_name else username
+    if not is_self and not orgs:
+        # When querying OTHER users without org filter: include ALL repos from Events API
+        return True
+    # Apply filtering logic (for self, or for other user with org filter)
+    is_personal_match = personal and (owner == username)
+    is_org_match = owner in orgs
+    return is_personal_match or is_org_match
+
+def pushed_since(repo, since_date):
+    """Whether a repo may hold commits from since_date on (a commit is pushed after it is made)."""
+    pushed_at = repo.get('pushed_at')
+    # One day of slack for the UTC timestamp versus the local date
+    return not pushed_at or pushed_at[:10] >= (since_date - timedelta(days=1)).isoformat()
+
+def estimate_search_requests(total_count):
+    """Search requests needed for `total_count` hits: result pages plus bisection probes."""
+    pages = -(-total_count // 100)
+    windows = -(-total_count // SEARCH_RESULT_CAP)
+    return max(1, pages + 2 * (windows - 1))
+
+def auto_fallback_strategy(username, since_date, until_date, personal, orgs, is_self, allows_repo, should_stop=None):
+    """
+    Pick the cheapest strategy with full coverage for a range past the Events API horizon.
+    
+    1. GraphQL contributions (one query per year) when it reports complete results.
+    2. Otherwise a full repo scan of the repos pushed since the range start, or deep
+       search, whichever has the lower estimated cost (probes: repo lists, one search).
+    
+    Returns:
+        (choice, repos): choice is 'contributions', 'all' or 'deepsearch'; repos holds the
+        contributed repo names or the pruned repo objects already fetched (None for deepsearch)
+    """
+    def log(message):
+        print(f"{Colors.CYAN}[AUTO]{Colors.ENDC} {message}")
+    
+    contributed, complete = get_contributed_repos(username, since_date, until_date, should_stop)
+    queries = -(-((until_date - since_date).days + 1) // 365)
+    if complete:
+        log(f"GraphQL contributions listed {len(contributed)} repos in {queries} queries with full coverage -> contributions")
+        return 'contributions', contributed
+    log(f"GraphQL contributions incomplete ({len(contributed)} repos; repo cap or hidden private contributions)")
+    
+    listed = []
+    if personal:
+        listed.extend(get_user_repos(username, None, is_self=is_self, should_stop=should_stop))
+    for org in orgs:
+        listed.extend(get_org_repos(org, None, should_stop=should_stop))
+    candidates = [r for r in listed if allows_repo(r) and pushed_since(r, since_date)]
+    full_cost = len(candidates)
+    log(f"Full scan: {len(candidates)} of {len(listed)} repos pushed since {since_date} -> ~{full_cost} requests")
+    
+    total_count = get_search_commit_count(username, since_date, until_date)
+    if total_count is None:
+        log("Deep search probe failed -> full scan")
+        return 'all', candidates
+    search_cost = estimate_search_requests(total_count) * SEARCH_REQUEST_WEIGHT
+    log(f"Deep search: {total_count} hits -> ~{estimate_search_requests(total_count)} search requests (weighed {search_cost})")
+    if search_cost < full_cost:
+        log("Deep search is cheaper -> deep search")
+        return 'deepsearch', None
+    log("Full scan is cheaper -> full scan")
+    return 'all', candidates
+
+def discover_repositories(username, since_date, until_date, orgs, personal, is_self=True, prompt_callback=default_prompt_callback, repo_filter=None, events_archive=None, search_hits=None, discovery='prompt', on_repo=None, should_stop=None):
     """
     Discover repositories based on the hybrid logic:
     1. Always check Events API for recent activity (precision layer).
-    2. If date range > 90 days, prompt user for interactive fallback (history layer).
+    2. If date range > 90 days, consult the local events archive; when it does not
+       reach back far enough, prompt user for interactive fallback (history layer).
     
     Args:
         username: Target GitHub username to analyze
@@ -20,6 +100,20 @@ def discover_repositories(username, since_date, until_date, orgs, personal, is_s
         is_self: True if username is the authenticated user (can see private repos),
                  False if querying another user (public repos only)
         prompt_callback: Callback for user prompts
+        repo_filter: Optional filters.RepoFilter; repo list payloads are checked against
+                     their metadata, Events/Search results once their metadata is fetched
+        events_archive: Optional events.EventsArchive; fetched events are archived, and
+                        archived events extend discovery past the 90-day horizon
+        search_hits: Optional dict; deep search fills it with the commits it found per
+                     repo (see api.search_user_commits) so the scanner can skip listing
+        discovery: 'prompt' asks via prompt_callback; 'auto' picks the cheapest strategy
+                   with full coverage and logs why (see auto_fallback_strategy)
+        on_repo: Optional callback(full_name, name, branches) called once per repo as soon
+                 as it is found, so scanning can start while discovery (and its prompts)
+                 continues; branches are its active branches known so far, or None
+        should_stop: Optional stop check (see schedule.Deadline) called before each page of
+                     the repo listings, contributions queries and deep search; once it
+                     returns True, discovery keeps what it found so far
     
     Returns:
         repos_to_scan: List of tuples (full_name, name)
@@ -29,6 +123,10 @@ def discover_repositories(username, since_date, until_date, orgs, personal, is_s
     repos_to_scan_set = set() # (full_name, name) tuples
     active_branches_map = {} 
     
+    allows_repo = repo_filter.allows if repo_filter else (lambda repo: True)
+    # Repos found by name are checked after the scope, so metadata is fetched only for those kept
+    allows_name = (lambda full_name: repo_filter.allows_full_name(full_name, get_repo_info)) if repo_filter else (lambda full_name: True)
+    
     # When querying other users without orgs, we only see their personal public repos
     if not is_self and not orgs:
         if not personal:
@@ -37,41 +135,57 @@ def discover_repositories(username, since_date, until_date, orgs, personal, is_s
     
     # 1. ALWAYS run Events API (Precision Layer)
     print(f"{Colors.CYAN}[...]{Colors.ENDC} Analyzing recent activity (Events API)...", end="", flush=True)
-    active_branches_map = get_user_active_branches(username) # {repo: branches}
+    active_branches_map = get_user_active_branches(username, events_archive) # {repo: branches}
     print(f"\r{Colors.GREEN}[✔]{Colors.ENDC} Found recent activity in {len(active_branches_map)} repos")
     
-    for full_name in active_branches_map.keys():
-        owner, name = full_name.split('/', 1) if '/' in full_name else (username, full_name)
-        
-        if not is_self and not orgs:
-            # When querying OTHER users without org filter: include ALL repos from Events API
+    def add_repo(full_name, name):
+        if (full_name, name) not in repos_to_scan_set:
             repos_to_scan_set.add((full_name, name))
-        else:
-            # Apply filtering logic (for self, or for other user with org filter)
-            is_personal_match = personal and (owner == username)
-            is_org_match = owner in orgs
-            
-            if is_personal_match or is_org_match:
-                 repos_to_scan_set.add((full_name, name))
+            if on_repo is not None:
+                on_repo(full_name, name, active_branches_map.get(full_name))
+    
+    def add_event_repo(full_name):
+        if in_discovery_scope(full_name, username, orgs, personal, is_self) and allows_name(full_name):
+            add_repo(full_name, full_name.split('/', 1)[-1])
+    
+    days_ago = (date.today() - since_date).days
+    
+    # 1b. Archived events reach past the Events API horizon
+    archive_covers = False
+    if days_ago > 90 and events_archive is not None:
+        archived_map = events_archive.active_branches(username, since_date, until_date)
+        for full_name, branches in archived_map.items():
+            active_branches_map.setdefault(full_name, set()).update(branches)
+        archive_covers = events_archive.covers(username, since_date)
+        if archived_map:
+            print(f"{Colors.GREEN}[✔]{Colors.ENDC} Events archive adds activity in {len(archived_map)} repos")
+    
+    # Added once the archived branches are merged, so they are handed over complete
+    for full_name in list(active_branches_map.keys()):
+        add_event_repo(full_name)
     
     # 2. When viewing other user with org filter, also fetch org repos
     # Events API can't see their activity in private org repos
-    ORG_REPO_THRESHOLD = 64
-    
     if not is_self and orgs:
         # First, get a count of total repos
         print(f"{Colors.CYAN}[...]{Colors.ENDC} Checking organization repos...", end="", flush=True)
         total_org_repos = 0
         org_repo_lists = {}
         for org in orgs:
-            org_repos = get_org_repos(org, limit=None)
+            org_repos = [r for r in get_org_repos(org, limit=None, should_stop=should_stop) if allows_repo(r)]
             org_repo_lists[org] = org_repos
             total_org_repos += len(org_repos)
         print(f"\r{Colors.GREEN}[✔]{Colors.ENDC} Found {total_org_repos} repos in {', '.join(orgs)}")
         
         # If above threshold, ask user
         scan_limit = None
-        if total_org_repos > ORG_REPO_THRESHOLD:
+        if total_org_repos > ORG_REPO_THRESHOLD and discovery == 'auto':
+            # Repos not pushed since the range start cannot hold commits in it
+            for org in org_repo_lists:
+                org_repo_lists[org] = [r for r in org_repo_lists[org] if pushed_since(r, since_date)]
+            pushed_count = sum(len(repos_list) for repos_list in org_repo_lists.values())
+            print(f"{Colors.CYAN}[AUTO]{Colors.ENDC} {pushed_count} of {total_org_repos} org repos were pushed since {since_date} -> scanning those")
+        elif total_org_repos > ORG_REPO_THRESHOLD:
             print(f"\n{Colors.WARNING}[NOTE]{Colors.ENDC} {total_org_repos} repos is a lot. Scanning all may take a while.")
             print(f"Repos are sorted by most recently updated.")
             choice = prompt_callback(f"{Colors.BOLD}Scan [a]ll, enter a [number] to limit, or [Enter] to skip org repos: {Colors.ENDC}").strip().lower()
@@ -93,25 +207,37 @@ def discover_repositories(username, since_date, until_date, orgs, personal, is_s
             for org, repos_list in org_repo_lists.items():
                 repos_to_add = repos_list if scan_limit is None else repos_list[:scan_limit]
                 for r in repos_to_add:
-                    repos_to_scan_set.add((r['full_name'], r['name']))
+                    add_repo(r['full_name'], r['name'])
                     org_repo_count += 1
             if total_org_repos <= ORG_REPO_THRESHOLD or scan_limit is not None:
                 print(f"{Colors.CYAN}[INFO]{Colors.ENDC} Added {org_repo_count} org repos to scan list.")
 
     # 2. Check Range for Fallback (Full History Layer)
-    days_ago = (date.today() - since_date).days
-    
-    if days_ago > 90:
+    if archive_covers:
+        print(f"{Colors.CYAN}[INFO]{Colors.ENDC} Events archive covers the range (since {events_archive.covered_since(username)[:10]}). No fallback scan needed.")
+    elif days_ago > 90:
         print(f"\n{Colors.WARNING}[WARN]{Colors.ENDC} Time range > 90 days. Events API covers recent 90 days.")
-        print(f"To ensure coverage for older activity (>90 days ago), we can fallback to scanning repo lists.")
         
-        choice = prompt_callback(f"{Colors.BOLD}Scan older repos? [a]ll, [number], [d]eepsearch, or [Enter] to skip: {Colors.ENDC}").strip().lower()
+        prefetched = None
+        if discovery == 'auto':
+            choice, prefetched = auto_fallback_strategy(username, since_date, until_date, personal, orgs, is_self, allows_repo, should_stop)
+        else:
+            print(f"To ensure coverage for older activity (>90 days ago), we can fallback to scanning repo lists.")
+            choice = prompt_callback(f"{Colors.BOLD}Scan older repos? [a]ll, [number], [d]eepsearch, or [Enter] to skip: {Colors.ENDC}").strip().lower()
         
         limit = None
         should_fetch = False
         use_deepsearch = False
         
-        if choice == 'a' or choice == 'all':
+        if choice == 'contributions':
+            for full_name in prefetched:
+                add_event_repo(full_name)
+            print(f"{Colors.GREEN}[✔]{Colors.ENDC} Contributions found {len(prefetched)} repos")
+        elif choice == 'all' and prefetched is not None:
+            for r in prefetched:
+                add_repo(r['full_name'], r['name'])
+            print(f" -> Scanning {len(prefetched)} repositories pushed since {since_date}.")
+        elif choice == 'a' or choice == 'all':
             limit = None
             should_fetch = True
             print(f" -> Scanning ALL remaining repositories.")
@@ -120,11 +246,11 @@ def discover_repositories(username, since_date, until_date, orgs, personal, is_s
             print(f"\n{Colors.WARNING}[RATE LIMIT WARNING]{Colors.ENDC}")
             print(f"  Deep search uses GitHub Search API which has stricter rate limits:")
             print(f"  - 30 requests/minute (vs 5000/hour for regular API)")
-            print(f"  - Maximum 1000 commits can be discovered")
+            print(f"  - 1000 results per query (busy date ranges are split into smaller windows)")
             print(f"  This may take a while for active users.\n")
             print(f"{Colors.CYAN}[...]{Colors.ENDC} Searching commits via Search API...", end="", flush=True)
             
-            found_repos = search_user_commits(username, since_date, until_date)
+            found_repos = search_user_commits(username, since_date, until_date, hits=search_hits, should_stop=should_stop)
             
             # Apply same filtering logic as Events API results
             filtered_count = 0
@@ -133,16 +259,16 @@ def discover_repositories(username, since_date, until_date, orgs, personal, is_s
                 
                 if not is_self and not orgs:
                     # When querying OTHER users without org filter: include all repos
-                    repos_to_scan_set.add((full_name, name))
-                    filtered_count += 1
+                    in_scope = True
                 else:
                     # Apply filtering logic (for self, or for other user with org filter)
                     is_personal_match = personal and (owner == username)
                     is_org_match = owner in orgs
-                    
-                    if is_personal_match or is_org_match:
-                        repos_to_scan_set.add((full_name, name))
-                        filtered_count += 1
+                    in_scope = is_personal_match or is_org_match
+                
+                if in_scope and allows_name(full_name):
+                    add_repo(full_name, name)
+                    filtered_count += 1
             
             print(f"\r{Colors.GREEN}[✔]{Colors.ENDC} Deep search found {len(found_repos)} repos, {filtered_count} matched filters")
         elif choice.isdigit():
@@ -156,18 +282,18 @@ def discover_repositories(username, since_date, until_date, orgs, personal, is_s
             # Fetch Personal repos
             if personal:
                 print(f"{Colors.CYAN}[...]{Colors.ENDC} Fetching personal repos...", end="", flush=True)
-                user_repos = get_user_repos(username, limit, is_self=is_self)
+                user_repos = [r for r in get_user_repos(username, limit, is_self=is_self, should_stop=should_stop) if allows_repo(r)]
                 for r in user_repos:
-                    repos_to_scan_set.add((r['full_name'], r['name']))
+                    add_repo(r['full_name'], r['name'])
                 visibility_hint = "" if is_self else " (public only)"
                 print(f"\r{Colors.GREEN}[✔]{Colors.ENDC} Found {len(user_repos)} personal repos{visibility_hint}")
 
             # Fetch Org repos (only when querying self)
             for org in orgs:
                 print(f"{Colors.CYAN}[...]{Colors.ENDC} Fetching {org} repos...", end="", flush=True)
-                org_repos = get_org_repos(org, limit)
+                org_repos = [r for r in get_org_repos(org, limit, should_stop=should_stop) if allows_repo(r)]
                 for r in org_repos:
-                    repos_to_scan_set.add((r['full_name'], r['name']))
+                    add_repo(r['full_name'], r['name'])
                 print(f"\r{Colors.GREEN}[✔]{Colors.ENDC} Found {len(org_repos)} repos in {org}")
                 
     else:
@@ -176,3 +302,22 @@ def discover_repositories(username, since_date, until_date, orgs, personal, is_s
     return list(repos_to_scan_set), active_branches_map
 
 
+
+def discover_active_branches(repos_to_scan, username, since_date, until_date, fallback_map=None):
+    """
+    Find active branches of the repos to scan with GraphQL instead of the Events feed.
+    
+    Covers every branch whose tip is in range, however old or busy the feed is.
+    Falls back to `fallback_map` (the Events result) if the user cannot be resolved.
+    
+    Returns:
+        active_branches_map: Dict of {repo_full_name: set(branches)}
+    """
+    print(f"{Colors.CYAN}[...]{Colors.ENDC} Discovering active branches (GraphQL)...", end="", flush=True)
+    active_branches_map = get_repos_active_branches([full_name for full_name, _ in repos_to_scan], username, since_date, until_date)
+    if active_branches_map is None:
+        print(f"\r{Colors.WARNING}[WARN]{Colors.ENDC} GraphQL branch discovery failed, using Events API branches")
+        return fallback_map or {}
+    branch_count = sum(len(branches) for branches in active_branches_map.values())
+    print(f"\r{Colors.GREEN}[✔]{Colors.ENDC} Found {branch_count} active branches in {len(active_branches_map)} repos")
+    return active_branches_map
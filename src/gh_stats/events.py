@@ -0,0 +1,142 @@
+"""
+Local archive of a user's GitHub events.
+
+The Events API only returns the latest ~300 events of the last 90 days. Every
+page fetched is appended here (deduped by event ID), so with regular collection
+the archive grows into a complete activity log and long-range discovery can be
+answered locally instead of with full repo scans or the Search API.
+"""
+import datetime
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Set
+
+from .api import active_branches_from_events, get_user_events, utc_iso_range
+from .diffstat import default_cache_dir
+
+
+# How far back the Events API reaches
+EVENTS_API_HORIZON_DAYS = 90
+
+ISO_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def _compact_event(event: Dict) -> Dict:
+    """Keep only the fields discovery needs (same shape as the API payload)."""
+    payload = event.get('payload') or {}
+    return {
+        'id': str(event['id']),
+        'type': event.get('type'),
+        'created_at': event.get('created_at', ''),
+        'repo': {'name': (event.get('repo') or {}).get('name', '')},
+        'payload': {key: payload[key] for key in ('ref', 'ref_type') if payload.get(key)},
+    }
+
+
+class EventsArchive:
+    """
+    Append-only on-disk event log per user, with the time span it covers without gaps.
+
+    Coverage starts at the oldest fetched event (or the API horizon when the feed was
+    read to its end) and stays continuous as long as each collection reaches back to
+    the previous one.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.root = os.path.join(cache_dir or default_cache_dir(), 'events')
+        self._users: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, username: str, suffix: str) -> str:
+        return os.path.join(self.root, f"{username.lower()}{suffix}")
+
+    def _load(self, username: str) -> Dict[str, Dict]:
+        records = self._users.get(username)
+        if records is not None:
+            return records
+        records = {}
+        path = self._path(username, '.jsonl')
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # Skip a partially written trailing line
+                        continue
+                    records[event['id']] = event
+        self._users[username] = records
+        return records
+
+    def _read_meta(self, username: str) -> Dict:
+        try:
+            with open(self._path(username, '.meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def add(self, username: str, events: List[Dict], complete: bool = False,
+            now: Optional[datetime.datetime] = None) -> int:
+        """
+        Archive a fetched batch of events and extend the coverage span.
+
+        Args:
+            complete: The batch is the whole Events API feed, not a truncated one
+            now: Collection time (defaults to the current time)
+
+        Returns:
+            Number of events that were not archived yet
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            records = self._load(username)
+            new_events = [_compact_event(e) for e in events if str(e.get('id')) not in records]
+            os.makedirs(self.root, exist_ok=True)
+            if new_events:
+                with open(self._path(username, '.jsonl'), 'a', encoding='utf-8') as f:
+                    for event in new_events:
+                        records[event['id']] = event
+                        f.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')))
+                        f.write('\n')
+
+            if complete:
+                fetch_start = (now - datetime.timedelta(days=EVENTS_API_HORIZON_DAYS)).strftime(ISO_FORMAT)
+            elif events:
+                fetch_start = min(e.get('created_at', '') for e in events)
+            else:
+                return len(new_events)
+            meta = self._read_meta(username)
+            covered_since = meta.get('covered_since')
+            # The previous collection reached up to `collected_at`; a later gap resets coverage
+            if not covered_since or meta.get('collected_at', '') < fetch_start:
+                covered_since = fetch_start
+            meta = {'covered_since': min(covered_since, fetch_start), 'collected_at': now.strftime(ISO_FORMAT)}
+            with open(self._path(username, '.meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            return len(new_events)
+
+    def covered_since(self, username: str) -> Optional[str]:
+        """UTC ISO timestamp from which the archive holds every event, or None."""
+        return self._read_meta(username).get('covered_since')
+
+    def covers(self, username: str, since_date: datetime.date) -> bool:
+        covered_since = self.covered_since(username)
+        return bool(covered_since) and covered_since <= utc_iso_range(since_date, since_date)[0]
+
+    def events(self, username: str, since_date: datetime.date, until_date: datetime.date) -> List[Dict]:
+        since_iso, until_iso = utc_iso_range(since_date, until_date)
+        with self._lock:
+            records = self._load(username)
+            return [e for e in records.values() if since_iso <= e.get('created_at', '') <= until_iso]
+
+    def active_branches(self, username: str, since_date: datetime.date,
+                        until_date: datetime.date) -> Dict[str, Set[str]]:
+        """Branches with archived activity in the date range: {repo_full_name: set(branches)}."""
+        return active_branches_from_events(self.events(username, since_date, until_date))
+
+
+def collect_events(username: str, archive: EventsArchive) -> int:
+    """Fetch the current Events feed into the archive (meant to run periodically, e.g. from cron)."""
+    events, complete = get_user_events(username)
+    return archive.add(username, events, complete)
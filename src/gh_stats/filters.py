@@ -0,0 +1,275 @@
+"""
+Commit predicates applied to commit list payloads before any detail fetch.
+"""
+import fnmatch
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .noise import glob_to_regex
+
+
+# Well-known automation accounts (matched case-insensitively, with or without a "[bot]" suffix)
+BOT_LOGINS = {
+    "dependabot",
+    "dependabot-preview",
+    "renovate",
+    "renovate-bot",
+    "github-actions",
+    "greenkeeper",
+    "snyk-bot",
+    "pre-commit-ci",
+    "mergify",
+    "codecov",
+    "allcontributors",
+    "imgbot",
+    "pyup-bot",
+    "deepsource-autofix",
+}
+
+
+# How merge commits are handled: dropped, counted without line stats, or fully fetched
+MERGE_POLICIES = ("skip", "count-only", "full")
+
+
+def split_csv(value: Optional[str]) -> list:
+    """Split a comma-separated CLI value into stripped, non-empty items."""
+    return [v.strip() for v in (value or '').split(',') if v.strip()]
+
+
+def split_logins(value: Optional[str]) -> list:
+    """
+    Logins of --users: comma-separated, or `@PATH` for a file with one login per line
+    (# comments). Duplicates are dropped case-insensitively, keeping the first spelling.
+    """
+    if value and value.startswith('@'):
+        with open(os.path.expanduser(value[1:]), 'r', encoding='utf-8') as f:
+            value = ','.join(line.split('#')[0] for line in f)
+    logins = []
+    for login in split_csv(value):
+        if login.lower() not in {l.lower() for l in logins}:
+            logins.append(login)
+    return logins
+
+
+def commit_author_login(commit: Dict) -> str:
+    """GitHub login of the commit author, falling back to the git author name."""
+    author = commit.get('author', {})
+    if author:
+        return author.get('login', 'unknown')
+    return commit.get('commit', {}).get('author', {}).get('name', 'unknown')
+
+
+def is_bot_commit(commit: Dict) -> bool:
+    author = commit.get('author') or {}
+    if author.get('type') == 'Bot':
+        return True
+    login = (author.get('login') or commit.get('commit', {}).get('author', {}).get('name') or '').lower()
+    if login.endswith('[bot]'):
+        return True
+    return login in BOT_LOGINS
+
+
+def is_merge_commit(commit: Dict) -> bool:
+    return len(commit.get('parents') or []) > 1
+
+
+def apply_merge_policy(commits: list, merge_policy: str = "full") -> list:
+    """Drop merge commits from a commit list under the "skip" policy."""
+    if merge_policy != "skip":
+        return commits
+    return [c for c in commits if not is_merge_commit(c)]
+
+
+def needs_commit_stats(commit: Dict, merge_policy: str = "full") -> bool:
+    """Whether a commit's detail must be fetched; merges only are under the "full" policy."""
+    return merge_policy == "full" or not is_merge_commit(commit)
+
+
+class AuthorFilter:
+    """
+    Author predicate for commit lists.
+
+    Args:
+        include: Only keep these logins (case-insensitive); empty keeps everyone
+        exclude: Drop these logins
+        exclude_bots: Drop commits authored by bots (see is_bot_commit)
+        members: Only keep logins in this set (e.g. org members); None disables the check
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (),
+                 exclude_bots: bool = False, members: Optional[Set[str]] = None):
+        self.include = {a.lower() for a in include}
+        self.exclude = {a.lower() for a in exclude}
+        self.exclude_bots = exclude_bots
+        self.members = {m.lower() for m in members} if members is not None else None
+
+    def __bool__(self) -> bool:
+        return bool(self.include or self.exclude or self.exclude_bots or self.members is not None)
+
+    def describe(self) -> str:
+        """Short stable description of the filter, e.g. for cache keys ('' keeps everyone)."""
+        parts = []
+        if self.include:
+            parts.append("authors=" + ",".join(sorted(self.include)))
+        if self.exclude:
+            parts.append("exclude=" + ",".join(sorted(self.exclude)))
+        if self.exclude_bots:
+            parts.append("no-bots")
+        if self.members is not None:
+            parts.append("members")
+        return " ".join(parts)
+
+    def allows(self, commit: Dict) -> bool:
+        login = commit_author_login(commit).lower()
+        if self.include and login not in self.include:
+            return False
+        if login in self.exclude:
+            return False
+        if self.exclude_bots and is_bot_commit(commit):
+            return False
+        if self.members is not None and login not in self.members:
+            return False
+        return True
+
+
+def combine_path_filters(*filters: Optional[Callable[[str], bool]]) -> Optional[Callable[[str], bool]]:
+    """AND together file predicates; None entries are ignored (None result counts everything)."""
+    active = [f for f in filters if f is not None]
+    if not active:
+        return None
+    if len(active) == 1:
+        return active[0]
+
+    def path_filter(path: str) -> bool:
+        return all(f(path) for f in active)
+
+    return path_filter
+
+
+def _literal_prefix(path_glob: str) -> str:
+    """Leading path segments of a glob that contain no wildcard (usable as the API `path=`)."""
+    segments = []
+    for segment in path_glob.split('/'):
+        if any(ch in segment for ch in '*?['):
+            break
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+class PathScope:
+    """
+    Per-repo path restrictions from --path specs.
+
+    A spec is either "PATH" (applies to every repo) or "REPO_GLOB:PATH" (applies to
+    matching repos only, e.g. "acme/monorepo:services/api" or "acme/*:docs").
+    PATH is anchored at the repo root and may contain globs. Repos no rule applies to
+    are not restricted.
+    """
+
+    def __init__(self, specs: Iterable[str] = ()):
+        self.rules = []  # (repo_glob or None, path_glob)
+        for spec in specs:
+            repo_glob, sep, path = spec.rpartition(':')
+            if not sep or not repo_glob:
+                repo_glob, path = None, spec
+            path = path.strip().strip('/')
+            if path:
+                self.rules.append((repo_glob.lower() if repo_glob else None, path))
+        self._filters: Dict[str, Optional[Callable[[str], bool]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def paths_for(self, repo_full_name: str) -> List[str]:
+        repo = repo_full_name.lower()
+        return [path for repo_glob, path in self.rules if repo_glob is None or fnmatch.fnmatchcase(repo, repo_glob)]
+
+    def list_paths(self, repo_full_name: str) -> Optional[List[str]]:
+        """
+        Values for the commits API `path=` parameter, or None to list unrestricted.
+        Globs are pushed down as their literal prefix and narrowed locally by file_filter.
+        """
+        paths = self.paths_for(repo_full_name)
+        if not paths:
+            return None
+        prefixes = []
+        for path in paths:
+            prefix = _literal_prefix(path)
+            if not prefix:
+                return None  # a leading wildcard can't be filtered server-side
+            if prefix not in prefixes:
+                prefixes.append(prefix)
+        return prefixes
+
+    def file_filter(self, repo_full_name: str) -> Optional[Callable[[str], bool]]:
+        """Predicate restricting line stats to the repo's scoped files (None = unrestricted)."""
+        if repo_full_name not in self._filters:
+            paths = self.paths_for(repo_full_name)
+            path_filter = None
+            if paths:
+                regex = re.compile("^(?:" + "|".join(glob_to_regex("/" + p) for p in paths) + ")$")
+
+                def path_filter(path: str) -> bool:
+                    return regex.match(path.replace("\\", "/").lower()) is not None
+
+            self._filters[repo_full_name] = path_filter
+        return self._filters[repo_full_name]
+
+
+class RepoFilter:
+    """
+    Repository predicate evaluated on repo list payloads, before anything is queued for scanning.
+
+    Metadata checks (archived, fork, template, topic, language) need the repo object from
+    a list endpoint; for repos known only by name (Events/Search discovery) it is
+    fetched first (see allows_full_name).
+    """
+
+    def __init__(self, skip_archived: bool = False, skip_forks: bool = False, skip_templates: bool = False,
+                 topics: Iterable[str] = (), languages: Iterable[str] = (), globs: Iterable[str] = ()):
+        self.skip_archived = skip_archived
+        self.skip_forks = skip_forks
+        self.skip_templates = skip_templates
+        self.topics = {t.lower() for t in topics}
+        self.languages = {l.lower() for l in languages}
+        self.globs = [g.lower() for g in globs]
+
+    def __bool__(self) -> bool:
+        return bool(self.skip_archived or self.skip_forks or self.skip_templates
+                    or self.topics or self.languages or self.globs)
+
+    @property
+    def needs_metadata(self) -> bool:
+        return bool(self.skip_archived or self.skip_forks or self.skip_templates or self.topics or self.languages)
+
+    def allows_full_name(self, full_name: str, get_info: Callable[[str], Optional[Dict]]) -> bool:
+        """
+        Check a repo known only by name; `get_info` fetches its metadata (repos/{owner}/{repo})
+        when a metadata filter is set and the name globs allow it.
+        """
+        if not self.allows_name(full_name):
+            return False
+        if not self.needs_metadata:
+            return True
+        return self.allows(get_info(full_name) or {'full_name': full_name})
+
+    def allows_name(self, full_name: str) -> bool:
+        if not self.globs:
+            return True
+        name = full_name.lower()
+        short_name = name.split('/', 1)[-1]
+        return any(fnmatch.fnmatchcase(name, g) or fnmatch.fnmatchcase(short_name, g) for g in self.globs)
+
+    def allows(self, repo: Dict) -> bool:
+        if self.skip_archived and repo.get('archived'):
+            return False
+        if self.skip_forks and repo.get('fork'):
+            return False
+        if self.skip_templates and repo.get('is_template'):
+            return False
+        if self.topics and not self.topics.intersection(t.lower() for t in repo.get('topics') or []):
+            return False
+        if self.languages and (repo.get('language') or '').lower() not in self.languages:
+            return False
+        return self.allows_name(repo.get('full_name', ''))
@@ -0,0 +1,125 @@
+"""
+Hedged requests for commit details.
+
+Most commit detail requests answer quickly, but a few (huge diffs) take seconds and
+hold up the end of a scan. A request still running after the observed p95 latency
+gets a duplicate, and whichever answer arrives first is used. A budget caps the
+duplicates at a small share of the requests, so hedging cannot double the load.
+"""
+import collections
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+# --hedge without a value: duplicates for at most 5% of commit detail requests
+DEFAULT_HEDGE_BUDGET = 5.0
+
+
+class Hedger:
+    """
+    Run requests, duplicating those slower than the `percentile` of recent latencies.
+
+    No duplicates are sent until `min_samples` latencies were seen. Counters:
+    `requests`, `hedged` (duplicates sent) and `hedge_wins` (duplicate answered first).
+    """
+
+    def __init__(self, budget: float = DEFAULT_HEDGE_BUDGET, percentile: float = 0.95,
+                 min_samples: int = 20, window: int = 200):
+        self.budget = budget
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def threshold(self) -> Optional[float]:
+        """Seconds after which a request is hedged, or None while there are too few samples."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[int(self.percentile * (len(latencies) - 1))]
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.budget / 100 * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    def _record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def run(self, fn: Callable[[Callable[[], None]], object]):
+        """
+        Call `fn(started)` and return its answer, hedging it when slow.
+
+        `fn` calls `started()` when its request actually goes out (after any wait for a
+        concurrency slot), so latencies and the hedge delay leave that wait out. Only
+        the primary attempt's latency is recorded: a winning duplicate would hide the
+        slow answers the threshold is there to catch. When one attempt fails (an error
+        or None), the other one is awaited; the error is raised only if both fail.
+        """
+        with self._lock:
+            self.requests += 1
+        delay = self.threshold()
+        primary_started = threading.Event()
+        answers = queue.Queue()
+
+        def attempt(hedge):
+            started_at = time.monotonic()
+
+            def started():
+                nonlocal started_at
+                started_at = time.monotonic()
+                if not hedge:
+                    primary_started.set()
+
+            try:
+                value, error = fn(started), None
+            except Exception as e:
+                value, error = None, e
+            if not hedge:
+                primary_started.set()
+                if error is None and value is not None:
+                    self._record(time.monotonic() - started_at)
+            answers.put((hedge, value, error))
+
+        if delay is None:
+            attempt(False)
+            pending = 0
+            answer = answers.get()
+        else:
+            threading.Thread(target=attempt, args=(False,), daemon=True).start()
+            # The delay counts from the request going out, not from the wait for a slot
+            primary_started.wait()
+            pending = 0
+            try:
+                answer = answers.get(timeout=delay)
+            except queue.Empty:
+                if self._take_hedge():
+                    threading.Thread(target=attempt, args=(True,), daemon=True).start()
+                    pending = 1
+                answer = answers.get()
+
+        first_error = None
+        while True:
+            hedge, value, error = answer
+            if error is None and value is not None:
+                if hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                # The loser keeps running in the background; its answer is dropped
+                return value
+            first_error = first_error or error
+            if not pending:
+                break
+            answer = answers.get()
+            pending -= 1
+        if first_error is not None:
+            raise first_error
+        return None
@@ -7,6 +7,8 @@ import datetime
 from collections import defaultdict
 from typing import Any, Dict, List, Optional
 
+from .breakdown import merge_breakdowns, merge_repo_breakdowns
+
 
 def export_to_json(
     stats: Dict,
@@ -18,6 +20,8 @@ def export_to_json(
     team_stats: Optional[Dict] = None,
     arena: Optional[List] = None,
     org: Optional[str] = None,
+    coverage: Optional[Dict] = None,
+    org_sections: Optional[Dict[str, Dict]] = None,
 ) -> str:
     """
     将统计数据导出为 JSON 格式
@@ -32,6 +36,8 @@ def export_to_json(
         team_stats: 团队统计数据 (可选，用于 org-summary 模式)
         arena: 竞技场排名 (可选)
         org: 组织名 (可选，用于 org-summary 模式)
+        coverage: --deadline 扫描的覆盖率元数据 (可选，见 scanner._PipelineScan._coverage)
+        org_sections: 多组织汇总时各组织的团队统计 {org: team_stats} (可选，见 scanner.split_team_stats_by_org)
         
     Returns:
         JSON 字符串
@@ -51,6 +57,19 @@ def export_to_json(
     if org:
         data["meta"]["org"] = org
     
+    # 覆盖率 (--deadline)
+    if coverage:
+        data["meta"]["coverage"] = {
+            "reposScanned": coverage['repos_scanned'],
+            "reposPartial": coverage['repos_partial'],
+            "reposTotal": coverage['repos_total'],
+            "commits": coverage['commits'],
+            "commitsWithoutStats": coverage['commits_without_stats'],
+            "completeness": coverage['completeness'],
+            "discoveryComplete": coverage['discovery_complete'],
+            "deadlineExceeded": coverage['deadline_exceeded'],
+        }
+    
     # 计算汇总
     if team_stats:
         # Org-summary 模式
@@ -77,6 +96,7 @@ def export_to_json(
             "totalAdded": total_added,
             "totalDeleted": total_deleted,
             "netGrowth": total_added - total_deleted,
+            "approximateCommits": sum(d.get('approximate', 0) for d in team_stats.values()),
             "activeDays": len(all_dates),
             "activeRepos": len(all_repos),
         }
@@ -116,6 +136,20 @@ def export_to_json(
             for date, counts in sorted(timeline.items())
         ]
         
+        # 多组织汇总: 各组织小计 (summary/repos/arena 为跨组织合并结果)
+        if org_sections:
+            data["orgs"] = [
+                {
+                    "name": name,
+                    "contributors": len(section),
+                    "commits": sum(d['commits'] for d in section.values()),
+                    "added": sum(d['added'] for d in section.values()),
+                    "deleted": sum(d['deleted'] for d in section.values()),
+                    "activeRepos": len({repo for d in section.values() for repo in d['repos']}),
+                }
+                for name, section in org_sections.items()
+            ]
+        
     else:
         # Personal 模式
         total_commits = sum(d['commits'] for d in stats.values())
@@ -138,6 +172,7 @@ def export_to_json(
             "totalAdded": total_added,
             "totalDeleted": total_deleted,
             "netGrowth": total_added - total_deleted,
+            "approximateCommits": sum(d.get('approximate', 0) for d in stats.values()),
             "activeDays": len(all_dates),
             "activeRepos": active_repos,
         }
@@ -149,6 +184,7 @@ def export_to_json(
                 "commits": d["commits"],
                 "added": d["added"],
                 "deleted": d["deleted"],
+                "approximateCommits": d.get("approximate", 0),
             }
             for name, d in sorted(stats.items(), key=lambda x: x[1]["commits"], reverse=True)
             if d["commits"] > 0
@@ -171,6 +207,19 @@ def export_to_json(
             for date, counts in sorted(timeline.items())
         ]
     
+    # 语言 / 目录分布
+    # 团队的作者分布已按仓库分根；个人统计按仓库合并
+    if team_stats:
+        breakdown = merge_breakdowns(d.get('breakdown') for d in team_stats.values())
+    else:
+        breakdown = merge_repo_breakdowns(stats)
+    if breakdown:
+        data["languages"] = [
+            {"name": name, "added": added, "deleted": deleted}
+            for name, added, deleted in breakdown.top_languages()
+        ]
+        data["paths"] = breakdown.paths.to_list()
+    
     # 亮点数据
     if highlights:
         data["highlights"] = _format_highlights(highlights)
@@ -4,19 +4,210 @@ import argparse
 import datetime
 import os
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from .api import get_current_user, get_org_repos
+from .api import get_current_user, get_hedger, get_jobs, get_limiter, get_org_repos, get_org_members, get_request_stats, get_token_pool, set_diffstat_store, set_hedging, set_jobs, set_tokens
+from .diffstat import DiffstatStore
+from .events import EventsArchive, collect_events
 from .ui import Colors, print_styled, render_table, generate_ascii_table, generate_markdown_table, generate_team_table, generate_team_markdown_table, print_highlights
 from .date_parser import parse_date_range, parse_relative_date
-from .discovery import discover_repositories
-from .scanner import scan_repositories, scan_org_team_stats
+from .discovery import discover_repositories, discover_active_branches
+from .scanner import BatchScan, RepoScan, TeamScan, split_team_stats_by_org
 from .exporter import generate_markdown, generate_team_markdown, write_export_file, generate_highlights_markdown, DEFAULT_EXPORT_DIR
 from .highlights import generate_highlights
-from .args import create_parser, parse_with_diagnostics, format_diagnostics
+from .args import create_parser, parse_with_diagnostics, format_diagnostics, AUTHOR_FILTER_PARAMS
+from .filters import AuthorFilter, PathScope, RepoFilter, split_csv, split_logins
+from .shaindex import ShaIndex
+from .schedule import Deadline, ScanHistory
+from .tokens import load_tokens
+from .plan import explain
 from .json_exporter import export_to_json, generate_arena_data
 from .portrait import generate_team_portrait, generate_repo_portrait
 from .server import start_server, start_fallback_server, get_static_dir
 
+def resolve_date_range(args):
+    """Resolve --range / --since / --until into (since_date, until_date)."""
+    # 1. Start with 'range' preset if exists
+    if args.range:
+        try:
+            since_date, until_date = parse_date_range(args.range)
+        except ValueError:
+            since_date = datetime.date.today()
+            until_date = datetime.date.today()
+    else:
+        since_date = datetime.date.today()
+        until_date = datetime.date.today()
+
+    # 2. Override with explicit flags
+    if args.since:
+        try:
+            since_date = parse_relative_date(args.since)
+        except ValueError:
+            pass
+    if args.until:
+        try:
+            until_date = parse_relative_date(args.until)
+        except ValueError:
+            pass
+    return since_date, until_date
+
+def build_repo_filter(args):
+    return RepoFilter(
+        skip_archived=args.skip_archived,
+        skip_forks=args.skip_forks,
+        skip_templates=args.skip_templates,
+        topics=split_csv(args.repo_topic),
+        languages=split_csv(args.repo_language),
+        globs=split_csv(args.repo_glob),
+    )
+
+def print_request_stats():
+    """Report request coalescing, hedging and the adaptive concurrency (see api.run_gh_cmd)."""
+    calls, saved = get_request_stats()
+    if saved:
+        print(f"{Colors.CYAN}[INFO]{Colors.ENDC} {calls} API requests made, {saved} duplicate requests served from in-flight or earlier identical ones")
+    hedger = get_hedger()
+    if hedger and hedger.hedged:
+        print(f"{Colors.CYAN}[INFO]{Colors.ENDC} {hedger.hedged} of {hedger.requests} commit detail requests hedged, "
+              f"{hedger.hedge_wins} answered first by the duplicate")
+    pool = get_token_pool()
+    if pool and len(pool) > 1:
+        usage = ", ".join(f"{t.label}: {t.requests} requests, {t.remaining.get('core', '?')} core left" for t in pool.tokens)
+        print(f"{Colors.CYAN}[INFO]{Colors.ENDC} Token pool: {usage}")
+    limiter = get_limiter()
+    if limiter.throttled:
+        print(f"{Colors.WARNING}[WARN]{Colors.ENDC} {limiter.throttled} requests hit GitHub secondary rate limits and were retried; "
+              f"concurrency ended at {limiter.limit} (peak {limiter.peak})")
+
+def explain_run(args):
+    """Execution plan section of --dry-run; probes GitHub, so it needs an authenticated gh."""
+    if shutil.which('gh') is None:
+        return "[Execution Plan]\n  (unavailable: 'gh' CLI not installed)\n"
+    authenticated_user = get_current_user()
+    if not authenticated_user:
+        return "[Execution Plan]\n  (unavailable: run 'gh auth login' first)\n"
+    try:
+        batch_users = split_logins(args.users)
+    except OSError as e:
+        return f"[Execution Plan]\n  (unavailable: cannot read --users file: {e})\n"
+    since_date, until_date = resolve_date_range(args)
+    target_user = args.user or (batch_users[0] if batch_users else authenticated_user)
+    orgs = [o.strip() for o in args.orgs.split(',') if o.strip()]
+    events_archive = None if args.no_cache else EventsArchive(args.cache_dir)
+    plan = explain(args, target_user, target_user == authenticated_user, since_date, until_date,
+                   orgs, build_repo_filter(args), events_archive)
+    if len(batch_users) > 1:
+        plan += (f"  (--users: planned for {target_user} only; the other {len(batch_users) - 1} users "
+                 f"add their discovery, and share listings and stats of common repos)\n")
+    return plan
+
+def user_report_filename(output, user, since_date, until_date):
+    """Per-user export name for --users: --output with the login appended, or the default name."""
+    if not output:
+        return f"gh_stats_export_{user}_{since_date}_{until_date}.md"
+    base, extension = os.path.splitext(output)
+    return f"{base}_{user}{extension}"
+
+def run_user_batch(args, users, authenticated_user, since_date, until_date, orgs, repo_filter, path_scope,
+                   events_archive, scan_history, deadline_at, dev_report_header=""):
+    """
+    --users: one scan for several users. Each user's repos are discovered, every repo is
+    listed once without an author filter and each SHA's stats are fetched once (one
+    BatchScan); a user's report only counts their own commits in their own repos. The
+    per-user reports are rendered concurrently.
+    """
+    print(f"{Colors.CYAN}[INFO]{Colors.ENDC} Batch mode: {len(users)} users ({', '.join(users)})")
+    discovery_stop = Deadline(deadline_at)
+    scan = BatchScan(
+        users,
+        since_date=since_date,
+        until_date=until_date,
+        collect_messages=(args.export_commits or args.full_message or args.output is not None),
+        exclude_noise=args.exclude_noise,
+        noise_rules=args.noise_rule or (),
+        merge_policy=args.merges,
+        path_scope=path_scope,
+        # Shared SHAs are attributed per user, as each user's own scan would
+        sha_index=ShaIndex(args.shared_commits),
+        schedule=args.schedule,
+        history=scan_history,
+        deadline=deadline_at,
+        discovery_stop=discovery_stop
+    )
+
+    # Without extra branches, repos stream into the scan as each user's discovery finds them;
+    # with them, the users' active branches of a repo are merged before it is submitted
+    stream_repos = not args.all_branches
+    repos_to_scan = {}
+    branches_map = {}
+    for user in users:
+        def on_repo(full_name, name, branches, user=user):
+            scan.assign(user, full_name)
+            scan.submit(full_name, name)
+
+        user_repos, active_branches_map = discover_repositories(
+            username=user,
+            since_date=since_date,
+            until_date=until_date,
+            orgs=orgs,
+            personal=args.personal,
+            is_self=user.lower() == authenticated_user.lower(),
+            repo_filter=repo_filter,
+            events_archive=events_archive,
+            discovery=args.discovery,
+            on_repo=on_repo if stream_repos else None,
+            should_stop=discovery_stop
+        )
+        if args.all_branches and user_repos:
+            if args.branch_discovery != 'events':
+                active_branches_map = discover_active_branches(user_repos, user, since_date, until_date, active_branches_map)
+            for full_name, branches in active_branches_map.items():
+                branches_map.setdefault(full_name, set()).update(branches)
+        for full_name, name in user_repos:
+            scan.assign(user, full_name)
+            repos_to_scan.setdefault(full_name, name)
+
+    if not repos_to_scan:
+        scan.close()
+        print_styled("No repositories to scan.", Colors.WARNING)
+        return
+    if not stream_repos:
+        scan.submit_all(list(repos_to_scan.items()), branches_map)
+
+    user_stats, _ = scan.finish()
+    print_request_stats()
+
+    def render(user):
+        stats = user_stats[user]
+        highlights = generate_highlights(stats) if args.highlights and stats else None
+        msg_content = generate_markdown(stats, since_date, until_date, full_message=args.full_message) \
+            if args.export_commits or args.full_message else ""
+        if args.output:
+            parts = [generate_markdown_table(stats, since_date, until_date, coverage=scan.coverage)]
+            hl_str = generate_highlights_markdown(highlights) if highlights else ""
+            parts.extend(part for part in (hl_str, msg_content) if part)
+            content = dev_report_header + f"# {user}\n\n" + "\n\n".join(parts)
+            return write_export_file(content, since_date, until_date,
+                                     user_report_filename(args.output, user, since_date, until_date))
+        return stats, highlights, msg_content
+
+    with ThreadPoolExecutor(max_workers=get_jobs()) as pool:
+        reports = list(pool.map(render, users))
+
+    for user, report in zip(users, reports):
+        if args.output:
+            print(f"{Colors.GREEN}[OK]{Colors.ENDC} Exported {user} to: {report}")
+            continue
+        stats, highlights, msg_content = report
+        print_styled(f"\n=== {user} ===", Colors.HEADER, True)
+        print(generate_ascii_table(stats, since_date, until_date, use_colors=True, coverage=scan.coverage))
+        if highlights:
+            print_highlights(highlights)
+        if msg_content:
+            print("\nDetailed Report:\n")
+            print(msg_content)
+
 def main():
     # Force UTF-8 stdout for emoji support on Windows
     try:
@@ -27,10 +218,21 @@ def main():
     parser = create_parser()
     args = parser.parse_args()
 
+    # --deadline counts from the start of the run
+    deadline_at = time.monotonic() + args.deadline if args.deadline else None
+
     # Auto-enable --serve when using serve input/output
     if args.serve_output or args.serve_input:
         args.serve = True
 
+    # --noise-rule implies --exclude-noise
+    if args.noise_rule:
+        args.exclude_noise = True
+
+    # --branch-discovery graphql implies --all-branches
+    if args.branch_discovery != 'events':
+        args.all_branches = True
+
     # Dev mode: extensive diagnostics before execution
     dev_report_header = ""
     if args.dev:
@@ -58,10 +260,21 @@ def main():
         print_styled("[OK] Configuration valid. Proceeding with execution...", Colors.GREEN)
         print("="*40 + "\n")
 
-    # Dry-run mode: show diagnostics and exit
+    set_jobs(args.jobs, args.max_jobs)
+    set_hedging(args.hedge)
+    try:
+        set_tokens(load_tokens(args.token_file))
+    except OSError as e:
+        print_styled(f"Error: cannot read --token-file: {e}", Colors.RED, True)
+        sys.exit(1)
+
+    # Dry-run mode: show diagnostics and the execution plan, then exit
     if args.dry_run:
         _, diag_result = parse_with_diagnostics()
         output = format_diagnostics(diag_result)
+        if diag_result.is_valid:
+            print(f"{Colors.CYAN}[...]{Colors.ENDC} Probing GitHub for the execution plan...", flush=True)
+            output += "\n" + explain_run(args)
         if args.output:
             import datetime as dt
             output_name = args.output
@@ -103,30 +316,11 @@ def main():
     org_limit = args.org_limit
 
     # Date Logic
-    # 1. Start with 'range' preset if exists
-    if args.range:
-        try:
-            since_date, until_date = parse_date_range(args.range)
-        except ValueError:
-            since_date = datetime.date.today()
-            until_date = datetime.date.today()
-    else:
-        since_date = datetime.date.today()
-        until_date = datetime.date.today()
-
-    # 2. Override with explicit flags
-    if args.since:
-        try:
-            since_date = parse_relative_date(args.since)
-        except ValueError:
-            pass
-    if args.until:
-        try:
-            until_date = parse_relative_date(args.until)
-        except ValueError:
-            pass
+    since_date, until_date = resolve_date_range(args)
 
     orgs = [o.strip() for o in args.orgs.split(',') if o.strip()]
+    path_scope = PathScope(args.path or ())
+    repo_filter = build_repo_filter(args)
 
     # Check gh
     if shutil.which('gh') is None:
@@ -142,13 +336,49 @@ def main():
         print_styled("Error: --arena requires --org-summary to be specified.", Colors.RED)
         sys.exit(1)
 
+    # Check author filters require --org-summary
+    for flag in AUTHOR_FILTER_PARAMS:
+        if getattr(args, flag) and not args.org_summary:
+            print_styled(f"Error: --{flag.replace('_', '-')} requires --org-summary to be specified.", Colors.RED)
+            sys.exit(1)
+
+    # Check --users excludes single-target modes
+    try:
+        batch_users = split_logins(args.users)
+    except OSError as e:
+        print_styled(f"Error: cannot read --users file: {e}", Colors.RED, True)
+        sys.exit(1)
+    for flag, value in (("--user", args.user), ("--org-summary", args.org_summary), ("--serve", args.serve)):
+        if batch_users and value:
+            print_styled(f"Error: --users and {flag} are mutually exclusive.", Colors.RED)
+            sys.exit(1)
+
+    # Check --collect-events needs the local cache
+    if args.collect_events and args.no_cache:
+        print_styled("Error: --collect-events and --no-cache are mutually exclusive.", Colors.RED)
+        sys.exit(1)
+
     print_styled("GitHub Contribution Statistics", Colors.HEADER, True)
     print(f"Range: {since_date} to {until_date}")
     if orgs: print(f"Orgs: {', '.join(orgs)}")
     print(f"Personal: {'Yes' if args.personal else 'No'}")
     print(f"Exclude Noise: {'Yes' if args.exclude_noise else 'No'}")
+    if args.merges != 'full': print(f"Merge Commits: {args.merges}")
+    if args.shared_commits != 'prefer-upstream': print(f"Shared Commits: {args.shared_commits}")
+    if args.path: print(f"Paths: {', '.join(args.path)}")
+    if args.deadline: print(f"Deadline: {args.deadline:g}s (partial results past it)")
     print()
 
+    # Per-file diffstats are cached locally so noise rules can be re-applied without refetching
+    # Fetched events are archived too, extending discovery past the Events API's 90 days
+    # Commit rates per repo are kept for longest-first scheduling of the next scans
+    events_archive = None
+    scan_history = None
+    if not args.no_cache:
+        set_diffstat_store(DiffstatStore(args.cache_dir))
+        events_archive = EventsArchive(args.cache_dir)
+        scan_history = ScanHistory(args.cache_dir)
+
     # Auth
     print(f"{Colors.CYAN}[...]{Colors.ENDC} Authenticating...", end="", flush=True)
     authenticated_user = get_current_user()
@@ -161,6 +391,15 @@ def main():
     target_user = args.user if args.user else authenticated_user
     is_self = (target_user == authenticated_user)
     
+    # Collector mode: --collect-events
+    if args.collect_events:
+        print(f"{Colors.CYAN}[...]{Colors.ENDC} Collecting events for {target_user}...", end="", flush=True)
+        new_events = collect_events(target_user, events_archive)
+        covered_since = events_archive.covered_since(target_user)
+        coverage_hint = f", archive covers since {covered_since[:10]}" if covered_since else ""
+        print(f"\r{Colors.GREEN}[OK]{Colors.ENDC} Archived {new_events} new events{coverage_hint}")
+        return
+    
     if not is_self:
         if orgs:
             print(f"{Colors.CYAN}[INFO]{Colors.ENDC} Analyzing user: {target_user} in orgs: {', '.join(orgs)}")
@@ -175,35 +414,70 @@ def main():
             sys.exit(1)
         
         # --arena requires --org-summary (already checked by being inside this block)
-        org = args.org_summary
+        # Several orgs are scanned as one: one pipeline, cache and SHA index for all repos
+        summary_orgs = split_csv(args.org_summary)
+        org = ", ".join(summary_orgs)
         
-        print(f"{Colors.CYAN}[INFO]{Colors.ENDC} Org Summary mode: analyzing organization '{org}'")
+        print(f"{Colors.CYAN}[INFO]{Colors.ENDC} Org Summary mode: analyzing {'organization' if len(summary_orgs) == 1 else 'organizations'} '{org}'")
         
-        # Fetch all org repos
+        # Fetch all org repos (the orgs' lists concurrently)
+        discovery_stop = Deadline(deadline_at)
         repos_to_scan = []
         print(f"{Colors.CYAN}[...]{Colors.ENDC} Fetching organization repos...", end="", flush=True)
-        org_repos = get_org_repos(org, limit=None)
+        with ThreadPoolExecutor(max_workers=len(summary_orgs)) as pool:
+            org_repos = [r for listed in pool.map(lambda o: get_org_repos(o, limit=None, should_stop=discovery_stop), summary_orgs) for r in listed]
         for r in org_repos:
-            repos_to_scan.append((r['full_name'], r['name']))
-        print(f"\r{Colors.GREEN}[OK]{Colors.ENDC} Found {len(repos_to_scan)} repos in {org}")
+            if repo_filter.allows(r):
+                repos_to_scan.append((r['full_name'], r['name']))
+        filtered_hint = f" ({len(org_repos) - len(repos_to_scan)} filtered out)" if len(repos_to_scan) < len(org_repos) else ""
+        print(f"\r{Colors.GREEN}[OK]{Colors.ENDC} Found {len(repos_to_scan)} repos in {org}{filtered_hint}")
         
         if not repos_to_scan:
             print_styled("No repositories found in the specified org.", Colors.WARNING)
             return
         
+        # Author filters are applied to commit lists before any stats are fetched
+        # (with several orgs, members of any of them count)
+        members = None
+        if args.org_members_only:
+            print(f"{Colors.CYAN}[...]{Colors.ENDC} Fetching organization members...", end="", flush=True)
+            with ThreadPoolExecutor(max_workers=len(summary_orgs)) as pool:
+                members = set().union(*pool.map(get_org_members, summary_orgs))
+            print(f"\r{Colors.GREEN}[OK]{Colors.ENDC} Found {len(members)} members in {org}")
+        author_filter = AuthorFilter(
+            include=split_csv(args.include_authors),
+            exclude=split_csv(args.exclude_authors),
+            exclude_bots=args.exclude_bots,
+            members=members,
+        )
+        
         # Scan for team stats
-        team_stats, repos_with_commits = scan_org_team_stats(
-            repos_to_scan=repos_to_scan,
+        scan = TeamScan(
             since_date=since_date,
             until_date=until_date,
+            author_filter=author_filter,
             collect_messages=(args.export_commits or args.full_message or args.output is not None),
-            exclude_noise=args.exclude_noise
+            exclude_noise=args.exclude_noise,
+            noise_rules=args.noise_rule or (),
+            merge_policy=args.merges,
+            path_scope=path_scope,
+            sha_index=ShaIndex(args.shared_commits),
+            schedule=args.schedule,
+            history=scan_history,
+            deadline=deadline_at,
+            discovery_stop=discovery_stop
         )
+        scan.submit_all(repos_to_scan, repo_sizes={r['full_name']: r.get('size') for r in org_repos})
+        team_stats, repos_with_commits = scan.finish()
+        print_request_stats()
         
         if not team_stats:
             print_styled("No commits found in the specified range.", Colors.WARNING)
             return
         
+        # Multi-org runs get a section per org before the combined one (arena, portrait)
+        org_sections = split_team_stats_by_org(team_stats, summary_orgs) if len(summary_orgs) > 1 else {}
+        
         # Output - use new format functions
         from .ui import generate_org_summary_output, generate_org_summary_markdown
         
@@ -243,6 +517,8 @@ def main():
                 team_stats=team_stats,
                 arena=arena_data,
                 org=org,
+                coverage=scan.coverage,
+                org_sections=org_sections or None,
             )
             
             # Write served JSON to disk if requested
@@ -267,7 +543,10 @@ def main():
         
         if args.output:
             print_styled(f"\nGenerating org summary report...", Colors.CYAN)
-            content = generate_org_summary_markdown(team_stats, since_date, until_date, org, args.arena, arena_top)
+            sections = [generate_org_summary_markdown(stats, since_date, until_date, name)
+                        for name, stats in org_sections.items() if stats]
+            sections.append(generate_org_summary_markdown(team_stats, since_date, until_date, org, args.arena, arena_top, coverage=scan.coverage))
+            content = "\n\n---\n\n".join(sections)
             # Prepend dev diagnostics if available
             if dev_report_header:
                 content = dev_report_header + content
@@ -275,10 +554,46 @@ def main():
             filename = write_export_file(content, since_date, until_date, args.output)
             print(f"{Colors.GREEN}[OK]{Colors.ENDC} Exported org summary to: {filename}")
         else:
-            print(generate_org_summary_output(team_stats, since_date, until_date, org, args.arena, arena_top, use_colors=True))
+            for name, stats in org_sections.items():
+                if stats:
+                    print(generate_org_summary_output(stats, since_date, until_date, name, use_colors=True))
+            print(generate_org_summary_output(team_stats, since_date, until_date, org, args.arena, arena_top, use_colors=True, coverage=scan.coverage))
+        return
+    
+    # Batch mode: --users
+    if batch_users:
+        run_user_batch(args, batch_users, authenticated_user, since_date, until_date, orgs, repo_filter, path_scope,
+                       events_archive, scan_history, deadline_at, dev_report_header)
         return
     
     # Normal mode (non-team)
+    # Discovery, commit listing and commit stats run as one pipeline: repos are handed
+    # to the scan as soon as discovery finds them (see scanner.RepoScan)
+    # Deep-search hits double as commit lists with --commits-from-search
+    search_hits = {} if args.commits_from_search else None
+    discovery_stop = Deadline(deadline_at)
+    scan = RepoScan(
+        username=target_user,
+        since_date=since_date,
+        until_date=until_date,
+        search_hits=search_hits,
+        collect_messages=(args.export_commits or args.full_message or args.output is not None),
+        exclude_noise=args.exclude_noise,
+        noise_rules=args.noise_rule or (),
+        merge_policy=args.merges,
+        path_scope=path_scope,
+        sha_index=ShaIndex(args.shared_commits, username=target_user),
+        schedule=args.schedule,
+        history=scan_history,
+        deadline=deadline_at,
+        discovery_stop=discovery_stop
+    )
+
+    # GraphQL branch discovery needs the full repo list, so those repos are handed over afterwards
+    stream_repos = args.branch_discovery == 'events'
+    def on_repo(full_name, name, branches):
+        scan.submit(full_name, name, branches if args.all_branches else None)
+
     # 1. Discovery Phase
     repos_to_scan, active_branches_map = discover_repositories(
         username=target_user,
@@ -286,23 +601,27 @@ def main():
         until_date=until_date,
         orgs=orgs,
         personal=args.personal,
-        is_self=is_self
+        is_self=is_self,
+        repo_filter=repo_filter,
+        events_archive=events_archive,
+        search_hits=search_hits,
+        discovery=args.discovery,
+        on_repo=on_repo if stream_repos else None,
+        should_stop=discovery_stop
     )
 
     if not repos_to_scan:
+        scan.close()
         print_styled("No repositories to scan.", Colors.WARNING)
         return
 
-    # 2. Scanning Phase
-    stats, repos_with_commits = scan_repositories(
-        repos_to_scan=repos_to_scan,
-        active_branches_map=active_branches_map,
-        username=target_user,
-        since_date=since_date,
-        until_date=until_date,
-        collect_messages=(args.export_commits or args.full_message or args.output is not None),
-        exclude_noise=args.exclude_noise
-    )
+    if not stream_repos:
+        active_branches_map = discover_active_branches(repos_to_scan, target_user, since_date, until_date, active_branches_map)
+        scan.submit_all(repos_to_scan, active_branches_map)
+
+    # 2. Scanning Phase (waits for the listing and stats still in flight)
+    stats, repos_with_commits = scan.finish()
+    print_request_stats()
 
     # 3. Output Phase
     highlights = None
@@ -354,6 +673,7 @@ def main():
             user=target_user,
             highlights=highlights,
             portrait=portrait_data,
+            coverage=scan.coverage,
         )
         
         # Write served JSON to disk if requested
@@ -379,7 +699,7 @@ def main():
     if args.output:
         # File Mode: Combine Markdown Table + Highlights + Messages
         print_styled(f"\nGenerating report...", Colors.CYAN)
-        table_str_file = generate_markdown_table(stats, since_date, until_date)
+        table_str_file = generate_markdown_table(stats, since_date, until_date, coverage=scan.coverage)
         
         parts = [table_str_file]
         
@@ -401,7 +721,7 @@ def main():
         print(f"{Colors.GREEN}[OK]{Colors.ENDC} Exported all data to: {filename}")
     else:
         # Console Mode: Print Table (Color) + Highlights + Messages (if any)
-        print(generate_ascii_table(stats, since_date, until_date, use_colors=True))
+        print(generate_ascii_table(stats, since_date, until_date, use_colors=True, coverage=scan.coverage))
         
         if highlights:
             print_highlights(highlights)
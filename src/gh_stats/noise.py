@@ -2,7 +2,9 @@
 Noise file detection for excluding non-human edits.
 """
 
-from typing import Iterable
+import functools
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 
 NOISE_FILENAMES = {
@@ -44,19 +46,189 @@ NOISE_DIR_MARKERS = (
 )
 
 
+NOISE_SUFFIXES = (
+    ".min.js",
+    ".umd.js",
+    ".umd.min.js",
+)
+
+# .gitattributes attributes that mark a path as generated or vendored
+GITATTRIBUTES_NOISE_ATTRS = ("linguist-generated", "linguist-vendored")
+
+# Memoized results per matcher are dropped past this size to keep memory bounded
+MEMO_LIMIT = 200_000
+
+
+def glob_to_regex(pattern: str, recursive: bool = True) -> Optional[str]:
+    """
+    Translate a gitignore-style glob into a regex over a normalized path.
+
+    Patterns without a slash (other than a trailing one) match the basename at any
+    depth; a slash at the start or in the middle anchors the pattern at the repo
+    root. `**` spans directories, `*` and `?` stay within one path segment.
+
+    With `recursive` (user rules), a pattern naming a directory covers everything
+    inside it, and a trailing slash matches only below a directory. Without it, the
+    gitattributes(5) semantics apply: a pattern matches the path itself and not the
+    files inside a directory (`dir/**` does that), and a directory-only pattern
+    (`vendor/`, `/dir/`) matches no file, so None is returned.
+    """
+    pattern = pattern.strip().replace("\\", "/").lower()
+    directory = pattern.endswith("/")
+    if directory and not recursive:
+        return None
+    pattern = pattern.rstrip("/")
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif ch == "*":
+            out.append("[^/]*")
+            i += 1
+        elif ch == "?":
+            out.append("[^/]")
+            i += 1
+        elif ch == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(ch))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        else:
+            out.append(re.escape(ch))
+            i += 1
+
+    regex = "".join(out)
+    if not anchored:
+        regex = f"(?:.*/)?{regex}"
+    if directory:
+        regex += "/.*"
+    elif recursive:
+        # A pattern naming a directory also covers everything inside it
+        regex += "(?:/.*)?"
+    return regex
+
+
+def _gitattributes_regexes(patterns: Iterable[str]) -> List[str]:
+    regexes = (glob_to_regex(p, recursive=False) for p in patterns)
+    return [regex for regex in regexes if regex is not None]
+
+
+def parse_gitattributes(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Extract generated/vendored patterns from a .gitattributes file.
+
+    Returns:
+        (noise_patterns, unset_patterns): paths marked linguist-generated/vendored,
+        and paths where those attributes are explicitly unset (`-attr` or `attr=false`).
+    """
+    noise_patterns = []
+    unset_patterns = []
+    for raw_line in (text or "").splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        pattern, attrs = parts[0], parts[1:]
+        for attr in attrs:
+            negated = attr.startswith("-") or attr.startswith("!")
+            name, _, value = attr.lstrip("-!").partition("=")
+            if name not in GITATTRIBUTES_NOISE_ATTRS:
+                continue
+            if negated or value.lower() == "false":
+                unset_patterns.append(pattern)
+            else:
+                noise_patterns.append(pattern)
+    return noise_patterns, unset_patterns
+
+
+class NoiseMatcher:
+    """
+    Compiled noise matcher.
+
+    Built-in filenames, suffixes and directory markers, user rules and
+    .gitattributes patterns are each folded into a single regex, and results are
+    memoized per path. User rules always win; `.gitattributes` unsets
+    (e.g. `vendor/** -linguist-vendored`) override built-in and generated markers.
+    """
+
+    def __init__(self, extra_markers: Iterable[str] = (), rules: Iterable[str] = (), gitattributes: str = ""):
+        builtin = [
+            "(?:^|.*/)(?:" + "|".join(re.escape(name) for name in sorted(NOISE_FILENAMES)) + ")",
+            ".*(?:" + "|".join(re.escape(suffix) for suffix in NOISE_SUFFIXES) + ")",
+        ]
+        markers = [m.lower().rstrip("/") for m in list(NOISE_DIR_MARKERS) + list(extra_markers)]
+        builtin.append("(?:^|.*/)(?:" + "|".join(re.escape(m) for m in markers) + ")/.*")
+
+        noise_patterns, unset_patterns = parse_gitattributes(gitattributes)
+        builtin.extend(_gitattributes_regexes(noise_patterns))
+
+        self._noise = re.compile("^(?:" + "|".join(builtin) + ")$")
+        self._rules = self._compile([glob_to_regex(r) for r in rules])
+        self._unset = self._compile(_gitattributes_regexes(unset_patterns))
+        self._memo: Dict[str, bool] = {}
+
+    @staticmethod
+    def _compile(regexes: List[str]):
+        if not regexes:
+            return None
+        return re.compile("^(?:" + "|".join(regexes) + ")$")
+
+    def is_noise(self, path: str) -> bool:
+        if not path:
+            return False
+        result = self._memo.get(path)
+        if result is not None:
+            return result
+        normalized = path.replace("\\", "/").lower().lstrip("/")
+        if self._rules is not None and self._rules.match(normalized):
+            result = True
+        elif self._noise.match(normalized):
+            result = self._unset is None or not self._unset.match(normalized)
+        else:
+            result = False
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[path] = result
+        return result
+
+    __call__ = is_noise
+
+
+@functools.lru_cache(maxsize=256)
+def get_noise_matcher(rules: Tuple[str, ...] = (), gitattributes: str = "", extra_markers: Tuple[str, ...] = ()) -> NoiseMatcher:
+    """Shared, cached matcher for a combination of user rules and .gitattributes content."""
+    return NoiseMatcher(extra_markers=extra_markers, rules=rules, gitattributes=gitattributes)
+
+
 def is_noise_path(path: str, extra_markers: Iterable[str] = ()) -> bool:
-    if not path:
-        return False
-    normalized = path.replace("\\", "/").lower()
-    filename = normalized.rsplit("/", 1)[-1]
-    if filename in NOISE_FILENAMES:
-        return True
-    if filename.endswith(".min.js") or filename.endswith(".umd.js") or filename.endswith(".umd.min.js"):
-        return True
-    markers = list(NOISE_DIR_MARKERS) + [m.lower() for m in extra_markers]
-    wrapped = f"/{normalized}"
-    for marker in markers:
-        marker = marker if marker.endswith("/") else f"{marker}/"
-        if f"/{marker}" in wrapped:
-            return True
-    return False
+    return get_noise_matcher(extra_markers=tuple(extra_markers)).is_noise(path)
+
+
+def make_path_filter(exclude_noise: bool = False, matcher: Optional[NoiseMatcher] = None) -> Optional[Callable[[str], bool]]:
+    """Predicate selecting the files that count towards line stats (None counts everything)."""
+    if not exclude_noise:
+        return None
+    matcher = matcher or get_noise_matcher()
+
+    def path_filter(path: str) -> bool:
+        return not matcher.is_noise(path)
+
+    return path_filter
@@ -0,0 +1,104 @@
+"""
+Staged worker pipeline with bounded queues.
+
+Each stage runs on its own worker threads and maps one item to any number of items
+for the next stage. Stages are connected by bounded queues, so a slow stage holds
+back the stages feeding it (backpressure) while the network latency of all stages
+overlaps.
+"""
+import itertools
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List
+
+# Queue slots per worker in front of each stage
+QUEUE_DEPTH = 4
+
+_DONE = object()
+
+
+class Pipeline:
+    """
+    Chain of stages fed with `submit` and drained with `results`.
+
+    `submit` blocks while the first queue is full. The results queue is unbounded,
+    so the submitting thread can keep producing (e.g. run discovery, which may
+    prompt) before it starts consuming; results are small compared to the work items.
+
+    With `prioritized`, the first stage takes queued items lowest priority first
+    (any comparable value, e.g. a tuple; FIFO among equals) instead of in
+    submission order.
+
+    A stage error stops further work: remaining items are drained without being
+    processed, `submit` raises it, and so does `results` once the workers are done.
+    """
+
+    def __init__(self, stages: List[Callable[[object], Iterable]], jobs: int = 1, depth: int = QUEUE_DEPTH,
+                 prioritized: bool = False):
+        jobs = max(1, jobs)
+        self._inboxes = [queue.Queue(maxsize=jobs * depth) for _ in stages]
+        if prioritized:
+            self._inboxes[0] = queue.PriorityQueue(maxsize=jobs * depth)
+        self._seq = itertools.count()
+        self._results = queue.Queue()
+        self._error = None
+        self._closed = False
+        for idx, stage in enumerate(stages):
+            outbox = self._inboxes[idx + 1] if idx + 1 < len(stages) else self._results
+            running = {'workers': jobs, 'lock': threading.Lock()}
+            for _ in range(jobs):
+                threading.Thread(target=self._work, args=(stage, self._inboxes[idx], outbox, running),
+                                 daemon=True).start()
+
+    def _work(self, stage, inbox, outbox, running) -> None:
+        while True:
+            item = inbox.get()
+            if isinstance(inbox, queue.PriorityQueue):
+                item = item[-1]
+            if item is _DONE:
+                # Hand the marker on to the sibling workers; the last one closes the next stage
+                self._put(inbox, _DONE)
+                with running['lock']:
+                    running['workers'] -= 1
+                    last = running['workers'] == 0
+                if last:
+                    outbox.put(_DONE)
+                return
+            if self._error is not None:
+                continue
+            try:
+                for out in stage(item):
+                    outbox.put(out)
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+
+    def _put(self, inbox, item, priority=0) -> None:
+        if isinstance(inbox, queue.PriorityQueue):
+            # The end marker sorts after every item; the sequence number keeps FIFO order
+            # among equal priorities (items themselves need not be comparable)
+            inbox.put((item is _DONE, priority, next(self._seq), item))
+        else:
+            inbox.put(item)
+
+    def submit(self, item, priority=0) -> None:
+        if self._error is not None:
+            raise self._error
+        self._put(self._inboxes[0], item, priority)
+
+    def close(self) -> None:
+        """No more items; the stages finish what is queued and stop."""
+        if not self._closed:
+            self._closed = True
+            self._put(self._inboxes[0], _DONE)
+
+    def results(self) -> Iterator:
+        """Outputs of the last stage in completion order (closes the pipeline first)."""
+        self.close()
+        while True:
+            item = self._results.get()
+            if item is _DONE:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,306 @@
+"""
+Execution plan for --dry-run.
+
+Predicts the API requests a run will make, per phase and per engine (REST core,
+Search, GraphQL), from a handful of cheap probes, and renders them as an
+"explain" tree with the predicted wall time at the configured concurrency: the
+starting --jobs, and with --max-jobs also the best case where adaptive concurrency
+grows to the ceiling right away (the real figure lies in between).
+"""
+import datetime
+from typing import Dict, List, Optional
+
+from .api import (
+    active_branches_from_events, count_listing, get_contributed_repos, get_org_repos, get_rate_limits,
+    get_repo_info, get_search_commit_count, get_user_events, get_user_repos, utc_iso_range, EVENTS_MAX_PAGES,
+)
+from .filters import split_csv
+from .discovery import ORG_REPO_THRESHOLD, SEARCH_REQUEST_WEIGHT, estimate_search_requests, in_discovery_scope, pushed_since
+
+
+ENGINES = ("core", "search", "graphql")
+
+# Typical latency of one request, in seconds
+REQUEST_LATENCY = {"core": 0.4, "search": 0.6, "graphql": 1.0}
+# Seconds per search request once the 30/minute burst is spent
+SEARCH_INTERVAL = 2.0
+SEARCH_BURST = 30
+
+# Repos whose commit counts are probed (org summary: all commits, personal: the user's); the rest is extrapolated
+PLAN_SAMPLE_REPOS = 10
+
+
+class PlanNode:
+    """
+    One step of the plan with its predicted requests per engine.
+
+    Optional nodes are alternatives (e.g. the fallback strategies a prompt offers);
+    they are shown but not counted in the totals.
+    """
+
+    def __init__(self, label: str, requests: Optional[Dict[str, int]] = None, detail: str = "",
+                 jobs: Optional[int] = None, optional: bool = False):
+        self.label = label
+        self.requests = {engine: count for engine, count in (requests or {}).items() if count}
+        self.detail = detail
+        self.jobs = jobs
+        self.optional = optional
+        self.children: List["PlanNode"] = []
+
+    def add(self, label: str, requests: Optional[Dict[str, int]] = None, detail: str = "",
+            jobs: Optional[int] = None, optional: bool = False) -> "PlanNode":
+        child = PlanNode(label, requests, detail, jobs, optional)
+        self.children.append(child)
+        return child
+
+    def total(self) -> Dict[str, int]:
+        totals = dict(self.requests)
+        for child in self.children:
+            if child.optional:
+                continue
+            for engine, count in child.total().items():
+                totals[engine] = totals.get(engine, 0) + count
+        return totals
+
+    def wall_time(self, jobs: int = 1) -> float:
+        """Predicted seconds; a node's own `jobs` overrides the inherited concurrency."""
+        jobs = self.jobs or jobs
+        seconds = 0.0
+        for engine, count in self.requests.items():
+            serial = count * REQUEST_LATENCY[engine]
+            if engine == "search":
+                seconds += max(serial / jobs, max(0, count - SEARCH_BURST) * SEARCH_INTERVAL)
+            elif engine == "graphql":
+                seconds += serial
+            else:
+                seconds += serial / jobs
+        return seconds + sum(child.wall_time(jobs) for child in self.children if not child.optional)
+
+    def render(self, prefix: str = "", jobs: int = 1) -> List[str]:
+        lines = []
+        for idx, child in enumerate(self.children):
+            last = idx == len(self.children) - 1
+            branch = "└── " if last else "├── "
+            cost = format_requests(child.total())
+            if child.optional:
+                cost = f"option: {cost}"
+            text = f"{child.label} [{cost}]" if child.total() or child.optional else child.label
+            if child.detail:
+                text += f" - {child.detail}"
+            lines.append(prefix + branch + text)
+            lines.extend(child.render(prefix + ("    " if last else "│   "), child.jobs or jobs))
+        return lines
+
+
+def format_requests(requests: Dict[str, int]) -> str:
+    parts = [f"{requests[engine]} {engine}" for engine in ENGINES if requests.get(engine)]
+    return ", ".join(parts) if parts else "0 requests"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def _pages(count: int) -> int:
+    return max(1, -(-count // 100))
+
+
+def _plan_scan(root: PlanNode, repo_count: int, commits: int, commits_source: str, args,
+               extra_branches: int = 0, branch_repos: int = 0) -> None:
+    """Listing and stats phases shared by both modes."""
+    listing = root.add("Commit listing", {"core": repo_count + commits // 100},
+                       f"{repo_count} repos, 1 page each plus 1 per 100 commits")
+    if extra_branches:
+        listing.add("Branch compare", {"core": extra_branches + branch_repos},
+                    f"{extra_branches} extra branches in {branch_repos} repos (+1 repo lookup each)", jobs=args.jobs)
+    stats = root.add("Commit stats", {"core": commits},
+                     f"~{commits} commits ({commits_source}); cached diffstats are not refetched")
+    if args.hedge:
+        stats.add("Hedged duplicates", {"core": int(commits * args.hedge / 100)},
+                  f"--hedge: at most {args.hedge:g}% of commit detail requests")
+    if args.exclude_noise:
+        stats.add(".gitattributes", {"core": repo_count}, "1 lookup per repo for linguist attributes")
+    if args.merges != "full":
+        stats.add("Merge commits", {}, f"--merges {args.merges}: merge commits need no stats (fewer requests)")
+
+
+def _plan_personal(root: PlanNode, args, username: str, is_self: bool, since_date, until_date,
+                   orgs: List[str], repo_filter, events_archive=None) -> None:
+    discovery = root.add("Discovery", jobs=1)
+    events, _ = get_user_events(username)
+    pages = min(EVENTS_MAX_PAGES, len(events) // 100 + 1)
+    active = active_branches_from_events(events)
+    personal = args.personal or (not is_self and not orgs)
+    scoped = [r for r in active if in_discovery_scope(r, username, orgs, personal, is_self)]
+    in_scope = {r for r in scoped if repo_filter.allows_full_name(r, get_repo_info)}
+    # Metadata filters fetch each name-matched repo once
+    lookups = sum(1 for r in scoped if repo_filter.allows_name(r)) if repo_filter.needs_metadata else 0
+    discovery.add("Events API", {"core": pages + lookups}, f"{len(active)} active repos, {len(in_scope)} in scope after filters")
+    repos = set(in_scope)
+    if not is_self and orgs:
+        # Events cannot see another user's activity in private org repos: org repos are listed too
+        org_listed = []
+        for org in orgs:
+            org_repos = get_org_repos(org, limit=None)
+            allowed = [r for r in org_repos if repo_filter.allows(r)]
+            org_listed.extend(allowed)
+            discovery.add(f"Org repo list: {org}", {"core": _pages(len(org_repos))},
+                          f"{len(org_repos)} repos, {len(allowed)} after filters")
+        if len(org_listed) > ORG_REPO_THRESHOLD and args.discovery == "auto":
+            org_listed = [r for r in org_listed if pushed_since(r, since_date)]
+        elif len(org_listed) > ORG_REPO_THRESHOLD:
+            discovery.children[-1].detail += " (the prompt may limit or skip org repos; all counted)"
+        repos.update(r['full_name'] for r in org_listed)
+    # One-item search: the user's commits in range on any repo (default branches), for deep search
+    hits = get_search_commit_count(username, since_date, until_date)
+
+    days_ago = (datetime.date.today() - since_date).days
+    if days_ago > 90 and not (events_archive and events_archive.covers(username, since_date)):
+        fallback = discovery.add("Fallback past 90 days", detail=f"--discovery {args.discovery}")
+        years = -(-((until_date - since_date).days + 1) // 365)
+        contributed, complete = get_contributed_repos(username, since_date, until_date)
+        listed = get_user_repos(username, None, is_self=is_self) if personal else []
+        for org in orgs:
+            listed.extend(get_org_repos(org, None))
+        candidates = [r for r in listed if repo_filter.allows(r) and pushed_since(r, since_date)]
+        search_requests = estimate_search_requests(hits or 0)
+
+        if args.discovery == "auto":
+            choice = "contributions" if complete else (
+                "deepsearch" if search_requests * SEARCH_REQUEST_WEIGHT < len(candidates) else "all")
+        else:
+            choice = None
+        list_pages = len(orgs) + (1 if personal else 0) + len(listed) // 100
+        fallback.add("GraphQL contributions", {"graphql": years},
+                     f"{len(contributed)} repos, {'complete' if complete else 'incomplete'}",
+                     optional=choice != "contributions")
+        fallback.add("Full repo scan", {"core": list_pages},
+                     f"{len(candidates)} of {len(listed)} repos pushed since {since_date}",
+                     optional=choice != "all")
+        fallback.add("Deep search", {"search": search_requests}, f"{hits or 0} hits", jobs=args.jobs,
+                     optional=choice != "deepsearch")
+        if choice is None:
+            fallback.detail += " (the prompt picks one option; not counted below)"
+        elif choice == "contributions":
+            repos.update(r for r in contributed if in_discovery_scope(r, username, orgs, personal, is_self))
+        elif choice == "all":
+            repos.update(r['full_name'] for r in candidates)
+
+    if args.branch_discovery == "graphql":
+        discovery.add("GraphQL branch discovery", {"core": 1, "graphql": -(-len(repos) // 10)},
+                      f"{len(repos)} repos in batches of 10")
+
+    commits, commits_source = _sampled_commits(sorted(repos), username, since_date, until_date)
+    if commits is None and hits is not None:
+        commits, commits_source = hits, "upper bound from search: all repos, default branches"
+    elif commits is None:
+        commits, commits_source = 0, "commit probes failed"
+    branch_map = {r: b for r, b in active.items() if r in repos} if args.all_branches else {}
+    extra_branches = sum(len(b) for b in branch_map.values())
+    _plan_scan(root, len(repos), commits, commits_source, args, extra_branches, len(branch_map))
+
+
+def _sample(items: list, count: int) -> list:
+    """Evenly spaced sample (the lists are sorted by push date, so the head is biased)."""
+    if len(items) <= count:
+        return list(items)
+    step = len(items) / count
+    return [items[int(i * step)] for i in range(count)]
+
+
+def _sampled_commits(repos: List[str], username: str, since_date, until_date):
+    """The user's commits in range over the planned repos, extrapolated from a sample: (count, source)."""
+    if not repos:
+        return 0, "no repos"
+    since_iso, until_iso = utc_iso_range(since_date, until_date)
+    sampled = _sample(repos, PLAN_SAMPLE_REPOS)
+    counts = [count_listing(f"repos/{r}/commits?author={username}&since={since_iso}&until={until_iso}") for r in sampled]
+    counts = [c for c in counts if c is not None]
+    if not counts:
+        return None, None
+    return round(sum(counts) / len(counts) * len(repos)), f"{len(counts)} of {len(repos)} planned repos probed"
+
+
+def _plan_org_summary(root: PlanNode, args, orgs: List[str], since_date, until_date, repo_filter) -> None:
+    discovery = root.add("Discovery", jobs=1)
+    repos = []
+    for org in orgs:
+        org_repos = get_org_repos(org, limit=None)
+        allowed = [r for r in org_repos if repo_filter.allows(r)]
+        repos.extend(allowed)
+        label = "Org repo list" if len(orgs) == 1 else f"Org repo list: {org}"
+        discovery.add(label, {"core": _pages(len(org_repos))}, f"{len(org_repos)} repos, {len(allowed)} after filters")
+    if args.org_members_only:
+        discovery.add("Org members", {"core": len(orgs)}, "at least 1 page per org")
+
+    # Repos not pushed since the range start hold no commits in it; sample the others
+    pushed = [r for r in repos if pushed_since(r, since_date)]
+    since_iso, until_iso = utc_iso_range(since_date, until_date)
+    sampled = _sample(pushed, PLAN_SAMPLE_REPOS)
+    counts = [count_listing(f"repos/{r['full_name']}/commits?since={since_iso}&until={until_iso}") for r in sampled]
+    counts = [c for c in counts if c is not None]
+    commits = round(sum(counts) / len(counts) * len(pushed)) if counts else 0
+    commits_source = f"{len(counts)} of {len(pushed)} recently pushed repos probed"
+    _plan_scan(root, len(repos), commits, commits_source, args)
+
+
+def build_plan(args, username: str, is_self: bool, since_date, until_date, orgs: List[str],
+               repo_filter, events_archive=None) -> PlanNode:
+    """Probe GitHub cheaply and predict the requests of the configured run."""
+    # Discovery is sequential; listing and stats run on --jobs pipeline workers each
+    root = PlanNode("Execution plan")
+    if args.org_summary:
+        _plan_org_summary(root, args, split_csv(args.org_summary), since_date, until_date, repo_filter)
+    else:
+        _plan_personal(root, args, username, is_self, since_date, until_date, orgs, repo_filter, events_archive)
+    return root
+
+
+def format_plan(plan: PlanNode, jobs: int, rate_limits: Optional[Dict[str, tuple]] = None,
+                deadline: Optional[float] = None, max_jobs: Optional[int] = None) -> str:
+    """
+    Render the plan as an explain tree plus totals, wall time, deadline and rate-limit fit.
+
+    The wall time assumes concurrency stays at `jobs`; with a higher `max_jobs` the best
+    case at that ceiling is shown too. The deadline check uses the `jobs` figure.
+    """
+    totals = plan.total()
+    wall_time = plan.wall_time(jobs)
+    lines = ["[Execution Plan]"]
+    if max_jobs and max_jobs > jobs:
+        timing = (f"~{format_duration(wall_time)} at --jobs {jobs}, "
+                  f"~{format_duration(plan.wall_time(max_jobs))} if concurrency grows to --max-jobs {max_jobs}")
+    else:
+        timing = f"~{format_duration(wall_time)} at a fixed --jobs {jobs}"
+    lines.append(f"  Total: ~{sum(totals.values())} requests ({format_requests(totals)}), {timing}")
+    if deadline and wall_time > deadline:
+        lines.append(f"  [!] Exceeds --deadline {format_duration(deadline)}: expect a partial report "
+                     f"(~{min(100, 100 * deadline / wall_time):.0f}% of the work)")
+    lines.extend("  " + line for line in plan.render(jobs=jobs))
+    lines.append("")
+    lines.append("[Rate Limit]")
+    if not rate_limits:
+        lines.append("  (unavailable)")
+    for engine in ENGINES:
+        if not rate_limits or engine not in rate_limits:
+            continue
+        remaining, limit, reset = rate_limits[engine]
+        needed = totals.get(engine, 0)
+        reset_at = datetime.datetime.fromtimestamp(reset).strftime('%H:%M') if reset else "?"
+        verdict = "[OK] fits" if needed <= remaining else f"[X] exceeds by {needed - remaining}, resets at {reset_at}"
+        lines.append(f"  {engine}: needs ~{needed}, {remaining}/{limit} remaining - {verdict}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def explain(args, username: str, is_self: bool, since_date, until_date, orgs: List[str],
+            repo_filter, events_archive=None) -> str:
+    plan = build_plan(args, username, is_self, since_date, until_date, orgs, repo_filter, events_archive)
+    return format_plan(plan, args.jobs, get_rate_limits(), args.deadline, args.max_jobs)
@@ -0,0 +1,134 @@
+"""
+Client-side request budgets for rate-limited GitHub endpoints.
+"""
+import threading
+import time
+from typing import Callable
+
+
+class RateBudget:
+    """
+    Token bucket allowing at most `rate` requests per `per` seconds.
+
+    The bucket starts full, so a burst of up to `rate` requests goes out at once and
+    later requests are spaced evenly. `acquire` is thread-safe and blocks outside the
+    lock, so concurrent workers share one budget.
+    """
+
+    def __init__(self, rate: int, per: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.per = per
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(rate)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Wait until a request may be sent, and spend one token."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.per / self.rate
+            self._sleep(wait)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on concurrent API requests.
+
+    The limit grows by one after a full window (as many completions as the current
+    limit) of healthy requests, and is halved when GitHub throttles (403/429 secondary
+    rate limits), on server errors, or when latency stays above `spike_factor` times
+    the running average for `spike_samples` requests in a row (one slow answer, such as
+    a huge commit, is not a sign of overload). At most one cut per window, since the
+    requests in flight at a throttle all fail together. A throttle with Retry-After
+    also pauses every new request until the wait is over.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1, spike_factor: float = 3.0,
+                 spike_samples: int = 3, clock: Callable[[], float] = time.monotonic):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.peak = self.limit
+        self.spike_factor = spike_factor
+        self.spike_samples = max(1, spike_samples)
+        self.throttled = 0
+        self._clock = clock
+        self._in_flight = 0
+        self._window = 0  # healthy completions since the last change
+        self._since_cut = None  # completions since the last cut (None: no cut yet)
+        self._latency = None  # running average of healthy latencies
+        self._samples = 0
+        self._slow = 0  # consecutive completions above the spike threshold
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Wait for a free slot (and for any Retry-After pause to end)."""
+        with self._cond:
+            while True:
+                pause = self._paused_until - self._clock()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self._in_flight >= self.limit:
+                    self._cond.wait()
+                else:
+                    self._in_flight += 1
+                    return
+
+    def _cut(self) -> None:
+        # One cut per window: the other requests in flight saw the same condition
+        if self._since_cut is not None and self._since_cut < self.limit:
+            return
+        self.limit = max(self.minimum, self.limit // 2)
+        self._window = 0
+        self._since_cut = 0
+
+    def release(self, latency: float, healthy: bool = True) -> None:
+        """Return a slot after a completed request; unhealthy means a server error."""
+        with self._cond:
+            self._in_flight -= 1
+            if self._since_cut is not None:
+                self._since_cut += 1
+            slow = (self._latency is not None and self._samples >= 10
+                    and latency > self.spike_factor * self._latency)
+            self._slow = self._slow + 1 if slow else 0
+            if not healthy:
+                self._cut()
+            elif slow:
+                if self._slow >= self.spike_samples:
+                    self._cut()
+                    self._slow = 0
+                    # A lasting shift in latency becomes the new normal
+                    self._latency = 0.9 * self._latency + 0.1 * latency
+            else:
+                self._latency = latency if self._latency is None else 0.9 * self._latency + 0.1 * latency
+                self._samples += 1
+                self._window += 1
+                if self._window >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self.peak = max(self.peak, self.limit)
+                    self._window = 0
+            self._cond.notify_all()
+
+    def throttle(self, retry_after: float) -> None:
+        """Return a slot after a throttled request; pauses new requests for `retry_after` seconds."""
+        with self._cond:
+            self._in_flight -= 1
+            self.throttled += 1
+            if self._since_cut is not None:
+                self._since_cut += 1
+            self._cut()
+            self._paused_until = max(self._paused_until, self._clock() + retry_after)
+            self._cond.notify_all()
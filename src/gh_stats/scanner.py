@@ -1,8 +1,552 @@
+import abc
+import datetime
+import threading
+import time
 from collections import defaultdict
-from .api import get_repo_commits, get_commit_stats
+from .api import commit_matches_author, get_repo_commits, get_cached_diffstat, get_commit_diffstat, get_repo_gitattributes, get_jobs
+from .breakdown import Breakdown
+from .filters import apply_merge_policy, combine_path_filters, commit_author_login, needs_commit_stats
+from .diffstat import is_approximate, summarize
+from .noise import get_noise_matcher, make_path_filter
+from .pipeline import Pipeline
+from .schedule import Deadline, estimate_cost
 from .ui import Colors, print_progress, print_progress_done
 
-def scan_repositories(repos_to_scan, active_branches_map, username, since_date, until_date, collect_messages=False, exclude_noise=False):
+def repo_path_filter(repo_full_name, exclude_noise=False, noise_rules=(), path_scope=None):
+    """
+    Build the file filter for one repo: the --path scope, plus (with exclude_noise)
+    built-in markers, user rules and the repo's own linguist-generated/linguist-vendored
+    attributes.
+    """
+    scope_filter = path_scope.file_filter(repo_full_name) if path_scope else None
+    if not exclude_noise:
+        return scope_filter
+    matcher = get_noise_matcher(tuple(noise_rules), get_repo_gitattributes(repo_full_name))
+    return combine_path_filters(make_path_filter(True, matcher), scope_filter)
+
+def _fetch_diffstat(repo_full_name, sha, path_filter, sha_index=None):
+    if sha_index is None:
+        return get_commit_diffstat(repo_full_name, sha, path_filter)
+    return sha_index.diffstat(sha, lambda: get_commit_diffstat(repo_full_name, sha, path_filter))
+
+def _shared_hint(sha_index):
+    shared = sha_index.shared_count if sha_index else 0
+    return f", {shared} commits shared across repos" if shared else ""
+
+def _message_entry(commit, since_date, added, deleted, collect_messages):
+    """Per-commit entry for Active Days and reports, or None without an author date."""
+    commit_data = commit.get('commit', {})
+    author_date_str = commit_data.get('author', {}).get('date')
+    if not author_date_str:
+        return None
+    try:
+        date_obj = datetime.datetime.fromisoformat(author_date_str.replace('Z', '+00:00')).astimezone()
+    except ValueError:
+        date_obj = datetime.datetime.combine(since_date, datetime.time.min)
+
+    # Always store date and stats, optionally store message
+    msg_entry = {'date': date_obj, 'added': added, 'deleted': deleted}
+    if collect_messages:
+        msg_entry['message'] = commit_data.get('message', '')
+    return msg_entry
+
+class _Counted:
+    """What folding a commit into the results needs from its diffstat (not its file list)."""
+    __slots__ = ("added", "deleted", "breakdown", "approximate", "without_stats")
+
+    def __init__(self, diffstat, path_filter, without_stats=False):
+        self.added, self.deleted = summarize(diffstat, path_filter)
+        self.breakdown = Breakdown()
+        self.breakdown.add_diffstat(diffstat, path_filter)
+        self.approximate = is_approximate(diffstat, path_filter)
+        self.without_stats = without_stats
+
+def _update_messages(messages, msg_entry, sign):
+    if msg_entry and sign > 0:
+        messages.append(msg_entry)
+    elif msg_entry:
+        messages.remove(msg_entry)
+
+def _personal_repo_stats():
+    # {'commits': int, 'added': int, 'deleted': int, 'approximate': int, 'messages': list, 'breakdown': Breakdown}
+    # 'approximate': commits whose line stats are partly estimated (see diffstat.is_approximate)
+    return {'commits': 0, 'added': 0, 'deleted': 0, 'approximate': 0, 'messages': [], 'breakdown': Breakdown()}
+
+def _fold_personal(stats, repo_full_name, commit, counted, since_date, collect_messages, sign=1):
+    """Add one commit to personal stats ({repo: _personal_repo_stats()}); sign=-1 takes it back."""
+    repo_stats = stats[repo_full_name]
+    repo_stats['commits'] += sign
+    repo_stats['added'] += sign * counted.added
+    repo_stats['deleted'] += sign * counted.deleted
+    repo_stats['approximate'] += sign * counted.approximate
+    repo_stats['breakdown'].merge(counted.breakdown, sign=sign)
+    msg_entry = _message_entry(commit, since_date, counted.added, counted.deleted, collect_messages)
+    _update_messages(repo_stats['messages'], msg_entry, sign)
+    if not repo_stats['commits']:
+        del stats[repo_full_name]
+
+class _PipelineScan(abc.ABC):
+    """
+    Streaming scan shared by the personal and team scanners.
+    
+    Repos are submitted one at a time, so discovery can hand them over as it finds
+    them. --jobs workers list commits and as many fetch commit stats, connected by
+    bounded queues (see pipeline.Pipeline). Each commit is folded into the results
+    as soon as its stats arrive, and its file list is dropped; memory grows with the
+    results, not with the commits scanned.
+
+    A SHA listed in several repos can only be attributed (see shaindex.ShaIndex) once
+    every repo is listed, so such commits wait for finish as a compact _Counted. A
+    commit counted before another repo listed its SHA is taken back from its repo
+    at finish if the attribution goes elsewhere.
+    
+    Under the 'longest-first' schedule queued repos are listed costliest first (see
+    schedule.estimate_cost); with a schedule.ScanHistory, each repo's listed commits
+    are recorded for the next run's estimates, keyed by the scan scope.
+    
+    With a `deadline` (a `clock` timestamp), workers stop starting requests once it
+    has passed: repos not yet listed are left out, listings in progress stop before
+    their next page (the repo is reported as partial) and listed commits are counted
+    without line stats. `coverage` then reports how much of the work got done,
+    including whether `discovery_stop` (the schedule.Deadline that guarded the
+    discovery feeding this scan, if any) cut discovery short.
+    """
+    title = "Scanning {} repositories..."
+
+    def __init__(self, since_date, until_date, collect_messages=False, exclude_noise=False, noise_rules=(), merge_policy='full', path_scope=None, sha_index=None, jobs=None, schedule='longest-first', history=None, deadline=None, clock=time.monotonic, discovery_stop=None):
+        self.since_date = since_date
+        self.until_date = until_date
+        self.collect_messages = collect_messages
+        self.exclude_noise = exclude_noise
+        self.noise_rules = noise_rules
+        self.merge_policy = merge_policy
+        self.path_scope = path_scope
+        self.sha_index = sha_index
+        self.schedule = schedule
+        self.history = history
+        self.deadline = deadline
+        self.discovery_stop = discovery_stop
+        self._clock = clock
+        self.coverage = None
+        self._days = (until_date - since_date).days + 1
+        self._repos = []
+        self._submitted = set()
+        self._listed = {}  # {repo_full_name: commits listed}
+        self._path_filters = {}
+        self._queued = 0
+        self._unlisted = set()
+        self._partial = set()
+        self._stats_skipped = 0
+        self._counted = defaultdict(int)  # {repo_full_name: commits counted}
+        self._counted_without_stats = 0
+        self._deferred = defaultdict(list)  # {sha: [(repo_full_name, commit, _Counted)]}
+        self._retractable = {}  # {sha: _Counted of the repo that claimed it}
+        self._lock = threading.Lock()
+        self._pipeline = Pipeline([self._list_stage, self._stats_stage], jobs or get_jobs(),
+                                  prioritized=schedule == 'longest-first')
+
+    def cost(self, repo_full_name, size=None):
+        """Estimated listing cost of a repo (see schedule.estimate_cost)."""
+        return estimate_cost(repo_full_name, self._days, self.history, size, self.history_scope(repo_full_name))
+
+    def history_scope(self, repo_full_name):
+        """What a listing of the repo counts (scan mode, authors, paths), for schedule.ScanHistory."""
+        paths = self.path_scope.paths_for(repo_full_name) if self.path_scope else []
+        return self._scan_mode() + (" paths=" + ",".join(sorted(paths)) if paths else "")
+
+    @abc.abstractmethod
+    def _scan_mode(self):
+        """Scan mode part of history_scope."""
+
+    def submit(self, repo_full_name, repo_name=None, branches=None, size=None):
+        """
+        Queue a repo for listing; blocks while the listing queue is full.
+        `size` is the repo size in KB when known (list payloads), used for scheduling.
+        """
+        if repo_full_name in self._submitted:
+            return
+        self._submitted.add(repo_full_name)
+        self._repos.append(repo_full_name)
+        expected, size = self.cost(repo_full_name, size)
+        # Lowest priority is taken first
+        self._pipeline.submit((repo_full_name, branches), (-expected, -size))
+
+    def submit_all(self, repos_to_scan, active_branches_map=None, repo_sizes=None):
+        """
+        Queue a known repo list. The bounded queue only reorders the repos waiting in
+        it, so under longest-first the whole list is sorted up front.
+        """
+        active_branches_map = active_branches_map or {}
+        repo_sizes = repo_sizes or {}
+        if self.schedule == 'longest-first':
+            repos_to_scan = sorted(repos_to_scan, key=lambda repo: self.cost(repo[0], repo_sizes.get(repo[0])), reverse=True)
+        for repo_full_name, repo_name in repos_to_scan:
+            self.submit(repo_full_name, repo_name, active_branches_map.get(repo_full_name), repo_sizes.get(repo_full_name))
+
+    def close(self):
+        self._pipeline.close()
+
+    @abc.abstractmethod
+    def _list_commits(self, repo_full_name, branches, should_stop):
+        """Commits of a repo in range (list of commit payloads); `should_stop` is checked before each page."""
+
+    @abc.abstractmethod
+    def _fold(self, credit, repo_full_name, commit, counted, sign=1):
+        """Add one counted commit (a _Counted) to the results for a credit; sign=-1 takes it back."""
+
+    def _credits(self, repo_full_name, commit):
+        """Whom a listed commit counts for in the repo, before SHA attribution ((None,): one result set)."""
+        return (None,)
+
+    def _attributed(self, repo_full_name, sha, credit):
+        """Whether the SHA attribution (see shaindex.ShaIndex) counts the commit in the repo for a credit."""
+        return self.sha_index is None or self.sha_index.counts_in(repo_full_name, sha)
+
+    def _defer(self, repo_full_name, commit):
+        """Whether a commit has to wait for finish before it is folded."""
+        return False
+
+    def _count(self, repo_full_name, commit, counted, credits, sign=1, tally=True):
+        with self._lock:
+            for credit in credits:
+                self._fold(credit, repo_full_name, commit, counted, sign)
+            if credits and tally:
+                self._counted[repo_full_name] += sign
+                self._counted_without_stats += sign * counted.without_stats
+
+    def _collect(self, repo_full_name, commit, diffstat, path_filter, without_stats):
+        """Fold a commit whose stats arrived, or keep it for finish (see the class docstring)."""
+        sha = commit['sha']
+        counted = _Counted(diffstat, path_filter, without_stats)
+        index = self.sha_index
+        if not self._defer(repo_full_name, commit) and (index is None or index.claim(sha, repo_full_name)):
+            self._count(repo_full_name, commit, counted, self._credits(repo_full_name, commit))
+            return
+        claimed = index.claimed(sha) if index is not None else None
+        # The claiming repo's share, from the same diffstat, in case the count has to move
+        retract = None
+        if claimed and claimed != repo_full_name and not without_stats and sha not in self._retractable:
+            retract = _Counted(diffstat, self._path_filters.get(claimed))
+        with self._lock:
+            self._deferred[sha].append((repo_full_name, commit, counted))
+            if retract is not None:
+                self._retractable.setdefault(sha, retract)
+
+    def _fold_deferred(self):
+        """Attribute and fold the commits kept for finish, moving claimed ones where needed."""
+        for sha, copies in self._deferred.items():
+            claimed = self.sha_index.claimed(sha) if self.sha_index is not None else None
+            retract = self._retractable.get(sha)
+            if claimed and retract is None:
+                # Its share cannot be recomputed (no stats after the deadline): it stays
+                self.sha_index.pin(sha)
+            for repo_full_name, commit, counted in copies:
+                credits = [c for c in self._credits(repo_full_name, commit) if self._attributed(repo_full_name, sha, c)]
+                self._count(repo_full_name, commit, counted, credits)
+            if claimed and retract is not None:
+                commit = copies[0][1]
+                credits = self._credits(claimed, commit)
+                moved = [c for c in credits if not self._attributed(claimed, sha, c)]
+                self._count(claimed, commit, retract, moved, sign=-1, tally=len(moved) == len(credits))
+        self._deferred.clear()
+        self._retractable.clear()
+
+    def _expired(self):
+        return self.deadline is not None and self._clock() >= self.deadline
+
+    def _list_stage(self, item):
+        repo_full_name, branches = item
+        if self._expired():
+            with self._lock:
+                self._unlisted.add(repo_full_name)
+            return
+        stop = Deadline(self.deadline, self._clock)
+        commits = apply_merge_policy(self._list_commits(repo_full_name, branches, stop), self.merge_policy)
+        if stop.stopped:
+            with self._lock:
+                self._partial.add(repo_full_name)
+        needs_stats = {c['sha'] for c in commits if needs_commit_stats(c, self.merge_policy)}
+        if self.sha_index is not None:
+            self.sha_index.add(repo_full_name, commits, needs_stats)
+        path_filter = repo_path_filter(repo_full_name, self.exclude_noise, self.noise_rules, self.path_scope) if commits else None
+        with self._lock:
+            self._listed[repo_full_name] = len(commits)
+            self._path_filters[repo_full_name] = path_filter
+            self._queued += len(commits)
+        for commit in commits:
+            yield repo_full_name, commit, path_filter, commit['sha'] in needs_stats
+
+    def _stats_stage(self, item):
+        repo_full_name, commit, path_filter, needs_stats = item
+        sha = commit['sha']
+        diffstat, without_stats = None, False
+        if needs_stats and self._expired():
+            # Only what needs no request: fetched for another repo this run, or stored locally
+            diffstat = self.sha_index.fetched_diffstat(sha) if self.sha_index is not None else None
+            if diffstat is None:
+                diffstat = get_cached_diffstat(repo_full_name, sha)
+            if diffstat is None:
+                without_stats = True
+                with self._lock:
+                    self._stats_skipped += 1
+        elif needs_stats:
+            diffstat = _fetch_diffstat(repo_full_name, sha, path_filter, self.sha_index)
+        self._collect(repo_full_name, commit, diffstat, path_filter, without_stats)
+        yield repo_full_name, sha
+
+    def finish(self):
+        """Wait for all submitted repos and fold what is left; returns the repos with commits."""
+        total = len(self._repos)
+        print(f"\n{Colors.BOLD}{self.title.format(total)}{Colors.ENDC}\n")
+        done = 0
+        for repo_full_name, _ in self._pipeline.results():
+            done += 1
+            print_progress(len(self._listed), total, repo_full_name, f"stats {done}/{self._queued}")
+        self._fold_deferred()
+        repos_with_commits = sum(1 for count in self._counted.values() if count > 0)
+        
+        print_progress(total, total, "Complete", "")
+        if self.deadline is not None:
+            self.coverage = self._coverage(sum(self._counted.values()), self._counted_without_stats)
+        if self.history is not None:
+            for repo_full_name, listed in self._listed.items():
+                if repo_full_name in self._partial:
+                    continue  # a cut-short listing would understate the repo
+                self.history.record(repo_full_name, listed, self._days, self.history_scope(repo_full_name))
+            self.history.save()
+        return repos_with_commits
+
+    def _deadline_hint(self):
+        if not self.coverage or not self.coverage['deadline_exceeded']:
+            return ""
+        partial_hint = f", {self.coverage['repos_partial']} partially listed" if self.coverage['repos_partial'] else ""
+        discovery_hint = "" if self.coverage['discovery_complete'] else ", discovery cut short"
+        return (f", deadline reached: {len(self._unlisted)} repos not listed{partial_hint}{discovery_hint}, "
+                f"{self.coverage['commits_without_stats']} commits without stats (~{self.coverage['completeness']:.0f}% complete)")
+
+    def _coverage(self, counted, without_stats):
+        """
+        Coverage metadata of a deadline-bound scan.
+        
+        Completeness is the share of commits with line stats among the counted commits
+        plus those expected in unlisted repos and beyond the listed part of partial
+        ones: their commit rate from previous scans, else the average of the listed
+        repos. Repos that discovery did not reach cannot be estimated;
+        `discovery_complete` tells whether there may be any.
+        """
+        listed = len(self._listed)
+        average = counted / listed if listed else 0
+        expected_missing = 0
+        for repo_full_name in self._unlisted | self._partial:
+            expected = self.history.estimate(repo_full_name, self._days, self.history_scope(repo_full_name)) if self.history else None
+            expected = average if expected is None else expected
+            if repo_full_name in self._partial:
+                expected = max(0, expected - self._listed[repo_full_name])
+            expected_missing += expected
+        expected_total = counted + expected_missing
+        if expected_total:
+            completeness = 100 * (counted - without_stats) / expected_total
+        else:
+            completeness = 0.0 if self._unlisted else 100.0
+        discovery_complete = not (self.discovery_stop is not None and self.discovery_stop.stopped)
+        return {
+            'repos_scanned': listed - len(self._partial),
+            'repos_partial': len(self._partial),
+            'repos_total': len(self._repos),
+            'commits': counted,
+            'commits_without_stats': without_stats,
+            'completeness': round(completeness, 1),
+            'discovery_complete': discovery_complete,
+            'deadline_exceeded': bool(self._unlisted or self._partial or self._stats_skipped or not discovery_complete),
+        }
+
+class RepoScan(_PipelineScan):
+    """
+    Personal scan: commits by `username`, aggregated per repo.
+    
+    See scan_repositories for the arguments; `branches` passed to submit are the
+    extra branches to list besides the default branch.
+    """
+
+    def __init__(self, username, since_date, until_date, search_hits=None, **kwargs):
+        super().__init__(since_date, until_date, **kwargs)
+        self.username = username
+        self.search_hits = search_hits
+        self.from_search = 0
+        self.stats = defaultdict(_personal_repo_stats)
+
+    def _list_commits(self, repo_full_name, branches, should_stop):
+        path_scope = self.path_scope
+        hit = self.search_hits.get(repo_full_name) if self.search_hits else None
+        if hit and hit['complete'] and not branches and not (path_scope and path_scope.paths_for(repo_full_name)):
+            with self._lock:
+                self.from_search += 1
+            return hit['commits']
+        list_paths = path_scope.list_paths(repo_full_name) if path_scope else None
+        return get_repo_commits(repo_full_name, self.username, self.since_date, self.until_date, branches,
+                                paths=list_paths, should_stop=should_stop)
+
+    def _scan_mode(self):
+        return f"user={self.username.lower()}"
+
+    def _fold(self, credit, repo_full_name, commit, counted, sign=1):
+        _fold_personal(self.stats, repo_full_name, commit, counted, self.since_date, self.collect_messages, sign)
+
+    def finish(self):
+        repos_with_commits = super().finish()
+        search_hint = f", {self.from_search} listed from search hits" if self.from_search else ""
+        print_progress_done(f"Scanned {len(self._repos)} repos, {repos_with_commits} with commits{search_hint}{_shared_hint(self.sha_index)}{self._deadline_hint()}")
+        return self.stats, repos_with_commits
+
+class TeamScan(_PipelineScan):
+    """Org scan: commits by every author, aggregated per author (see scan_org_team_stats)."""
+    title = "Scanning {} repositories for team stats..."
+
+    def __init__(self, since_date, until_date, author_filter=None, **kwargs):
+        super().__init__(since_date, until_date, **kwargs)
+        self.author_filter = author_filter
+        self.filtered_commits = 0
+        # Structure: {author: {commits, added, deleted, repos: {repo: {commits, added, deleted, breakdown}}, messages: [], breakdown}}
+        self.team_stats = defaultdict(lambda: {
+            'commits': 0, 'added': 0, 'deleted': 0, 'approximate': 0,
+            'repos': defaultdict(lambda: {'commits': 0, 'added': 0, 'deleted': 0, 'approximate': 0, 'breakdown': Breakdown()}),
+            'messages': [],
+            'breakdown': Breakdown(),
+        })
+
+    def _list_commits(self, repo_full_name, branches, should_stop):
+        from .api import get_repo_all_commits
+        
+        list_paths = self.path_scope.list_paths(repo_full_name) if self.path_scope else None
+        commits = get_repo_all_commits(repo_full_name, self.since_date, self.until_date, paths=list_paths, branches=branches,
+                                       should_stop=should_stop)
+        if commits and self.author_filter:
+            kept = [c for c in commits if self.author_filter.allows(c)]
+            with self._lock:
+                self.filtered_commits += len(commits) - len(kept)
+            commits = kept
+        return commits
+
+    def _scan_mode(self):
+        described = self.author_filter.describe() if self.author_filter else ""
+        return f"team {described}" if described else "team"
+
+    def _fold(self, credit, repo_full_name, commit, counted, sign=1):
+        author = commit_author_login(commit)
+        author_stats = self.team_stats[author]
+        repo_stats = author_stats['repos'][repo_full_name]
+        for bucket, root in ((author_stats, repo_full_name), (repo_stats, None)):
+            bucket['commits'] += sign
+            bucket['added'] += sign * counted.added
+            bucket['deleted'] += sign * counted.deleted
+            bucket['approximate'] += sign * counted.approximate
+            bucket['breakdown'].merge(counted.breakdown, root, sign)
+        msg_entry = _message_entry(commit, self.since_date, counted.added, counted.deleted, self.collect_messages)
+        if msg_entry:
+            msg_entry['repo'] = repo_full_name
+        _update_messages(author_stats['messages'], msg_entry, sign)
+        if not repo_stats['commits']:
+            del author_stats['repos'][repo_full_name]
+        if not author_stats['commits']:
+            del self.team_stats[author]
+
+    def finish(self):
+        repos_with_commits = super().finish()
+        filtered_hint = f", {self.filtered_commits} commits filtered out" if self.filtered_commits else ""
+        print_progress_done(f"Scanned {len(self._repos)} repos, {repos_with_commits} with commits{filtered_hint}{_shared_hint(self.sha_index)}{self._deadline_hint()}")
+        return dict(self.team_stats), repos_with_commits
+
+class BatchScan(_PipelineScan):
+    """
+    --users scan: personal stats for several users, with each repo listed and each
+    commit's stats fetched once for all of them.
+
+    Every user keeps their own repo set (see assign). A commit counts for a user only
+    in one of their repos and when it matches them as the commits API `author=`
+    filter would (login or email, see api.commit_matches_author); with a ShaIndex, a
+    SHA in several of their repos is attributed as in a scan of that user alone.
+    """
+    title = "Scanning {} repositories for batch reports..."
+
+    def __init__(self, users, since_date, until_date, **kwargs):
+        super().__init__(since_date, until_date, **kwargs)
+        self.users = list(users)
+        self.user_repos = {user: set() for user in self.users}
+        self.filtered_commits = 0
+        # Structure: {user: {repo: personal repo stats, as RepoScan returns}}
+        self.stats = {user: defaultdict(_personal_repo_stats) for user in self.users}
+
+    def assign(self, user, repo_full_name):
+        """Add a repo to a user's set; it still has to be submitted (once for all users)."""
+        with self._lock:
+            self.user_repos[user].add(repo_full_name)
+
+    def _list_commits(self, repo_full_name, branches, should_stop):
+        from .api import get_repo_all_commits
+
+        list_paths = self.path_scope.list_paths(repo_full_name) if self.path_scope else None
+        commits = get_repo_all_commits(repo_full_name, self.since_date, self.until_date, paths=list_paths, branches=branches,
+                                       should_stop=should_stop)
+        # Repo sets still grow while discovery runs, so commits by any of the users are kept
+        kept = [c for c in commits if any(commit_matches_author(c, user) for user in self.users)]
+        with self._lock:
+            self.filtered_commits += len(commits) - len(kept)
+        return kept
+
+    def _scan_mode(self):
+        return "users=" + ",".join(sorted(user.lower() for user in self.users))
+
+    def _credits(self, repo_full_name, commit):
+        return [user for user in self.users
+                if repo_full_name in self.user_repos[user] and commit_matches_author(commit, user)]
+
+    def _attributed(self, repo_full_name, sha, user):
+        return self.sha_index is None or self.sha_index.counts_in(repo_full_name, sha, user, self.user_repos[user])
+
+    def _defer(self, repo_full_name, commit):
+        # Repo sets still grow while discovery runs: a user's commit in a repo not (yet)
+        # in their set waits for finish
+        return any(repo_full_name not in self.user_repos[user] and commit_matches_author(commit, user)
+                   for user in self.users)
+
+    def _fold(self, user, repo_full_name, commit, counted, sign=1):
+        _fold_personal(self.stats[user], repo_full_name, commit, counted, self.since_date, self.collect_messages, sign)
+
+    def finish(self):
+        repos_with_commits = super().finish()
+        filtered_hint = f", {self.filtered_commits} commits by other authors skipped" if self.filtered_commits else ""
+        print_progress_done(f"Scanned {len(self._repos)} repos, {repos_with_commits} with commits{filtered_hint}{_shared_hint(self.sha_index)}{self._deadline_hint()}")
+        return {user: dict(stats) for user, stats in self.stats.items()}, repos_with_commits
+
+def split_team_stats_by_org(team_stats, orgs):
+    """
+    Per-org views of a multi-org TeamScan result: {org: team_stats limited to its repos}.
+    Authors without commits in an org are left out of its view; orgs keep the given order.
+    """
+    by_owner = {org.lower(): org for org in orgs}
+    views = {org: {} for org in orgs}
+    for author, data in team_stats.items():
+        for repo_full_name, repo_stats in data['repos'].items():
+            org = by_owner.get(repo_full_name.split('/')[0].lower())
+            if org is None:
+                continue
+            view = views[org].setdefault(author, {
+                'commits': 0, 'added': 0, 'deleted': 0, 'approximate': 0, 'repos': {}, 'messages': [],
+                'breakdown': Breakdown(),
+            })
+            view['repos'][repo_full_name] = repo_stats
+            view['commits'] += repo_stats['commits']
+            view['added'] += repo_stats['added']
+            view['deleted'] += repo_stats['deleted']
+            view['approximate'] += repo_stats.get('approximate', 0)
+            view['breakdown'].merge(repo_stats['breakdown'], root=repo_full_name)
+        for msg in data['messages']:
+            org = by_owner.get(msg.get('repo', '').split('/')[0].lower())
+            if org is not None and author in views[org]:
+                views[org][author]['messages'].append(msg)
+    return views
+
+def scan_repositories(repos_to_scan, active_branches_map, username, since_date, until_date, collect_messages=False, exclude_noise=False, noise_rules=(), merge_policy='full', path_scope=None, sha_index=None, search_hits=None, jobs=None, schedule='longest-first', history=None):
     """
     Scan the provided repositories for commits and statistics.
     
@@ -13,129 +557,59 @@ def scan_repositories(repos_to_scan, active_branches_map, username, since_date,
         since_date: Start date
         until_date: End date
         collect_messages: If True, detailed commit messages are collected
+        exclude_noise: If True, noise files are left out of line stats and breakdowns
+        noise_rules: Extra user glob patterns treated as noise
+        merge_policy: 'skip' drops merge commits, 'count-only' counts them without
+                      fetching stats, 'full' fetches stats like any other commit
+        path_scope: Optional filters.PathScope; commits are listed with the API `path=`
+                    filter and line stats only count the scoped files
+        sha_index: Optional shaindex.ShaIndex. A SHA listed in several repos (fork and
+                   upstream, mirrors) is fetched once and counted where the index's
+                   policy attributes it
+        search_hits: Optional deep-search hits (see api.search_user_commits). A repo with
+                     complete hits uses them as its commit list instead of being listed;
+                     search only covers default branches and has no path filter, so
+                     repos with extra branches or a path scope are still listed
+        jobs: Workers per stage (listing, stats); defaults to --jobs
+        schedule: 'longest-first' lists the repos with the most expected commits (from
+                  `history`) or the largest size first; 'fifo' keeps the given order
+        history: Optional schedule.ScanHistory with commit rates from previous runs;
+                 updated with this run's listings
+    
+    To stream repos in while they are discovered, use RepoScan directly.
         
     Returns:
-        stats: defaultdict containing commit counts, line changes, and optionally messages
+        stats: defaultdict containing commit counts, line changes, language/path breakdown,
+               and optionally messages
         repos_with_commits: Count of repos found to have relevant commits
     """
-    print(f"\n{Colors.BOLD}Scanning {len(repos_to_scan)} repositories...{Colors.ENDC}\n")
-    # stats dict structure: {'commits': int, 'added': int, 'deleted': int, 'messages': list}
-    stats = defaultdict(lambda: {'commits': 0, 'added': 0, 'deleted': 0, 'messages': []})
-    repos_with_commits = 0
-    
-    import datetime
-    
-    for idx, (repo_full_name, repo_name) in enumerate(repos_to_scan):
-        print_progress(idx, len(repos_to_scan), repo_full_name, "checking...")
-        
-        # Determine strict branches to check if we have data
-        target_branches = active_branches_map.get(repo_full_name) # Returns Set or None
-        
-        commits = get_repo_commits(repo_full_name, username, since_date, until_date, target_branches)
-        if commits:
-            repos_with_commits += 1
-            total_commits = len(commits)
-            for commit_idx, commit in enumerate(commits, 1):
-                print_progress(idx, len(repos_to_scan), repo_full_name, f"fetching stats {commit_idx}/{total_commits}")
-                stats[repo_full_name]['commits'] += 1
-                added, deleted = get_commit_stats(repo_full_name, commit['sha'], exclude_noise=exclude_noise)
-                stats[repo_full_name]['added'] += added
-                stats[repo_full_name]['deleted'] += deleted
-                
-                # Always extract date for Active Days stat
-                commit_data = commit.get('commit', {})
-                author_date_str = commit_data.get('author', {}).get('date')
-                
-                if author_date_str:
-                    try:
-                        dt = datetime.datetime.fromisoformat(author_date_str.replace('Z', '+00:00')).astimezone()
-                        date_obj = dt
-                    except ValueError:
-                        date_obj = datetime.datetime.combine(since_date, datetime.time.min)
-                    
-                    # Always store date and stats, optionally store message
-                    msg_entry = {'date': date_obj, 'added': added, 'deleted': deleted}
-                    if collect_messages:
-                        message = commit_data.get('message', '')
-                        msg_entry['message'] = message
-                    
-                    stats[repo_full_name]['messages'].append(msg_entry)
-    
-    print_progress(len(repos_to_scan), len(repos_to_scan), "Complete", "")
-    print_progress_done(f"Scanned {len(repos_to_scan)} repos, {repos_with_commits} with commits")
-    
-    return stats, repos_with_commits
+    scan = RepoScan(username, since_date, until_date, search_hits=search_hits, collect_messages=collect_messages,
+                    exclude_noise=exclude_noise, noise_rules=noise_rules, merge_policy=merge_policy,
+                    path_scope=path_scope, sha_index=sha_index, jobs=jobs, schedule=schedule, history=history)
+    scan.submit_all(repos_to_scan, active_branches_map)
+    return scan.finish()
 
-def scan_org_team_stats(repos_to_scan, since_date, until_date, collect_messages=False, exclude_noise=False):
+def scan_org_team_stats(repos_to_scan, since_date, until_date, collect_messages=False, exclude_noise=False, noise_rules=(), author_filter=None, merge_policy='full', path_scope=None, sha_index=None, jobs=None, schedule='longest-first', history=None, repo_sizes=None):
     """
     Scan org repositories and aggregate stats by author.
     
+    Args:
+        author_filter: Optional filters.AuthorFilter applied to the commit list
+                       before any stats are fetched, so excluded commits cost nothing
+        merge_policy: See scan_repositories
+        path_scope: See scan_repositories
+        sha_index: See scan_repositories
+        jobs: See scan_repositories
+        schedule: See scan_repositories
+        history: See scan_repositories
+        repo_sizes: Optional {repo_full_name: size in KB} from the org repo list, used
+                    to order repos without history under longest-first
+    
     Returns:
-        team_stats: dict {author: {commits, added, deleted, repos: {repo: {...}}, messages: []}}
+        team_stats: dict {author: {commits, added, deleted, repos: {repo: {...}}, messages: [], breakdown}}
     """
-    from .api import get_repo_all_commits, get_commit_stats
-    
-    print(f"\n{Colors.BOLD}Scanning {len(repos_to_scan)} repositories for team stats...{Colors.ENDC}\n")
-    
-    # Structure: {author: {commits, added, deleted, repos: {repo: {commits, added, deleted}}, messages: []}}
-    team_stats = defaultdict(lambda: {
-        'commits': 0, 'added': 0, 'deleted': 0, 
-        'repos': defaultdict(lambda: {'commits': 0, 'added': 0, 'deleted': 0}),
-        'messages': []
-    })
-    repos_with_commits = 0
-    
-    import datetime
-    
-    for idx, (repo_full_name, repo_name) in enumerate(repos_to_scan):
-        print_progress(idx, len(repos_to_scan), repo_full_name, "checking...")
-        
-        commits = get_repo_all_commits(repo_full_name, since_date, until_date)
-        if commits:
-            repos_with_commits += 1
-            total_commits = len(commits)
-            for commit_idx, commit in enumerate(commits, 1):
-                print_progress(idx, len(repos_to_scan), repo_full_name, f"stats {commit_idx}/{total_commits}")
-                
-                # Get author from commit
-                author = commit.get('author', {})
-                if author:
-                    author_login = author.get('login', 'unknown')
-                else:
-                    # Fallback to commit author name
-                    author_login = commit.get('commit', {}).get('author', {}).get('name', 'unknown')
-                
-                # Get stats
-                added, deleted = get_commit_stats(repo_full_name, commit['sha'], exclude_noise=exclude_noise)
-                
-                # Update team stats
-                team_stats[author_login]['commits'] += 1
-                team_stats[author_login]['added'] += added
-                team_stats[author_login]['deleted'] += deleted
-                team_stats[author_login]['repos'][repo_full_name]['commits'] += 1
-                team_stats[author_login]['repos'][repo_full_name]['added'] += added
-                team_stats[author_login]['repos'][repo_full_name]['deleted'] += deleted
-                
-                # Always extract date for Active Days stat
-                commit_data = commit.get('commit', {})
-                author_date_str = commit_data.get('author', {}).get('date')
-                
-                if author_date_str:
-                    try:
-                        dt = datetime.datetime.fromisoformat(author_date_str.replace('Z', '+00:00')).astimezone()
-                        date_obj = dt
-                    except ValueError:
-                        date_obj = datetime.datetime.combine(since_date, datetime.time.min)
-                    
-                    # Always store date and stats, optionally store message
-                    msg_entry = {'date': date_obj, 'repo': repo_full_name, 'added': added, 'deleted': deleted}
-                    if collect_messages:
-                        message = commit_data.get('message', '')
-                        msg_entry['message'] = message
-                    
-                    team_stats[author_login]['messages'].append(msg_entry)
-    
-    print_progress(len(repos_to_scan), len(repos_to_scan), "Complete", "")
-    print_progress_done(f"Scanned {len(repos_to_scan)} repos, {repos_with_commits} with commits")
-    
-    return dict(team_stats), repos_with_commits
+    scan = TeamScan(since_date, until_date, author_filter=author_filter, collect_messages=collect_messages,
+                    exclude_noise=exclude_noise, noise_rules=noise_rules, merge_policy=merge_policy,
+                    path_scope=path_scope, sha_index=sha_index, jobs=jobs, schedule=schedule, history=history)
+    scan.submit_all(repos_to_scan, repo_sizes=repo_sizes)
+    return scan.finish()
@@ -0,0 +1,101 @@
+"""
+Scan scheduling: start the costliest repos first.
+
+Commit listing pages of one repo are fetched one after another, so with parallel
+workers a big repo picked up last dominates the wall time. Under the longest-first
+policy repos are ordered by estimated listing cost: the commit rate seen for the
+repo in previous scans (kept in the local cache), else its size from the repo list
+payload. Per-commit stats are separate pipeline items, so the commits of a big
+repo are spread across all stats workers anyway.
+
+Rates are kept per scan scope (personal or team scan, author and path filters),
+since a filtered listing says little about the size of an unfiltered one.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .diffstat import default_cache_dir
+
+
+# longest-first: estimated costliest repos are listed first; fifo: in discovery order
+SCHEDULES = ("longest-first", "fifo")
+
+
+class Deadline:
+    """
+    Stop check for --deadline: called before each page of a listing, it returns True
+    once the `clock` timestamp `at` has passed (never when `at` is None). `stopped`
+    records whether it ever did, i.e. whether the work it guarded was cut short.
+    """
+
+    def __init__(self, at: Optional[float] = None, clock=time.monotonic):
+        self.at = at
+        self._clock = clock
+        self.stopped = False
+
+    def __call__(self) -> bool:
+        if self.at is not None and self._clock() >= self.at:
+            self.stopped = True
+            return True
+        return False
+
+
+class ScanHistory:
+    """
+    Per-repo commit rate (commits per day of range) observed by previous scans.
+
+    `scope` describes what the listing counted (see scanner._PipelineScan.history_scope);
+    rates of different scopes are kept apart.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.path = os.path.join(cache_dir or default_cache_dir(), 'scan_history.json')
+        self._rates: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, float]:
+        if self._rates is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._rates = json.load(f)
+            except (OSError, ValueError):
+                self._rates = {}
+        return self._rates
+
+    @staticmethod
+    def _key(repo_full_name: str, scope: str) -> str:
+        return f"{repo_full_name} [{scope}]" if scope else repo_full_name
+
+    def estimate(self, repo_full_name: str, days: int, scope: str = "") -> Optional[float]:
+        """Expected commits of a repo over `days`, or None if it was never scanned in this scope."""
+        with self._lock:
+            rate = self._load().get(self._key(repo_full_name, scope))
+        return None if rate is None else rate * days
+
+    def record(self, repo_full_name: str, commits: int, days: int, scope: str = "") -> None:
+        with self._lock:
+            self._load()[self._key(repo_full_name, scope)] = commits / max(1, days)
+
+    def save(self) -> None:
+        with self._lock:
+            rates = self._load()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(rates, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+
+
+def estimate_cost(repo_full_name: str, days: int, history: Optional[ScanHistory] = None,
+                  size: Optional[int] = None, scope: str = "") -> Tuple[float, int]:
+    """
+    Sort key for longest-first scheduling (larger is costlier).
+
+    Commits expected from history come first; the repo size (KB, from list payloads)
+    orders repos without history and breaks ties.
+    """
+    expected = history.estimate(repo_full_name, days, scope) if history else None
+    return (expected or 0.0, size or 0)
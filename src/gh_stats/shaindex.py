@@ -0,0 +1,152 @@
+"""
+Run-wide SHA index: a commit reachable from several scanned repos (a fork and its
+upstream, mirrors) is fetched once and attributed to a single repo.
+"""
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .api import get_repo_info
+from .singleflight import SingleFlight
+
+
+# prefer-upstream: count in the non-fork / parent repo; prefer-org: count in the
+# org-owned repo over a personal one; count-both: count everywhere (stats still fetched once)
+SHARED_COMMIT_POLICIES = ("prefer-upstream", "prefer-org", "count-both")
+
+
+class ShaIndex:
+    """
+    Index of SHA -> repos it was listed in, with attribution per policy.
+
+    Repo metadata is only looked up (via get_repo_info) for repos that actually
+    share a SHA with another repo, so runs without duplicates cost nothing extra.
+    `add` and `diffstat` are thread-safe (the scanner's listing and stats workers).
+
+    A fetched diffstat is kept only until every repo that listed the SHA has asked
+    for it, so the index holds the file lists of commits in flight, not of the run.
+    A scanner counting a commit before all repos are listed `claim`s its SHA; if
+    another repo lists it later, the claim can be taken back or `pin`ned.
+    """
+
+    def __init__(self, policy: str = "prefer-upstream", username: Optional[str] = None,
+                 repo_info: Callable[[str], Dict] = get_repo_info):
+        self.policy = policy
+        self.username = (username or "").lower()
+        self._repo_info = repo_info
+        self._repos_by_sha: Dict[str, List[str]] = defaultdict(list)
+        self._order: Dict[str, int] = {}
+        self._owner_cache: Dict[str, str] = {}
+        self._claims: Dict[str, str] = {}
+        self._pinned: Set[str] = set()
+        self._diffstats = SingleFlight()
+        self._waiting: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, repo_full_name: str, commits: List[Dict], fetched: Optional[Iterable[str]] = None) -> None:
+        """
+        Record a repo's listed commits. `fetched` are the SHAs whose diffstat the repo
+        will ask for (default: all of them).
+        """
+        with self._lock:
+            self._order.setdefault(repo_full_name, len(self._order))
+            for commit in commits:
+                repos = self._repos_by_sha[commit['sha']]
+                if repo_full_name not in repos:
+                    repos.append(repo_full_name)
+            for sha in (fetched if fetched is not None else (c['sha'] for c in commits)):
+                self._waiting[sha] += 1
+
+    def claim(self, sha: str, repo_full_name: str) -> bool:
+        """Claim a SHA for the only repo listing it so far; False once it is shared."""
+        with self._lock:
+            if self._repos_by_sha.get(sha) != [repo_full_name]:
+                return False
+            self._claims[sha] = repo_full_name
+            return True
+
+    def claimed(self, sha: str) -> Optional[str]:
+        with self._lock:
+            return self._claims.get(sha)
+
+    def pin(self, sha: str) -> None:
+        """Attribute a claimed SHA to its claiming repo, whatever the policy ranks first."""
+        with self._lock:
+            self._pinned.add(sha)
+
+    @property
+    def shared_count(self) -> int:
+        """Number of SHAs listed in more than one repo."""
+        return sum(1 for repos in self._repos_by_sha.values() if len(repos) > 1)
+
+    def _rank(self, repo_full_name: str, candidates: List[str], username: str) -> tuple:
+        info = self._repo_info(repo_full_name) or {}
+        is_fork = bool(info.get('fork'))
+        # A fork whose parent/source is also in scope ranks below it
+        upstreams = {(info.get(key) or {}).get('full_name') for key in ('parent', 'source')}
+        forks_in_scope = is_fork and any(c in upstreams for c in candidates)
+        owner = repo_full_name.split('/', 1)[0].lower()
+        is_personal = bool(username) and owner == username
+        order = self._order.get(repo_full_name, len(self._order))
+        if self.policy == "prefer-org":
+            return (is_personal, forks_in_scope, is_fork, order)
+        return (forks_in_scope, is_fork, is_personal, order)
+
+    def owner(self, sha: str, username: Optional[str] = None,
+              within: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        Repo a SHA is attributed to, or None if it should count everywhere.
+
+        `username` and `within` (a set of repos) attribute it as a scan of only that
+        user's repos would, e.g. per user of a --users batch.
+        """
+        repos = self._repos_by_sha.get(sha)
+        if repos and within is not None:
+            repos = [r for r in repos if r in within]
+        if not repos or self.policy == "count-both":
+            return None
+        if sha in self._pinned and self._claims[sha] in repos:
+            return self._claims[sha]
+        if len(repos) == 1:
+            return repos[0]
+        username = (username or "").lower() or self.username
+        key = username + "|" + "|".join(sorted(repos))
+        if key not in self._owner_cache:
+            self._owner_cache[key] = min(repos, key=lambda r: self._rank(r, repos, username))
+        return self._owner_cache[key]
+
+    def counts_in(self, repo_full_name: str, sha: str, username: Optional[str] = None,
+                  within: Optional[Set[str]] = None) -> bool:
+        owner = self.owner(sha, username, within)
+        return owner is None or owner == repo_full_name
+
+    def diffstat(self, sha: str, fetch: Callable[[], object]):
+        """
+        Fetch a commit's diffstat once for the repos listing it, whichever repo asks
+        first; a worker asking while another fetches the same SHA waits for that fetch.
+        """
+        try:
+            return self._diffstats.do(sha, fetch)
+        finally:
+            self._consumed(sha)
+
+    def fetched_diffstat(self, sha: str):
+        """Diffstat already fetched this run, without fetching (None if not fetched); counts as asked."""
+        try:
+            return self._diffstats.peek(sha)
+        finally:
+            self._consumed(sha)
+
+    def _consumed(self, sha: str) -> None:
+        with self._lock:
+            self._waiting[sha] -= 1
+            if self._waiting[sha] > 0:
+                return
+            del self._waiting[sha]
+        # Every repo listing the SHA so far has it; a repo listing it later refetches
+        self._diffstats.forget(sha)
+
+    @property
+    def retained(self) -> int:
+        """Diffstats currently kept for repos that have yet to ask for them."""
+        return len(self._diffstats)
@@ -0,0 +1,103 @@
+"""
+Run-wide request coalescing.
+
+Identical requests come from unrelated places in one run: a repo reached through
+both personal and org discovery, repeated metadata lookups, concurrent workers
+wanting the same commit. Concurrent callers of the same key share one call, and
+completed results are kept (up to a size cap, least recently used dropped first),
+so callers need no coordination of their own.
+"""
+import collections
+import threading
+from typing import Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls per key and memoize their results.
+
+    None results are not memoized (a failed request may be retried later), and
+    `memoize=False` only coalesces in-flight calls (for volatile or bulky results).
+    With a `capacity`, memoized results are dropped least recently used first once
+    their total `sizeof` exceeds it.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, sizeof: Callable[[object], int] = lambda value: 1):
+        self.capacity = capacity
+        self._sizeof = sizeof
+        self._size = 0
+        self._lock = threading.Lock()
+        self._results: "collections.OrderedDict[Hashable, object]" = collections.OrderedDict()
+        self._inflight: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.memo_hits = 0
+
+    def do(self, key: Hashable, fn: Callable[[], object], memoize: bool = True):
+        with self._lock:
+            if key in self._results:
+                self.memo_hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if memoize and call.error is None and call.value is not None:
+                    self._remember(key, call.value)
+            call.done.set()
+        return call.value
+
+    def _remember(self, key: Hashable, value) -> None:
+        size = self._sizeof(value)
+        if self.capacity is not None and size > self.capacity:
+            return
+        self._results[key] = value
+        self._size += size
+        while self.capacity is not None and self._size > self.capacity:
+            _, dropped = self._results.popitem(last=False)
+            self._size -= self._sizeof(dropped)
+
+    def forget(self, key: Hashable) -> None:
+        """Drop a memoized result (no-op if there is none)."""
+        with self._lock:
+            if key in self._results:
+                self._size -= self._sizeof(self._results.pop(key))
+
+    def __len__(self) -> int:
+        """Number of memoized results."""
+        with self._lock:
+            return len(self._results)
+
+    def peek(self, key: Hashable):
+        """Memoized result for a key, without calling or waiting (None if there is none)."""
+        with self._lock:
+            return self._results.get(key)
+
+    @property
+    def saved(self) -> int:
+        """Calls answered without a call of their own."""
+        return self.coalesced + self.memo_hits
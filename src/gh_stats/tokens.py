@@ -0,0 +1,128 @@
+"""
+Pool of GitHub tokens with per-token rate-limit accounting.
+
+One token allows 5,000 core requests per hour, which a large org scan exhausts.
+With several tokens (GH_STATS_TOKENS or --token-file), each request goes to the
+token with the most budget left for its API (core, search, graphql), as reported
+by the x-ratelimit-* headers of that token's responses. A token that cannot see a
+repo (e.g. a private repo outside its grants, which answers 404 for everything in
+it), as confirmed by a request for the repo itself, is not used for that repo again. Without a pool, gh uses its own authentication.
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+# Environment variable with tokens, separated by commas or whitespace
+TOKENS_ENV = 'GH_STATS_TOKENS'
+
+# Budgets assumed for a token before its first response (GitHub's defaults)
+DEFAULT_LIMITS = {'core': 5000, 'search': 30, 'graphql': 5000}
+
+
+class PoolToken:
+    """One credential and its last known budget per API."""
+
+    def __init__(self, value: str, label: str):
+        self.value = value
+        self.label = label
+        self.remaining: Dict[str, int] = dict(DEFAULT_LIMITS)
+        self.reset: Dict[str, float] = {}
+        self.requests = 0
+        self.denied: Set[str] = set()
+        self.granted: Set[str] = set()
+
+    def budget(self, resource: str, now: float) -> int:
+        # The budget is full again after the reset time
+        if resource in self.reset and self.reset[resource] <= now:
+            return DEFAULT_LIMITS.get(resource, 0)
+        return self.remaining.get(resource, DEFAULT_LIMITS.get(resource, 0))
+
+
+class TokenPool:
+    """
+    Route requests to the token with the most remaining budget.
+
+    The first token is the primary identity: requests about the authenticated user
+    (`user`, `user/...`) always use it, so "self" means the same account throughout.
+    """
+
+    def __init__(self, tokens: Iterable[str], clock=time.time):
+        self.tokens: List[PoolToken] = [PoolToken(value, f"token {idx + 1}") for idx, value in enumerate(tokens)]
+        if not self.tokens:
+            raise ValueError("token pool is empty")
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def primary(self) -> PoolToken:
+        return self.tokens[0]
+
+    def choose(self, resource: str, repo: Optional[str] = None, exclude: Iterable[PoolToken] = (),
+               identity: bool = False) -> Optional[PoolToken]:
+        """
+        Token for a request, or None when every token was excluded.
+
+        Tokens denied access to `repo` are avoided while another token is left;
+        `identity` requests only use the primary token. The chosen token's budget is
+        reserved right away, so concurrent requests spread.
+        """
+        exclude = set(exclude)
+        with self._lock:
+            now = self._clock()
+            candidates = [t for t in (self.tokens[:1] if identity else self.tokens) if t not in exclude]
+            allowed = [t for t in candidates if repo is None or repo not in t.denied]
+            if not candidates:
+                return None
+            token = max(allowed or candidates, key=lambda t: t.budget(resource, now))
+            token.remaining[resource] = token.budget(resource, now) - 1
+            token.requests += 1
+            return token
+
+    def update(self, token: PoolToken, headers: Dict[str, str]) -> None:
+        """Record the budget reported by a response (lower-case header names)."""
+        resource = headers.get('x-ratelimit-resource')
+        if not resource:
+            return
+        with self._lock:
+            try:
+                token.remaining[resource] = int(headers['x-ratelimit-remaining'])
+                token.reset[resource] = float(headers['x-ratelimit-reset'])
+            except (KeyError, ValueError):
+                pass
+
+    def deny(self, token: PoolToken, repo: str) -> None:
+        """Remember that a token has no access to a repo."""
+        with self._lock:
+            token.denied.add(repo)
+
+    def grant(self, token: PoolToken, repo: str) -> None:
+        """Remember that a token can see a repo (it answered a request about it)."""
+        with self._lock:
+            token.granted.add(repo)
+
+    def granted(self, token: PoolToken, repo: str) -> bool:
+        with self._lock:
+            return repo in token.granted
+
+
+def parse_tokens(text: str) -> List[str]:
+    """Tokens from text: separated by commas or whitespace, lines starting with # ignored."""
+    lines = [line for line in text.splitlines() if not line.strip().startswith('#')]
+    tokens = []
+    for token in re.split(r'[\s,]+', '\n'.join(lines)):
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def load_tokens(token_file: Optional[str] = None) -> List[str]:
+    """Tokens from --token-file, else from GH_STATS_TOKENS (empty: use gh's own auth)."""
+    if token_file:
+        with open(os.path.expanduser(token_file), 'r', encoding='utf-8') as f:
+            return parse_tokens(f.read())
+    return parse_tokens(os.environ.get(TOKENS_ENV, ''))
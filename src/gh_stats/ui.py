@@ -1,5 +1,7 @@
 import sys
 
+from .breakdown import merge_breakdowns, merge_repo_breakdowns
+
 class Colors:
     HEADER = '\033[95m'
     BLUE = '\033[94m'
@@ -29,7 +31,83 @@ def print_progress_done(message="Complete"):
     sys.stdout.write(f"\r{Colors.GREEN}[✔]{Colors.ENDC} {message}\033[K\n")
     sys.stdout.flush()
 
-def generate_ascii_table(stats, since_date, until_date, use_colors=True):
+def _render_breakdown_lines(breakdown, use_colors=True, top=5):
+    """Render language and top-level directory breakdown for console output."""
+    if not breakdown:
+        return []
+
+    def c(text, color):
+        return f"{color}{text}{Colors.ENDC}" if use_colors else str(text)
+
+    lines = []
+    total = sum(a + d for _, a, d in breakdown.top_languages())
+    lines.append(f"\n{c('Languages:', Colors.BOLD)}")
+    for name, added, deleted in breakdown.top_languages(top):
+        pct = ((added + deleted) / total * 100) if total > 0 else 0
+        lines.append(f"  • {name:<17} {c(f'+{added}', Colors.GREEN)} / {c(f'-{deleted}', Colors.RED)} ({pct:.0f}%)")
+    lines.append(f"\n{c('Top Directories:', Colors.BOLD)}")
+    for name, added, deleted in breakdown.top_paths(top):
+        lines.append(f"  • {name:<17} {c(f'+{added}', Colors.GREEN)} / {c(f'-{deleted}', Colors.RED)}")
+    return lines
+
+def _render_breakdown_markdown(breakdown, top=10):
+    """Render language and top-level directory breakdown as Markdown tables."""
+    if not breakdown:
+        return []
+    lines = []
+    lines.append("### Languages\n")
+    lines.append("| Language | Added | Deleted |")
+    lines.append("|:---------|------:|--------:|")
+    for name, added, deleted in breakdown.top_languages(top):
+        lines.append(f"| {name} | +{added} | -{deleted} |")
+    lines.append("")
+    lines.append("### Top Directories\n")
+    lines.append("| Directory | Added | Deleted |")
+    lines.append("|:----------|------:|--------:|")
+    for name, added, deleted in breakdown.top_paths(top):
+        lines.append(f"| {name} | +{added} | -{deleted} |")
+    return lines
+
+def _render_coverage_lines(coverage, use_colors=True):
+    """Render the coverage of a --deadline scan for console output."""
+    if not coverage:
+        return []
+
+    def c(text, color):
+        return f"{color}{text}{Colors.ENDC}" if use_colors else str(text)
+
+    pct = coverage['completeness']
+    lines = [f"\n{c('Coverage (--deadline):', Colors.BOLD)}"]
+    partial = f" ({coverage['repos_partial']} more partially listed)" if coverage['repos_partial'] else ""
+    lines.append(f"  • Repos Scanned:   {c(coverage['repos_scanned'], Colors.CYAN)} / {coverage['repos_total']}{partial}")
+    if not coverage['discovery_complete']:
+        lines.append(f"  • Discovery:       {c('cut short', Colors.WARNING)} (repos not found are not estimated)")
+    lines.append(f"  • Without Stats:   {c(coverage['commits_without_stats'], Colors.CYAN)} commits (counted, no line changes)")
+    lines.append(f"  • Completeness:    {c(f'~{pct:.0f}%', Colors.GREEN if pct >= 100 else Colors.WARNING)} (estimated)")
+    return lines
+
+def _render_coverage_markdown(coverage):
+    """Render the coverage of a --deadline scan for markdown output."""
+    if not coverage:
+        return []
+    lines = [
+        "**Coverage (--deadline):**",
+        f"- Repos Scanned: {coverage['repos_scanned']} / {coverage['repos_total']}",
+    ]
+    if coverage['repos_partial']:
+        lines.append(f"- Repos Partially Listed: {coverage['repos_partial']}")
+    if not coverage['discovery_complete']:
+        lines.append("- Discovery: cut short (repos not found are not estimated)")
+    lines.append(f"- Commits Without Stats: {coverage['commits_without_stats']}")
+    lines.append(f"- Estimated Completeness: ~{coverage['completeness']:.0f}%")
+    return lines
+
+def _approximate_note(count, marked=False):
+    """Note for commits whose line stats are partly estimated (see diffstat.is_approximate)."""
+    estimated = "lines marked ~ are partly estimated" if marked else "lines partly estimated"
+    return f"{count} commits with truncated file lists ({estimated})"
+
+def generate_ascii_table(stats, since_date, until_date, use_colors=True, coverage=None):
     if not stats:
         return "No commits found in the specified range."
 
@@ -71,19 +149,21 @@ def generate_ascii_table(stats, since_date, until_date, use_colors=True):
     lines.append(f"{sep_char} {h_repo}{sep_char} {h_commits}{sep_char} {h_changes}{sep_char}")
     lines.append(get_sep("├─┼┤"))
 
-    total_commits = total_added = total_deleted = 0
+    total_commits = total_added = total_deleted = total_approximate = 0
     
     for repo, data in sorted(stats.items(), key=lambda x: x[1]['commits'], reverse=True):
         total_commits += data['commits']
         total_added += data['added']
         total_deleted += data['deleted']
+        total_approximate += data.get('approximate', 0)
+        mark = "~" if data.get('approximate') else ""
         
         if use_colors:
-            changes_str = f"{Colors.GREEN}+{data['added']}{Colors.ENDC} / {Colors.RED}-{data['deleted']}{Colors.ENDC}"
+            changes_str = f"{mark}{Colors.GREEN}+{data['added']}{Colors.ENDC} / {Colors.RED}-{data['deleted']}{Colors.ENDC}"
         else:
-            changes_str = f"+{data['added']} / -{data['deleted']}"
+            changes_str = f"{mark}+{data['added']} / -{data['deleted']}"
             
-        visible_len = len(f"+{data['added']} / -{data['deleted']}")
+        visible_len = len(f"{mark}+{data['added']} / -{data['deleted']}")
         padding = col_changes - 1 - visible_len
         
         r_name = c(f"{truncate_middle(repo):<{col_repo-1}}", Colors.CYAN)
@@ -116,13 +196,18 @@ def generate_ascii_table(stats, since_date, until_date, use_colors=True):
     lines.append(f"  • Lines Deleted:   {c(f'-{total_deleted}', Colors.RED)}")
     if active_days > 0:
         lines.append(f"  • Active Days:     {c(active_days, Colors.CYAN)} / {total_days} ({active_pct:.0f}%)")
+    if total_approximate:
+        lines.append(f"  • Approximate:     {c(_approximate_note(total_approximate, marked=True), Colors.WARNING)}")
+    lines.extend(_render_coverage_lines(coverage, use_colors))
+    
+    lines.extend(_render_breakdown_lines(merge_repo_breakdowns(stats), use_colors))
     
     return "\n".join(lines)
 
 def render_table(stats, since_date, until_date):
     print(generate_ascii_table(stats, since_date, until_date, use_colors=True))
 
-def generate_markdown_table(stats, since_date, until_date):
+def generate_markdown_table(stats, since_date, until_date, coverage=None):
     """Generate a proper Markdown table for file output."""
     if not stats:
         return "No commits found in the specified range."
@@ -134,14 +219,15 @@ def generate_markdown_table(stats, since_date, until_date):
     lines.append("| Repository | Commits | Changes |")
     lines.append("|:-----------|--------:|:--------|")
     
-    total_commits = total_added = total_deleted = 0
+    total_commits = total_added = total_deleted = total_approximate = 0
     
     for repo, data in sorted(stats.items(), key=lambda x: x[1]['commits'], reverse=True):
         total_commits += data['commits']
         total_added += data['added']
         total_deleted += data['deleted']
+        total_approximate += data.get('approximate', 0)
         
-        changes_str = f"+{data['added']} / -{data['deleted']}"
+        changes_str = f"{'~' if data.get('approximate') else ''}+{data['added']} / -{data['deleted']}"
         lines.append(f"| {repo} | {data['commits']} | {changes_str} |")
 
     lines.append("")
@@ -157,6 +243,18 @@ def generate_markdown_table(stats, since_date, until_date):
     lines.append(f"- Net Growth: {net_growth:+} lines")
     lines.append(f"- Lines Added: +{total_added}")
     lines.append(f"- Lines Deleted: -{total_deleted}")
+    if total_approximate:
+        lines.append(f"- Approximate: {_approximate_note(total_approximate, marked=True)}")
+    
+    coverage_lines = _render_coverage_markdown(coverage)
+    if coverage_lines:
+        lines.append("")
+        lines.extend(coverage_lines)
+    
+    breakdown_lines = _render_breakdown_markdown(merge_repo_breakdowns(stats))
+    if breakdown_lines:
+        lines.append("")
+        lines.extend(breakdown_lines)
     
     return "\n".join(lines)
 
@@ -453,7 +551,7 @@ def _render_console_portraits(lines, team_stats, all_repos, use_colors):
         lines.append(f"  • {c('📉 Slimming Champion:', Colors.BOLD)} {r['slimming_champion'][0]} ({c(f'{slimming_val}', Colors.RED)} net)")
 
 
-def generate_org_summary_output(team_stats, since_date, until_date, org_name, show_arena=False, arena_top=5, use_colors=True):
+def generate_org_summary_output(team_stats, since_date, until_date, org_name, show_arena=False, arena_top=5, use_colors=True, coverage=None):
     """Generate console output for org-summary mode."""
     lines = []
     
@@ -483,6 +581,11 @@ def generate_org_summary_output(team_stats, since_date, until_date, org_name, sh
     lines.append(f"  • Net Growth:      {c(f'{net_growth:+}', Colors.GREEN if net_growth >= 0 else Colors.RED)} lines")
     lines.append(f"  • Lines Added:     {c(f'+{total_added}', Colors.GREEN)}")
     lines.append(f"  • Lines Deleted:   {c(f'-{total_deleted}', Colors.RED)}")
+    total_approximate = sum(d.get('approximate', 0) for d in team_stats.values())
+    if total_approximate:
+        lines.append(f"  • Approximate:     {c(_approximate_note(total_approximate), Colors.WARNING)}")
+    lines.extend(_render_coverage_lines(coverage, use_colors))
+    lines.extend(_render_breakdown_lines(merge_breakdowns(d.get('breakdown') for d in team_stats.values()), use_colors))
     
     # 2. Project Breakdown
     lines.append("")
@@ -568,7 +671,7 @@ def generate_org_summary_output(team_stats, since_date, until_date, org_name, sh
     return "\n".join(lines)
 
 
-def generate_org_summary_markdown(team_stats, since_date, until_date, org_name, show_arena=False, arena_top=5):
+def generate_org_summary_markdown(team_stats, since_date, until_date, org_name, show_arena=False, arena_top=5, coverage=None):
     """Generate markdown output for org-summary mode."""
     lines = []
     
@@ -593,8 +696,22 @@ def generate_org_summary_markdown(team_stats, since_date, until_date, org_name,
     lines.append(f"- Net Growth: {net_growth:+} lines")
     lines.append(f"- Lines Added: +{total_added}")
     lines.append(f"- Lines Deleted: -{total_deleted}")
+    total_approximate = sum(d.get('approximate', 0) for d in team_stats.values())
+    if total_approximate:
+        lines.append(f"- Approximate: {_approximate_note(total_approximate)}")
     lines.append("")
     
+    coverage_lines = _render_coverage_markdown(coverage)
+    if coverage_lines:
+        lines.extend(coverage_lines)
+        lines.append("")
+    
+    breakdown_lines = _render_breakdown_markdown(merge_breakdowns(d.get('breakdown') for d in team_stats.values()))
+    if breakdown_lines:
+        lines.append("## 🗂️ Languages & Directories\n")
+        lines.extend(breakdown_lines)
+        lines.append("")
+    
     # 2. Project Breakdown
     lines.append("## 📦 Project Breakdown\n")
     lines.append("| Project | Commits | Contributors | Primary Contributor |")
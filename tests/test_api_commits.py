@@ -138,3 +138,56 @@ def test_get_repo_commits_query_construction(mock_run_cmd):
     assert "author=dev_user" in url
     assert "per_page=100" in url
     assert "page=1" in url
+
+def test_get_repo_commits_path_filter(mock_run_cmd):
+    """
+    Verify that each path is pushed down as a `path=` query parameter.
+    """
+    mock_run_cmd.return_value = []
+    
+    get_repo_commits("user/repo", "dev_user", date(2024,1,1), date(2024,1,1), paths=["services/api", "docs"])
+    
+    urls = [call[0][0][1] for call in mock_run_cmd.call_args_list]
+    assert any("path=services/api" in url for url in urls)
+    assert any("path=docs" in url for url in urls)
+
+def _commit(sha, login='dev_user', date='2024-01-01T10:00:00Z'):
+    return {'sha': sha, 'author': {'login': login},
+            'commit': {'author': {'date': date}, 'committer': {'date': date}}}
+
+@pytest.fixture
+def branch_api(mock_run_cmd, mocker):
+    """Fake API: default branch `main`, one commit on it, a feature branch compared against it."""
+    compare = {'total_commits': 2, 'commits': [_commit('f1', login='someone_else'), _commit('f2')]}
+
+    def run(args, silent=False):
+        url = args[1]
+        if url == 'repos/user/repo':
+            return {'default_branch': 'main'}
+        if '/compare/main...feature' in url:
+            return compare
+        if 'sha=feature' in url:
+            return [_commit('f2'), _commit('m1')]
+        return [_commit('m1')]
+
+    mock_run_cmd.side_effect = run
+    return compare
+
+def test_get_repo_commits_lists_only_unique_branch_commits(mock_run_cmd, branch_api):
+    """
+    Verify that extra branches are compared against the default branch instead of re-walked.
+    """
+    commits = get_repo_commits("user/repo", "dev_user", date(2024,1,1), date(2024,1,1), branches={'feature', 'main'})
+    
+    assert [c['sha'] for c in commits] == ['m1', 'f2']
+    urls = [call[0][0][1] for call in mock_run_cmd.call_args_list]
+    assert not any('sha=' in url for url in urls)
+
+def test_get_repo_commits_walks_branches_far_ahead(mock_run_cmd, branch_api):
+    branch_api['total_commits'] = 5000
+    
+    commits = get_repo_commits("user/repo", "dev_user", date(2024,1,1), date(2024,1,1), branches={'feature'})
+    
+    assert sorted(c['sha'] for c in commits) == ['f2', 'm1']
+    urls = [call[0][0][1] for call in mock_run_cmd.call_args_list]
+    assert any('sha=feature' in url for url in urls)
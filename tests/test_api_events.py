@@ -98,3 +98,35 @@ def test_get_active_branches_pagination(mock_run_cmd):
     assert mock_run_cmd.call_count >= 2
     assert 'r1' in active_map
     assert 'r2' in active_map
+
+def _ref(name, date, count):
+    return {'name': name, 'target': {'committedDate': date, 'history': {'totalCount': count}}}
+
+def test_get_repos_active_branches_graphql(mock_run_cmd):
+    """
+    Scenario: branches come from one GraphQL query per repo batch, filtered by tip date and authored commits.
+    """
+    from datetime import date
+    from gh_stats.api import get_repos_active_branches
+
+    refs = {
+        'pageInfo': {'hasNextPage': True, 'endCursor': 'c1'},
+        'nodes': [
+            _ref('feature-x', '2024-01-02T10:00:00Z', 3),
+            _ref('someone-elses', '2024-01-02T09:00:00Z', 0),
+            _ref('stale', '2023-06-01T00:00:00Z', 1),
+        ],
+    }
+    mock_run_cmd.side_effect = [
+        {'node_id': 'U_1'},
+        {'data': {'r0': {'refs': refs}, 'r1': {'refs': {'nodes': []}}}},
+    ]
+
+    result = get_repos_active_branches(['user/repo1', 'org/repo2'], 'user', date(2024, 1, 1), date(2024, 1, 3))
+
+    assert result == {'user/repo1': {'feature-x'}}
+    # One query for both repos; no further page since the last tip is out of range
+    assert mock_run_cmd.call_count == 2
+    query = mock_run_cmd.call_args_list[1][0][0][3]
+    assert 'r0: repository(owner: "user", name: "repo1")' in query
+    assert 'author: {id: "U_1"}' in query
@@ -61,6 +61,27 @@ class TestDerivedValues:
         assert args.arena == True
         assert result.params["arena"].source == ValueSource.DERIVED
 
+    def test_branch_discovery_derives_all_branches(self):
+        """--branch-discovery graphql 应推导出 --all-branches"""
+        args, result = parse_with_diagnostics(["--dry-run", "--branch-discovery=graphql"])
+        
+        assert args.all_branches == True
+        assert result.params["all_branches"].source == ValueSource.DERIVED
+
+    def test_max_jobs_raised_to_jobs(self):
+        """--max-jobs 低于 --jobs 时应提升到 --jobs"""
+        args, result = parse_with_diagnostics(["--dry-run", "--jobs=8", "--max-jobs=2"])
+
+        assert args.max_jobs == 8
+        assert result.params["max_jobs"].source == ValueSource.DERIVED
+
+    def test_max_jobs_defaults_to_no_growth(self):
+        """默认不设 --max-jobs：并发固定为 --jobs"""
+        args, result = parse_with_diagnostics(["--dry-run", "--jobs=8"])
+
+        assert args.max_jobs is None
+        assert result.params["max_jobs"].source == ValueSource.DEFAULT
+
 
 class TestExclusionViolations:
     """测试互斥约束"""
@@ -75,6 +96,13 @@ class TestExclusionViolations:
         assert len(result.exclusion_violations) == 1
         assert "mutually exclusive" in result.exclusion_violations[0]
 
+    def test_users_user_exclusive(self):
+        """--users 和 --user 应互斥"""
+        _, result = parse_with_diagnostics(["--dry-run", "--users=alice,bob", "--user=carol"])
+
+        assert not result.is_valid
+        assert result.exclusion_violations == ["EXCLUSION_CONFLICT: --users and --user are mutually exclusive"]
+
 
 class TestDependencyChecks:
     """测试依赖检查"""
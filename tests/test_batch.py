@@ -0,0 +1,77 @@
+import threading
+from datetime import date
+from gh_stats import main
+from gh_stats.args import create_parser
+from gh_stats.filters import RepoFilter, split_logins
+from gh_stats.scanner import BatchScan
+from gh_stats.shaindex import ShaIndex
+
+def commit(sha, login, email=None):
+    return {'sha': sha, 'author': {'login': login} if login else None,
+            'commit': {'author': {'name': login or 'someone', 'email': email, 'date': '2024-01-02T10:00:00Z'},
+                       'message': f'{sha} by {login}'}}
+
+COMMITS = {
+    'acme/api': [commit('a1', 'Alice'), commit('a2', 'bob'), commit('a3', 'carol')],
+    # acme/web is only among bob's repos: alice's commit there is not hers to report
+    'acme/web': [commit('w1', 'bob'), commit('w2', 'alice')],
+}
+
+def test_split_logins_reads_files(tmp_path):
+    users = tmp_path / 'team.txt'
+    users.write_text("alice\n# on leave\nBob  # backend\nbob\n", encoding='utf-8')
+    assert split_logins(f'@{users}') == ['alice', 'Bob']
+    assert split_logins('alice, bob') == ['alice', 'bob']
+
+def test_users_share_listings_and_stats(mocker, tmp_path):
+    def discover(username, on_repo=None, **kwargs):
+        repos = [('acme/api', 'api')] + ([('acme/web', 'web')] if username == 'bob' else [])
+        for full_name, name in repos:
+            on_repo(full_name, name, set())
+        return repos, {}
+
+    mocker.patch.object(main, 'discover_repositories', side_effect=discover)
+    listed = []
+    lock = threading.Lock()
+
+    def list_commits(repo, *args, **kwargs):
+        with lock:
+            listed.append(repo)
+        return COMMITS[repo]
+
+    mocker.patch('gh_stats.api.get_repo_all_commits', side_effect=list_commits)
+    diffstat = mocker.patch('gh_stats.scanner.get_commit_diffstat', return_value=(5, 1, [('a.py', 5, 1)]))
+    args = create_parser().parse_args(['--users', 'alice,bob', '--output', str(tmp_path / 'weekly.md')])
+
+    main.run_user_batch(args, ['alice', 'bob'], 'alice', date(2024, 1, 1), date(2024, 1, 7), [], RepoFilter(),
+                        None, None, None, None)
+
+    # Each repo is listed once for both users; carol's commit is never fetched
+    assert sorted(listed) == ['acme/api', 'acme/web']
+    assert sorted(call.args[1] for call in diffstat.call_args_list) == ['a1', 'a2', 'w1', 'w2']
+    alice = (tmp_path / 'weekly_alice.md').read_text(encoding='utf-8')
+    bob = (tmp_path / 'weekly_bob.md').read_text(encoding='utf-8')
+    assert 'acme/web' not in alice and 'acme/api' in alice
+    assert 'acme/web' in bob
+
+def test_commits_count_per_user_identity_and_repo_set(mocker):
+    commits = {
+        'acme/app': [commit('c1', None, 'dev@acme.dev'), commit('c2', 'bob')],
+        'bob/app': [commit('c2', 'bob')],
+    }
+    mocker.patch('gh_stats.api.get_repo_all_commits', side_effect=lambda repo, *a, **kw: commits[repo])
+    mocker.patch('gh_stats.scanner.get_commit_diffstat', return_value=(3, 0, [('a.py', 3, 0)]))
+    repo_info = {'acme/app': {}, 'bob/app': {}}
+    scan = BatchScan(['dev@acme.dev', 'bob'], date(2024, 1, 1), date(2024, 1, 7), jobs=2,
+                     sha_index=ShaIndex('prefer-org', repo_info=repo_info.get))
+    scan.assign('dev@acme.dev', 'acme/app')
+    for repo in ('bob/app', 'acme/app'):
+        scan.assign('bob', repo)
+        scan.submit(repo)
+
+    stats, _ = scan.finish()
+
+    # An email identity matches the commit email, like the commits API `author=` filter
+    assert {repo: data['commits'] for repo, data in stats['dev@acme.dev'].items()} == {'acme/app': 1}
+    # The SHA in both of bob's repos counts once, in the org repo
+    assert {repo: data['commits'] for repo, data in stats['bob'].items()} == {'acme/app': 1}
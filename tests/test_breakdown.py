@@ -0,0 +1,85 @@
+import json
+from datetime import date
+from gh_stats.breakdown import Breakdown, PathTree, language_for_path, merge_breakdowns, merge_repo_breakdowns
+from gh_stats.json_exporter import export_to_json
+from gh_stats.ui import generate_ascii_table, generate_markdown_table
+
+DIFFSTAT = (130, 12, [
+    ('src/app/main.py', 100, 10),
+    ('web/index.ts', 20, 2),
+    ('README.md', 10, 0),
+])
+
+def test_language_for_path():
+    assert language_for_path('src/app/main.py') == 'Python'
+    assert language_for_path('docker/Dockerfile') == 'Dockerfile'
+    assert language_for_path('data/blob.xyz') == 'Other'
+
+def test_breakdown_rollup():
+    breakdown = Breakdown()
+    breakdown.add_diffstat(DIFFSTAT)
+
+    assert breakdown.top_languages(1) == [('Python', 100, 10)]
+    assert breakdown.paths.top() == [('src/', 100, 10), ('web/', 20, 2), ('(root)', 10, 0)]
+    # Nested directories roll up into their ancestors
+    assert breakdown.paths.children['src/'].children['app/'].added == 100
+
+def test_breakdown_respects_path_filter():
+    breakdown = Breakdown()
+    breakdown.add_diffstat(DIFFSTAT, lambda p: not p.startswith('src/'))
+    assert 'Python' not in breakdown.languages
+
+def test_path_tree_is_bounded():
+    tree = PathTree(max_depth=1, max_children=3)
+    for i in range(1000):
+        tree.add(f'dir{i}/sub/file.py', 1, 0)
+
+    assert len(tree.children) == 4  # 3 named + (other)
+    assert tree.children['(other)'].added == 997
+    assert all(not child.children for child in tree.children.values())
+
+def test_merge_breakdowns():
+    a, b = Breakdown(), Breakdown()
+    a.add_file('x.py', 1, 1)
+    b.add_file('y.py', 2, 0)
+    merged = merge_breakdowns([a, None, b])
+    assert merged.languages['Python'] == [3, 1]
+
+def test_unlisted_lines_keep_breakdown_at_totals():
+    breakdown = Breakdown()
+    # Truncated file list: 50 of the 80 added lines are listed
+    breakdown.add_diffstat((80, 5, [('src/a.py', 50, 5)]))
+
+    assert breakdown.paths.top() == [('src/', 50, 5), ('(unlisted)', 30, 0)]
+    assert breakdown.languages['Other'] == [30, 0]
+    assert (breakdown.paths.added, breakdown.paths.deleted) == (80, 5)
+
+def test_repo_breakdowns_keep_same_directories_apart():
+    a, b = Breakdown(), Breakdown()
+    a.add_file('src/a.py', 10, 0)
+    b.add_file('src/b.py', 3, 1)
+    merged = merge_repo_breakdowns({'acme/api': {'breakdown': a}, 'acme/web': {'breakdown': b}})
+
+    assert merged.paths.top() == [('acme/api', 10, 0), ('acme/web', 3, 1)]
+    assert merged.top_paths() == [('acme/api/src/', 10, 0), ('acme/web/src/', 3, 1)]
+    # Rooted author breakdowns stay rooted when merged again
+    assert merge_breakdowns([merged]).top_paths(1) == [('acme/api/src/', 10, 0)]
+
+def _stats():
+    breakdown = Breakdown()
+    breakdown.add_diffstat(DIFFSTAT)
+    return {'owner/repo': {'commits': 1, 'added': 130, 'deleted': 12, 'messages': [], 'breakdown': breakdown}}
+
+def test_breakdown_in_outputs():
+    stats = _stats()
+    ascii_out = generate_ascii_table(stats, date(2024, 1, 1), date(2024, 1, 1), use_colors=False)
+    assert 'Languages:' in ascii_out
+    assert 'src/' in ascii_out
+
+    md = generate_markdown_table(stats, date(2024, 1, 1), date(2024, 1, 1))
+    assert '| Python | +100 | -10 |' in md
+
+    data = json.loads(export_to_json(stats, date(2024, 1, 1), date(2024, 1, 1), user='u'))
+    assert data['languages'][0] == {'name': 'Python', 'added': 100, 'deleted': 10}
+    assert data['paths'][0]['path'] == 'owner/repo'
+    assert data['paths'][0]['children'][0]['path'] == 'src/'
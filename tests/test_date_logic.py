@@ -1,7 +1,7 @@
 import pytest
 import datetime
 from datetime import date, timedelta
-from gh_stats.date_parser import parse_relative_date, parse_date_range
+from gh_stats.date_parser import parse_relative_date, parse_date_range, parse_duration
 
 # Helper to freeze time would be nice, but for now we'll calculate relative to today
 # or mock datetime.date.today if we want to be precise. 
@@ -99,3 +99,12 @@ def test_parse_date_range_fallthrough_relative():
 def test_parse_date_range_invalid():
     with pytest.raises(ValueError):
         parse_date_range("not-a-range")
+
+@pytest.mark.parametrize("value, seconds", [("90", 90), ("60s", 60), ("2m", 120), ("1h30m", 5400), ("1m30s", 90)])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+@pytest.mark.parametrize("value", ["", "soon", "5x", "1h 30m"])
+def test_parse_duration_invalid(value):
+    with pytest.raises(ValueError):
+        parse_duration(value)
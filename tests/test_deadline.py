@@ -0,0 +1,128 @@
+import datetime
+import json
+from gh_stats import api, scanner
+from gh_stats.schedule import Deadline
+from gh_stats.json_exporter import export_to_json
+from gh_stats.ui import generate_ascii_table, generate_markdown_table
+
+SINCE, UNTIL = datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _commit(sha):
+    return {'sha': sha, 'commit': {'author': {'date': '2024-01-02T00:00:00Z'}}}
+
+def _quiet(mocker):
+    mocker.patch.object(scanner, 'print_progress')
+    mocker.patch.object(scanner, 'print_progress_done')
+
+def test_deadline_counts_remaining_commits_without_stats(mocker):
+    _quiet(mocker)
+    clock = FakeClock()
+    mocker.patch.object(scanner, 'get_repo_commits', return_value=[_commit('a'), _commit('b')])
+
+    def fetch(repo, sha, path_filter=None):
+        clock.now = 100  # the deadline passes during the first fetch
+        return (4, 1, [('x.py', 4, 1)])
+
+    fetch_mock = mocker.patch.object(scanner, 'get_commit_diffstat', side_effect=fetch)
+    scan = scanner.RepoScan('me', SINCE, UNTIL, jobs=1, deadline=60, clock=clock)
+    scan.submit('me/tool', 'tool')
+    stats, _ = scan.finish()
+
+    assert fetch_mock.call_count == 1
+    assert stats['me/tool']['commits'] == 2
+    assert stats['me/tool']['added'] == 4
+    assert scan.coverage == {
+        'repos_scanned': 1, 'repos_partial': 0, 'repos_total': 1, 'commits': 2, 'commits_without_stats': 1,
+        'completeness': 50.0, 'discovery_complete': True, 'deadline_exceeded': True,
+    }
+
+def test_expired_deadline_leaves_repos_unlisted(mocker):
+    _quiet(mocker)
+    clock = FakeClock()
+    clock.now = 100
+    listing = mocker.patch.object(scanner, 'get_repo_commits', return_value=[_commit('a')])
+    scan = scanner.RepoScan('me', SINCE, UNTIL, jobs=2, deadline=60, clock=clock)
+    scan.submit('me/a', 'a')
+    scan.submit('me/b', 'b')
+    stats, _ = scan.finish()
+
+    listing.assert_not_called()
+    assert not stats
+    assert scan.coverage['repos_scanned'] == 0
+    assert scan.coverage['completeness'] == 0.0
+
+def test_deadline_stops_listing_between_pages(mocker):
+    _quiet(mocker)
+    clock = FakeClock()
+
+    def list_page(cmd, silent=False):
+        clock.now = 100  # the deadline passes while the first page loads
+        return [_commit(f'sha{i}') for i in range(100)]
+
+    run_cmd = mocker.patch.object(api, 'run_gh_cmd', side_effect=list_page)
+    mocker.patch.object(scanner, 'get_cached_diffstat', return_value=None)
+    scan = scanner.RepoScan('me', SINCE, UNTIL, jobs=1, deadline=60, clock=clock)
+    scan.submit('me/big', 'big')
+    stats, _ = scan.finish()
+
+    assert run_cmd.call_count == 1
+    assert stats['me/big']['commits'] == 100
+    assert scan.coverage['repos_scanned'] == 0
+    assert scan.coverage['repos_partial'] == 1
+    assert scan.coverage['deadline_exceeded']
+
+def test_cut_short_discovery_is_reported(mocker):
+    _quiet(mocker)
+    mocker.patch.object(scanner, 'get_repo_commits', return_value=[])
+    discovery_stop = Deadline(60, clock=lambda: 100)
+    assert discovery_stop()
+    scan = scanner.RepoScan('me', SINCE, UNTIL, jobs=1, deadline=60, clock=lambda: 0, discovery_stop=discovery_stop)
+    scan.submit('me/a', 'a')
+    scan.finish()
+
+    assert not scan.coverage['discovery_complete']
+    assert scan.coverage['deadline_exceeded']
+
+def test_search_bisection_stops_at_deadline(mocker):
+    run_cmd = mocker.patch.object(api, 'run_gh_cmd')
+    budget = mocker.Mock()
+    hits = {}
+
+    found = api.search_user_commits('me', SINCE, UNTIL, budget=budget, hits=hits, should_stop=lambda: True)
+
+    assert found == set()
+    run_cmd.assert_not_called()
+    budget.acquire.assert_not_called()
+
+def test_no_deadline_has_no_coverage(mocker):
+    _quiet(mocker)
+    mocker.patch.object(scanner, 'get_repo_commits', return_value=[])
+    scan = scanner.RepoScan('me', SINCE, UNTIL, jobs=1)
+    scan.submit('me/a', 'a')
+    scan.finish()
+    assert scan.coverage is None
+
+COVERAGE = {'repos_scanned': 3, 'repos_partial': 1, 'repos_total': 4, 'commits': 10, 'commits_without_stats': 2,
+            'completeness': 61.5, 'discovery_complete': False, 'deadline_exceeded': True}
+STATS = {'me/tool': {'commits': 10, 'added': 5, 'deleted': 1, 'messages': []}}
+
+def test_coverage_in_reports():
+    ascii_table = generate_ascii_table(STATS, SINCE, UNTIL, use_colors=False, coverage=COVERAGE)
+    assert "Repos Scanned:   3 / 4 (1 more partially listed)" in ascii_table
+    assert "Discovery:       cut short" in ascii_table
+    assert "~62% (estimated)" in ascii_table
+
+    markdown = generate_markdown_table(STATS, SINCE, UNTIL, coverage=COVERAGE)
+    assert "- Commits Without Stats: 2" in markdown
+
+    data = json.loads(export_to_json(STATS, SINCE, UNTIL, 'me', coverage=COVERAGE))
+    assert data['meta']['coverage']['commitsWithoutStats'] == 2
+    assert data['meta']['coverage']['discoveryComplete'] is False
+    assert data['meta']['coverage']['completeness'] == 61.5
@@ -0,0 +1,129 @@
+import pytest
+from gh_stats import api
+from gh_stats.diffstat import DiffstatStore, diffstat_from_commit, is_approximate, summarize
+from gh_stats.noise import is_noise_path, make_path_filter
+
+COMMIT_PAYLOAD = {
+    'sha': 'abc123',
+    'stats': {'additions': 1010, 'deletions': 25},
+    'files': [
+        {'filename': 'src/app.py', 'additions': 10, 'deletions': 5},
+        {'filename': 'package-lock.json', 'additions': 1000, 'deletions': 20},
+    ],
+}
+
+@pytest.fixture
+def mock_run_cmd(mocker):
+    return mocker.patch('gh_stats.api.run_gh_cmd')
+
+@pytest.fixture
+def store(tmp_path):
+    store = DiffstatStore(str(tmp_path))
+    api.set_diffstat_store(store)
+    yield store
+    api.set_diffstat_store(None)
+
+def test_summarize_applies_filter_locally():
+    diffstat = diffstat_from_commit(COMMIT_PAYLOAD)
+
+    assert summarize(diffstat) == (1010, 25)
+    assert summarize(diffstat, lambda p: not is_noise_path(p)) == (10, 5)
+    assert summarize(None) == (0, 0)
+
+def test_summarize_without_files_uses_totals():
+    diffstat = diffstat_from_commit({'stats': {'additions': 3, 'deletions': 1}})
+    assert summarize(diffstat, lambda p: False) == (3, 1)
+
+def test_store_roundtrip(tmp_path):
+    diffstat = diffstat_from_commit(COMMIT_PAYLOAD)
+    DiffstatStore(str(tmp_path)).put('owner/repo', 'abc123', diffstat)
+
+    # A fresh store instance reads the record back from disk
+    reloaded = DiffstatStore(str(tmp_path))
+    assert reloaded.get('owner/repo', 'abc123') == diffstat
+    assert reloaded.get('owner/repo', 'missing') is None
+    assert reloaded.shas('owner/repo') == ['abc123']
+
+def test_store_indexes_lines_and_skips_partial_writes(tmp_path):
+    store = DiffstatStore(str(tmp_path))
+    store.put('owner/repo', 'aaa111', (1, 0, [('docs/é.md', 1, 0)]))
+    store.put('owner/repo', 'bbb222', (2, 1, [('a.py', 2, 1)]))
+    # An interrupted write leaves a line without newline at the end
+    with open(store._repo_path('owner/repo'), 'a', encoding='utf-8') as f:
+        f.write('["ccc333",5,0,[["b.p')
+
+    reloaded = DiffstatStore(str(tmp_path))
+    assert reloaded.shas('owner/repo') == ['aaa111', 'bbb222']
+    assert reloaded.get('owner/repo', 'aaa111') == (1, 0, [('docs/é.md', 1, 0)])
+    assert reloaded.get('owner/repo', 'ccc333') is None
+
+    # Appending after the partial line starts a new one
+    reloaded.put('owner/repo', 'ddd444', (3, 0, []))
+    assert DiffstatStore(str(tmp_path)).get('owner/repo', 'ddd444') == (3, 0, [])
+
+def test_noise_toggle_does_not_refetch(mock_run_cmd, store):
+    mock_run_cmd.return_value = COMMIT_PAYLOAD
+
+    assert api.get_commit_stats('owner/repo', 'abc123') == (1010, 25)
+    assert api.get_commit_stats('owner/repo', 'abc123', exclude_noise=True) == (10, 5)
+
+    assert mock_run_cmd.call_count == 1
+
+def _page(prefix, count, lines=1):
+    return [{'filename': f'{prefix}/f{i:04d}.py', 'additions': lines, 'deletions': 0} for i in range(count)]
+
+def test_truncated_commit_fetches_more_pages(mock_run_cmd, store):
+    first = {'stats': {'additions': 400, 'deletions': 0}, 'files': _page('src', 300)}
+    second = {'stats': {'additions': 400, 'deletions': 0}, 'files': _page('tests', 100)}
+    mock_run_cmd.side_effect = [first, second]
+
+    diffstat = api.get_commit_diffstat('owner/repo', 'big', path_filter=lambda p: True)
+
+    assert len(diffstat[2]) == 400
+    assert mock_run_cmd.call_args_list[1][0][0][1].endswith('?page=2')
+    # Extended record is cached: no further calls
+    assert api.get_commit_diffstat('owner/repo', 'big', path_filter=lambda p: True) == diffstat
+    assert mock_run_cmd.call_count == 2
+
+def test_truncated_commit_without_filter_uses_totals(mock_run_cmd, store):
+    mock_run_cmd.return_value = {'stats': {'additions': 5000, 'deletions': 0}, 'files': _page('src', 300)}
+    assert api.get_commit_stats('owner/repo', 'big') == (5000, 0)
+    assert mock_run_cmd.call_count == 1
+
+def test_truncated_commit_with_noise_first_keeps_paging_to_the_source(mock_run_cmd, store):
+    noise = {'stats': {'additions': 400, 'deletions': 0}, 'files': _page('node_modules', 300)}
+    source = {'stats': {'additions': 400, 'deletions': 0}, 'files': _page('src', 100)}
+    mock_run_cmd.side_effect = [noise, source]
+
+    # A page of vendored files says nothing about the next one: the src/ lines still count
+    assert api.get_commit_stats('owner/repo', 'vendoring', exclude_noise=True) == (100, 0)
+    assert mock_run_cmd.call_count == 2
+
+def test_commit_beyond_the_page_budget_is_approximate(mock_run_cmd, store):
+    mock_run_cmd.return_value = {'stats': {'additions': 9000, 'deletions': 0}, 'files': _page('node_modules', 300)}
+    path_filter = make_path_filter(True)
+
+    diffstat = api.get_commit_diffstat('owner/repo', 'huge', path_filter, max_pages=2)
+
+    assert mock_run_cmd.call_count == 2
+    assert is_approximate(diffstat, path_filter)
+    assert not is_approximate(diffstat)
+
+def test_summarize_attributes_unlisted_lines_proportionally():
+    diffstat = (100, 0, [('docs/a.md', 10, 0), ('src/x.py', 10, 0)])
+    assert summarize(diffstat, lambda p: p.startswith('src/')) == (50, 0)
+
+def test_approximate_commits_are_marked_in_outputs():
+    import json
+    from datetime import date
+    from gh_stats.json_exporter import export_to_json
+    from gh_stats.ui import generate_ascii_table, generate_markdown_table
+
+    stats = {'owner/repo': {'commits': 2, 'added': 130, 'deleted': 12, 'approximate': 1, 'messages': []}}
+    day = date(2024, 1, 1)
+
+    assert '~+130 / -12' in generate_ascii_table(stats, day, day, use_colors=False)
+    assert '| owner/repo | 2 | ~+130 / -12 |' in generate_markdown_table(stats, day, day)
+    data = json.loads(export_to_json(stats, day, day, user='u'))
+    assert data['summary']['approximateCommits'] == 1
+    assert data['repos'][0]['approximateCommits'] == 1
@@ -145,3 +145,162 @@ def test_discover_fallback_skip(mock_api):
     # Verify fallback was NOT called
     mock_api['get_user_repos'].assert_not_called()
 
+
+def test_discover_repo_filter(mock_api, mocker):
+    """
+    Scenario: Fallback scan with repo filters.
+    Archived repos and forks are dropped from the list payload, Events repos by name glob
+    and their fetched metadata.
+    """
+    from gh_stats.filters import RepoFilter
+    mocker.patch('gh_stats.discovery.get_repo_info', side_effect=lambda full_name: {'full_name': full_name})
+    mock_api['get_active'].return_value = {'user/active-repo': {'main'}, 'user/scratch': {'main'}}
+    mock_api['get_user_repos'].return_value = [
+        {'full_name': 'user/old-repo', 'name': 'old-repo'},
+        {'full_name': 'user/archived-repo', 'name': 'archived-repo', 'archived': True},
+        {'full_name': 'user/forked-repo', 'name': 'forked-repo', 'fork': True},
+    ]
+    
+    repos, _ = discover_repositories(
+        username='user',
+        since_date=date.today() - timedelta(days=100),
+        until_date=date.today(),
+        orgs=[],
+        personal=True,
+        prompt_callback=MagicMock(return_value='all'),
+        repo_filter=RepoFilter(skip_archived=True, skip_forks=True, globs=['*-repo']),
+    )
+    
+    assert sorted(r[0] for r in repos) == ['user/active-repo', 'user/old-repo']
+
+def test_discover_filters_event_repos_by_metadata(mock_api, mocker):
+    """
+    Scenario: Repos found through the Events API have no metadata payload.
+    Their metadata is fetched, so --skip-forks drops a fork found there too.
+    """
+    from gh_stats.filters import RepoFilter
+    mock_api['get_active'].return_value = {'user/own': {'main'}, 'user/fork': {'main'}}
+    get_info = mocker.patch('gh_stats.discovery.get_repo_info',
+                            side_effect=lambda full_name: {'full_name': full_name, 'fork': full_name == 'user/fork'})
+
+    repos, _ = discover_repositories(
+        username='user',
+        since_date=date.today(),
+        until_date=date.today(),
+        orgs=[],
+        personal=True,
+        repo_filter=RepoFilter(skip_forks=True),
+    )
+
+    assert repos == [('user/own', 'own')]
+    assert get_info.call_count == 2
+
+def test_discover_uses_events_archive_past_90_days(mock_api, tmp_path):
+    """
+    Scenario: Date range > 90 days and the events archive reaches back far enough.
+    Archived repos are discovered and no fallback prompt is shown.
+    """
+    from gh_stats.events import EventsArchive
+    mock_api['get_active'].return_value = {'user/active-repo': {'main'}}
+    long_ago = date.today() - timedelta(days=100)
+    
+    archive = EventsArchive(str(tmp_path))
+    archive.add('user', [{
+        'id': 1, 'type': 'PushEvent', 'created_at': (long_ago + timedelta(days=1)).strftime('%Y-%m-%dT12:00:00Z'),
+        'repo': {'name': 'user/old-repo'}, 'payload': {'ref': 'refs/heads/main'},
+    }], complete=True, now=datetime.datetime.now(datetime.timezone.utc) - timedelta(days=20))
+    mock_prompt = MagicMock(return_value='all')
+    
+    repos, branches = discover_repositories(
+        username='user',
+        since_date=long_ago,
+        until_date=date.today(),
+        orgs=[],
+        personal=True,
+        prompt_callback=mock_prompt,
+        events_archive=archive
+    )
+    
+    assert {r[1] for r in repos} == {'active-repo', 'old-repo'}
+    assert branches['user/old-repo'] == {'main'}
+    mock_prompt.assert_not_called()
+    mock_api['get_user_repos'].assert_not_called()
+
+def test_discover_auto_uses_complete_contributions(mock_api, mocker):
+    """
+    Scenario: --discovery auto, range > 90 days, GraphQL contributions are complete.
+    No prompt, no repo lists, no search.
+    """
+    mock_api['get_active'].return_value = {}
+    mocker.patch('gh_stats.discovery.get_contributed_repos', return_value=({'user/old-repo', 'other/repo'}, True))
+    mock_prompt = MagicMock()
+    
+    repos, _ = discover_repositories(
+        username='user',
+        since_date=date.today() - timedelta(days=200),
+        until_date=date.today(),
+        orgs=[],
+        personal=True,
+        prompt_callback=mock_prompt,
+        discovery='auto'
+    )
+    
+    assert repos == [('user/old-repo', 'old-repo')]
+    mock_prompt.assert_not_called()
+    mock_api['get_user_repos'].assert_not_called()
+    mock_api['search_commits'].assert_not_called()
+
+def test_discover_auto_prefers_cheaper_full_scan(mock_api, mocker):
+    """
+    Scenario: contributions incomplete; few repos pushed in range vs many search hits.
+    """
+    since = date.today() - timedelta(days=200)
+    mock_api['get_active'].return_value = {}
+    mocker.patch('gh_stats.discovery.get_contributed_repos', return_value=(set(), False))
+    mocker.patch('gh_stats.discovery.get_search_commit_count', return_value=5000)
+    mock_api['get_user_repos'].return_value = [
+        {'full_name': 'user/fresh', 'name': 'fresh', 'pushed_at': date.today().isoformat() + 'T00:00:00Z'},
+        {'full_name': 'user/stale', 'name': 'stale', 'pushed_at': '2001-01-01T00:00:00Z'},
+    ]
+    
+    repos, _ = discover_repositories(
+        username='user',
+        since_date=since,
+        until_date=date.today(),
+        orgs=[],
+        personal=True,
+        prompt_callback=MagicMock(),
+        discovery='auto'
+    )
+    
+    assert repos == [('user/fresh', 'fresh')]
+    mock_api['search_commits'].assert_not_called()
+
+def test_discover_hands_repos_over_before_prompting(mock_api):
+    """
+    Scenario: Range > 90 days with a scan consumer attached.
+    Events repos (with their branches) reach on_repo before the fallback prompt;
+    fallback repos follow, each repo once.
+    """
+    mock_api['get_active'].return_value = {'user/active': {'main', 'feature'}}
+    mock_api['get_user_repos'].return_value = [
+        {'full_name': 'user/active', 'name': 'active'},
+        {'full_name': 'user/old', 'name': 'old'},
+    ]
+    handed_over = []
+
+    def prompt(msg):
+        assert handed_over == [('user/active', 'active', {'main', 'feature'})]
+        return 'a'
+
+    discover_repositories(
+        username='user',
+        since_date=date.today() - timedelta(days=200),
+        until_date=date.today(),
+        orgs=[],
+        personal=True,
+        prompt_callback=prompt,
+        on_repo=lambda full_name, name, branches: handed_over.append((full_name, name, branches)),
+    )
+
+    assert [repo for repo, _, _ in handed_over] == ['user/active', 'user/old']
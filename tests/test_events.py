@@ -0,0 +1,41 @@
+import datetime
+from datetime import date, timedelta
+from gh_stats.events import EventsArchive
+
+NOW = datetime.datetime(2024, 6, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+def _push(event_id, repo, branch, created_at):
+    return {'id': event_id, 'type': 'PushEvent', 'created_at': created_at,
+            'repo': {'name': repo}, 'payload': {'ref': f'refs/heads/{branch}', 'commits': [{}] * 5}}
+
+def test_archive_dedupes_by_event_id(tmp_path):
+    archive = EventsArchive(str(tmp_path))
+    events = [_push(1, 'user/a', 'main', '2024-05-30T10:00:00Z'), _push(2, 'user/b', 'dev', '2024-05-31T10:00:00Z')]
+
+    assert archive.add('user', events, now=NOW) == 2
+    assert archive.add('user', events, now=NOW) == 0
+
+    # A fresh instance reads the log back from disk
+    reloaded = EventsArchive(str(tmp_path))
+    assert reloaded.active_branches('user', date(2024, 5, 1), date(2024, 6, 1)) == {'user/a': {'main'}, 'user/b': {'dev'}}
+    assert reloaded.active_branches('user', date(2024, 5, 31), date(2024, 6, 1)) == {'user/b': {'dev'}}
+
+def test_archive_coverage_stays_continuous(tmp_path):
+    archive = EventsArchive(str(tmp_path))
+    # A complete feed covers the whole 90-day horizon
+    archive.add('user', [], complete=True, now=NOW)
+    assert archive.covered_since('user') == '2024-03-03T12:00:00Z'
+
+    # A truncated feed collected a month later still overlaps the previous collection
+    later = NOW + timedelta(days=30)
+    archive.add('user', [_push(3, 'user/a', 'main', '2024-05-20T00:00:00Z')], now=later)
+    assert archive.covered_since('user') == '2024-03-03T12:00:00Z'
+    assert archive.covers('user', date(2024, 3, 10))
+    assert not archive.covers('user', date(2024, 1, 1))
+
+def test_archive_gap_resets_coverage(tmp_path):
+    archive = EventsArchive(str(tmp_path))
+    archive.add('user', [], complete=True, now=NOW)
+    # Truncated feed whose oldest event is newer than the last collection
+    archive.add('user', [_push(4, 'user/a', 'main', '2024-08-01T00:00:00Z')], now=NOW + timedelta(days=70))
+    assert archive.covered_since('user') == '2024-08-01T00:00:00Z'
@@ -0,0 +1,119 @@
+from datetime import date
+import pytest
+from gh_stats.args import parse_with_diagnostics
+from gh_stats.filters import AuthorFilter, PathScope, RepoFilter, is_bot_commit
+from gh_stats.scanner import scan_org_team_stats
+
+def _commit(sha, login, user_type='User'):
+    return {
+        'sha': sha,
+        'author': {'login': login, 'type': user_type},
+        'commit': {'author': {'name': login, 'date': '2024-01-01T10:00:00Z'}, 'message': 'msg'},
+    }
+
+HUMAN = _commit('1', 'alice')
+DEPENDABOT = _commit('2', 'dependabot[bot]', 'Bot')
+RENOVATE = _commit('3', 'renovate')
+OUTSIDER = _commit('4', 'mallory')
+
+def test_bot_detection():
+    assert is_bot_commit(DEPENDABOT)
+    assert is_bot_commit(RENOVATE)
+    assert not is_bot_commit(HUMAN)
+
+def test_author_filter_rules():
+    assert not AuthorFilter()
+    assert AuthorFilter(exclude_bots=True).allows(HUMAN)
+    assert not AuthorFilter(exclude_bots=True).allows(DEPENDABOT)
+    assert not AuthorFilter(exclude=['Alice']).allows(HUMAN)
+    assert AuthorFilter(include=['ALICE']).allows(HUMAN)
+    assert not AuthorFilter(include=['alice']).allows(OUTSIDER)
+    assert not AuthorFilter(members={'alice'}).allows(OUTSIDER)
+
+def test_filtered_commits_are_never_fetched(mocker):
+    mocker.patch('gh_stats.api.get_repo_all_commits', return_value=[HUMAN, DEPENDABOT, RENOVATE, OUTSIDER])
+    mock_diffstat = mocker.patch('gh_stats.scanner.get_commit_diffstat', return_value=(5, 1, []))
+
+    team_stats, _ = scan_org_team_stats(
+        [('org/repo', 'repo')], date(2024, 1, 1), date(2024, 1, 1),
+        author_filter=AuthorFilter(exclude_bots=True, members={'alice', 'dependabot[bot]'}),
+    )
+
+    assert list(team_stats) == ['alice']
+    assert mock_diffstat.call_count == 1
+
+def test_author_filters_require_org_summary():
+    _, result = parse_with_diagnostics(['--exclude-bots'])
+    assert not result.is_valid
+
+    _, result = parse_with_diagnostics(['--org-summary', 'org', '--exclude-bots'])
+    assert result.is_valid
+
+MERGE = dict(_commit('5', 'alice'), parents=[{'sha': 'a'}, {'sha': 'b'}])
+
+@pytest.mark.parametrize('policy, commits, fetches', [
+    ('full', 2, 2),
+    ('count-only', 2, 1),
+    ('skip', 1, 1),
+])
+def test_merge_policy(mocker, policy, commits, fetches):
+    mocker.patch('gh_stats.api.get_repo_all_commits', return_value=[HUMAN, MERGE])
+    mock_diffstat = mocker.patch('gh_stats.scanner.get_commit_diffstat', return_value=(5, 1, []))
+
+    team_stats, _ = scan_org_team_stats(
+        [('org/repo', 'repo')], date(2024, 1, 1), date(2024, 1, 1), merge_policy=policy,
+    )
+
+    assert team_stats['alice']['commits'] == commits
+    assert team_stats['alice']['added'] == 5 * fetches
+    assert mock_diffstat.call_count == fetches
+
+def test_path_scope_rules():
+    scope = PathScope(['acme/mono:services/api', 'acme/*:docs/', 'lib/*/src'])
+
+    assert scope.list_paths('acme/mono') == ['services/api', 'docs', 'lib']
+    assert scope.list_paths('other/repo') == ['lib']
+    assert PathScope(['*.py']).list_paths('any/repo') is None  # no literal prefix to push down
+    assert not PathScope()
+
+    file_filter = scope.file_filter('acme/mono')
+    assert file_filter('services/api/handler.go')
+    assert file_filter('lib/core/src/x.c')
+    assert not file_filter('services/web/app.ts')
+    assert not file_filter('lib/core/tests/x.c')
+
+def test_path_scope_pushdown(mocker):
+    mock_list = mocker.patch('gh_stats.api.get_repo_all_commits', return_value=[HUMAN])
+    mocker.patch('gh_stats.scanner.get_commit_diffstat', return_value=(30, 3, [
+        ('services/api/a.go', 10, 1),
+        ('services/web/b.ts', 20, 2),
+    ]))
+
+    team_stats, _ = scan_org_team_stats(
+        [('acme/mono', 'mono')], date(2024, 1, 1), date(2024, 1, 1),
+        path_scope=PathScope(['acme/mono:services/api']),
+    )
+
+    assert mock_list.call_args.kwargs['paths'] == ['services/api']
+    assert team_stats['alice']['added'] == 10
+    assert team_stats['alice']['deleted'] == 1
+
+def test_repo_filter():
+    repo = {'full_name': 'acme/api', 'archived': False, 'fork': False, 'topics': ['Backend'], 'language': 'Go'}
+
+    assert not RepoFilter()
+    assert RepoFilter(topics=['backend'], languages=['go'], globs=['api']).allows(repo)
+    assert not RepoFilter(skip_archived=True).allows(dict(repo, archived=True))
+    assert not RepoFilter(skip_templates=True).allows(dict(repo, is_template=True))
+    assert not RepoFilter(topics=['frontend']).allows(repo)
+    assert not RepoFilter(languages=['python']).allows(repo)
+    assert RepoFilter(globs=['acme/*']).allows_name('acme/web')
+    assert not RepoFilter(globs=['acme/*']).allows_name('other/web')
+
+def test_repo_filter_fetches_metadata_for_names():
+    get_info = lambda full_name: {'full_name': full_name, 'archived': full_name == 'acme/old'}
+
+    assert not RepoFilter(skip_archived=True).allows_full_name('acme/old', get_info)
+    assert RepoFilter(skip_archived=True).allows_full_name('acme/api', get_info)
+    # Name globs alone never fetch
+    assert RepoFilter(globs=['acme/*']).allows_full_name('acme/old', None)
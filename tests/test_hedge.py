@@ -0,0 +1,123 @@
+import threading
+import time
+import pytest
+from gh_stats import api
+from gh_stats.hedge import Hedger
+from gh_stats.singleflight import SingleFlight
+
+def warmed(budget, latency=0.0, samples=20):
+    hedger = Hedger(budget, min_samples=samples)
+    for _ in range(samples):
+        hedger._record(latency)
+    return hedger
+
+def test_slow_request_is_hedged_and_first_answer_wins():
+    hedger = warmed(100)
+    stuck = threading.Event()
+    calls = []
+
+    def fetch(started):
+        calls.append(1)
+        started()
+        if len(calls) == 1:
+            stuck.wait(5)
+            return "slow"
+        return "fast"
+
+    assert hedger.run(fetch) == "fast"
+    stuck.set()
+    assert (hedger.hedged, hedger.hedge_wins) == (1, 1)
+
+def test_budget_caps_hedges():
+    hedger = warmed(5, latency=0.01)
+    hedger.requests = 19
+    release = threading.Event()
+    calls = []
+
+    def fetch(started):
+        calls.append(1)
+        started()
+        release.wait(0.2)
+        return "done"
+
+    # The 20th request may hedge (5% of 20), the 21st may not
+    assert hedger.run(fetch) == "done"
+    assert hedger.run(fetch) == "done"
+    assert hedger.hedged == 1
+    release.set()
+
+def test_latency_excludes_the_wait_for_a_slot():
+    hedger = Hedger(100, min_samples=1)
+
+    def fetch(started):
+        time.sleep(0.2)  # queued behind the concurrency limit
+        started()
+        return "x"
+
+    assert hedger.run(fetch) == "x"
+    assert hedger._latencies[0] < 0.1
+
+def test_primary_latency_is_recorded_when_the_hedge_wins():
+    hedger = warmed(100, latency=0.01)
+    slow = threading.Event()
+    calls = []
+
+    def fetch(started):
+        calls.append(1)
+        started()
+        if len(calls) == 1:
+            slow.wait(5)
+            return "slow"
+        return "fast"
+
+    assert hedger.run(fetch) == "fast"
+    slow.set()
+    deadline = time.monotonic() + 2
+    while len(hedger._latencies) < 21 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The primary's (long) latency, not the winning duplicate's
+    assert hedger._latencies[-1] > hedger._latencies[0]
+
+def test_one_failed_attempt_waits_for_the_other():
+    hedger = warmed(100, latency=0.01)
+    calls = []
+
+    def fetch(started):
+        calls.append(1)
+        started()
+        if len(calls) == 1:
+            time.sleep(0.1)
+            raise RuntimeError("primary failed")
+        time.sleep(0.2)
+        return "hedge"
+
+    assert hedger.run(fetch) == "hedge"
+
+def test_error_raised_when_both_attempts_fail():
+    hedger = warmed(100, latency=0.01)
+
+    def fetch(started):
+        started()
+        time.sleep(0.05)
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        hedger.run(fetch)
+
+def test_no_hedging_before_enough_samples():
+    hedger = Hedger(100, min_samples=3)
+    assert hedger.threshold() is None
+    for _ in range(3):
+        assert hedger.run(lambda started: "x") == "x"
+    assert hedger.hedged == 0
+    assert hedger.threshold() is not None
+
+def test_only_commit_detail_requests_are_hedged(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    hedger = Hedger(5)
+    mocker.patch.object(api, '_hedger', hedger)
+    mocker.patch('gh_stats.api.subprocess.run', return_value=mocker.Mock(returncode=0, stdout='{}'))
+
+    api.run_gh_cmd(['api', 'repos/acme/tool/commits/0123abcd'])
+    api.run_gh_cmd(['api', 'repos/acme/tool/commits?since=2024-01-01'])
+    assert hedger.requests == 1
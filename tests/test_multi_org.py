@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+from gh_stats.breakdown import Breakdown
+from gh_stats.json_exporter import export_to_json
+from gh_stats.scanner import split_team_stats_by_org
+
+def author(repos):
+    breakdowns = {}
+    for repo, (commits, added, deleted) in repos.items():
+        breakdown = Breakdown()
+        breakdown.add_file(f'{repo.split("/")[1]}.py', added, deleted)
+        breakdowns[repo] = {'commits': commits, 'added': added, 'deleted': deleted, 'breakdown': breakdown}
+    messages = [{'repo': repo, 'date': datetime(2024, 1, 2, 10), 'added': 1, 'deleted': 0}
+                for repo in repos]
+    return {
+        'commits': sum(c for c, _, _ in repos.values()),
+        'added': sum(a for _, a, _ in repos.values()),
+        'deleted': sum(d for _, _, d in repos.values()),
+        'repos': breakdowns,
+        'messages': messages,
+        'breakdown': Breakdown(),
+    }
+
+def test_contributor_in_two_orgs_is_split_per_org_and_merged_overall():
+    team_stats = {
+        'alice': author({'Acme/api': (3, 30, 3), 'globex/web': (2, 20, 2)}),
+        'bob': author({'globex/web': (1, 5, 0)}),
+    }
+
+    sections = split_team_stats_by_org(team_stats, ['acme', 'globex'])
+
+    assert list(sections) == ['acme', 'globex']
+    assert set(sections['acme']) == {'alice'}
+    assert sections['acme']['alice']['commits'] == 3
+    assert [m['repo'] for m in sections['acme']['alice']['messages']] == ['Acme/api']
+    assert sections['acme']['alice']['breakdown'].top_languages() == [('Python', 30, 3)]
+    assert sections['globex']['alice']['commits'] == 2
+    assert sections['globex']['bob']['added'] == 5
+    # The combined stats keep alice as one contributor across both orgs
+    assert team_stats['alice']['commits'] == 5
+
+    data = json.loads(export_to_json({}, date(2024, 1, 1), date(2024, 1, 31), 'me',
+                                     team_stats=team_stats, org='acme, globex', org_sections=sections))
+    assert data['summary']['totalCommits'] == 6
+    assert data['orgs'] == [
+        {'name': 'acme', 'contributors': 1, 'commits': 3, 'added': 30, 'deleted': 3, 'activeRepos': 1},
+        {'name': 'globex', 'contributors': 2, 'commits': 3, 'added': 25, 'deleted': 2, 'activeRepos': 1},
+    ]
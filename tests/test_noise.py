@@ -0,0 +1,84 @@
+import base64
+import json
+import pytest
+from gh_stats import api
+from gh_stats.noise import NoiseMatcher, is_noise_path, parse_gitattributes
+from gh_stats.singleflight import SingleFlight
+
+@pytest.fixture
+def mock_run_cmd(mocker):
+    return mocker.patch('gh_stats.api.run_gh_cmd')
+
+@pytest.mark.parametrize('path, expected', [
+    ('package-lock.json', True),
+    ('web/pnpm-lock.yaml', True),
+    ('src/node_modules/lib/index.js', True),
+    ('static/app.min.js', True),
+    ('A\\Vendor\\lib.c', True),
+    ('src/distx/main.py', False),
+    ('src/main.py', False),
+])
+def test_builtin_rules(path, expected):
+    assert is_noise_path(path) is expected
+
+def test_extra_markers():
+    assert is_noise_path('src/generated/api.py', extra_markers=['generated'])
+    assert not is_noise_path('src/generated/api.py')
+
+def test_user_rules():
+    matcher = NoiseMatcher(rules=['*.gen.ts', 'docs/api/'])
+    assert matcher.is_noise('web/client.gen.ts')
+    assert matcher.is_noise('docs/api/index.md')
+    assert not matcher.is_noise('docs/apiguide.md')
+    assert not matcher.is_noise('web/client.ts')
+
+def test_gitattributes_rules():
+    gitattributes = (
+        "# generated code\n"
+        "gen/** linguist-generated\n"
+        "*.pb.go linguist-generated=true\n"
+        "vendor/** -linguist-vendored\n"
+        "*.sh text eol=lf\n"
+    )
+    noise, unset = parse_gitattributes(gitattributes)
+    assert noise == ['gen/**', '*.pb.go']
+    assert unset == ['vendor/**']
+
+    matcher = NoiseMatcher(gitattributes=gitattributes)
+    assert matcher.is_noise('gen/client/api.py')
+    assert matcher.is_noise('proto/user.pb.go')
+    # Unset attribute overrides the built-in vendor/ marker
+    assert not matcher.is_noise('vendor/lib.c')
+    assert not matcher.is_noise('scripts/run.sh')
+
+@pytest.mark.parametrize('pattern, path, expected', [
+    # dir/** is anchored and covers everything below the directory
+    ('gen/** linguist-generated', 'gen/client/api.py', True),
+    ('gen/** linguist-generated', 'src/gen/api.py', False),
+    # Directory-only patterns match no file in gitattributes(5)
+    ('/assets/ linguist-generated', 'assets/app.js', False),
+    ('third_party/ linguist-vendored', 'third_party/lib.c', False),
+    # A slash in the middle anchors the pattern; * stays within one segment
+    ('docs/gen/*.md linguist-generated', 'docs/gen/api.md', True),
+    ('docs/gen/*.md linguist-generated', 'docs/gen/v1/api.md', False),
+    ('docs/gen/*.md linguist-generated', 'site/docs/gen/api.md', False),
+    # **/ matches at any depth, and a bare name is not a directory prefix
+    ('**/gen/** linguist-generated', 'pkg/sub/gen/api.py', True),
+    ('*.pb.go linguist-generated', 'a/b/c/user.pb.go', True),
+    ('proto linguist-generated', 'proto/user.go', False),
+])
+def test_gitattributes_pattern_semantics(pattern, path, expected):
+    assert NoiseMatcher(gitattributes=pattern).is_noise(path) is expected
+
+def test_gitattributes_fetched_once(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    content = base64.b64encode(b"gen/** linguist-generated\n").decode()
+    request = mocker.patch.object(api, '_gh_request', return_value=json.dumps({'encoding': 'base64', 'content': content}))
+
+    assert api.get_repo_gitattributes('owner/repo') == "gen/** linguist-generated\n"
+    assert api.get_repo_gitattributes('owner/repo') == "gen/** linguist-generated\n"
+    assert request.call_count == 1
+
+def test_missing_gitattributes(mock_run_cmd):
+    mock_run_cmd.return_value = None
+    assert api.get_repo_gitattributes('owner/repo') == ''
@@ -0,0 +1,127 @@
+import datetime
+import threading
+import time
+import weakref
+import pytest
+from gh_stats import scanner
+from gh_stats.pipeline import Pipeline
+from gh_stats.shaindex import ShaIndex
+
+def test_items_flow_through_all_stages():
+    pipeline = Pipeline([lambda n: range(n), lambda n: [n * 10]], jobs=3)
+    for n in (1, 2, 3):
+        pipeline.submit(n)
+    assert sorted(pipeline.results()) == [0, 0, 0, 10, 10, 20]
+
+def test_bounded_queue_applies_backpressure():
+    release = threading.Event()
+
+    def slow(item):
+        release.wait()
+        yield item
+
+    pipeline = Pipeline([slow], jobs=1, depth=2)
+    submitted = []
+
+    def produce():
+        for n in range(10):
+            pipeline.submit(n)
+            submitted.append(n)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    time.sleep(0.1)
+    # One item in the worker plus the two queue slots
+    assert len(submitted) == 3
+    release.set()
+    producer.join(1)
+    assert sorted(pipeline.results()) == list(range(10))
+
+def test_stage_error_is_raised_from_results():
+    def fail(item):
+        if item == 2:
+            raise RuntimeError("boom")
+        yield item
+
+    pipeline = Pipeline([fail], jobs=2)
+    for n in range(5):
+        pipeline.submit(n)
+    with pytest.raises(RuntimeError):
+        list(pipeline.results())
+
+def _commit(sha):
+    return {'sha': sha, 'commit': {'author': {'date': '2024-01-02T00:00:00Z'}}}
+
+def test_repo_scan_lists_while_repos_are_still_submitted(mocker):
+    mocker.patch.object(scanner, 'print_progress')
+    mocker.patch.object(scanner, 'print_progress_done')
+    listed = threading.Event()
+
+    def list_commits(repo, *args, **kwargs):
+        listed.set()
+        return [_commit(repo + '-1'), _commit(repo + '-2')]
+
+    mocker.patch.object(scanner, 'get_repo_commits', side_effect=list_commits)
+    mocker.patch.object(scanner, 'get_commit_diffstat', return_value=(3, 1, [('a.py', 3, 1)]))
+
+    scan = scanner.RepoScan('me', datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), jobs=2)
+    scan.submit('me/a', 'a')
+    # Listing starts before the repo list is complete (i.e. during discovery)
+    assert listed.wait(1)
+    scan.submit('me/b', 'b')
+    scan.submit('me/a', 'a')
+    stats, repos_with_commits = scan.finish()
+
+    assert repos_with_commits == 2
+    assert {repo: (s['commits'], s['added']) for repo, s in stats.items()} == {'me/a': (2, 6), 'me/b': (2, 6)}
+
+def test_prioritized_stage_takes_lowest_priority_first():
+    release = threading.Event()
+    order = []
+
+    def record(item):
+        release.wait()
+        order.append(item)
+        yield item
+
+    pipeline = Pipeline([record], jobs=1, prioritized=True)
+    pipeline.submit('first')  # taken by the worker right away
+    time.sleep(0.05)
+    for item, priority in (('small', (0, -1)), ('big', (-50, 0)), ('medium', (-5, 0))):
+        pipeline.submit(item, priority)
+    release.set()
+    list(pipeline.results())
+    assert order == ['first', 'big', 'medium', 'small']
+
+class _Files(list):
+    """A diffstat file list the test can track (plain lists take no weak references)."""
+
+def test_scan_keeps_a_bounded_number_of_diffstats(mocker):
+    mocker.patch.object(scanner, 'print_progress')
+    mocker.patch.object(scanner, 'print_progress_done')
+    index = ShaIndex(repo_info=lambda repo: {})
+    refs = []
+    live = lambda: sum(ref() is not None for ref in refs)
+    peak = {'files': 0, 'index': 0}
+
+    def diffstat(repo, sha, path_filter=None):
+        files = _Files([('src/%s.py' % sha, 2, 1)])
+        refs.append(weakref.ref(files))
+        peak['files'] = max(peak['files'], live())
+        peak['index'] = max(peak['index'], index.retained)
+        return 2, 1, files
+
+    mocker.patch.object(scanner, 'get_repo_commits',
+                        side_effect=lambda repo, *args, **kwargs: [_commit('%s-%d' % (repo, n)) for n in range(50)])
+    mocker.patch.object(scanner, 'get_commit_diffstat', side_effect=diffstat)
+
+    scan = scanner.RepoScan('me', datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), sha_index=index, jobs=2)
+    for n in range(10):
+        scan.submit('me/r%d' % n, 'r%d' % n)
+    stats, _ = scan.finish()
+
+    assert sum(s['commits'] for s in stats.values()) == 500
+    assert sum(s['breakdown'].languages['Python'][0] for s in stats.values()) == 1000
+    # Only the commits in flight hold a file list, whatever the number scanned
+    assert peak['files'] <= 8 and peak['index'] <= 8
+    assert live() == 0 and index.retained == 0
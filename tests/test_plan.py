@@ -0,0 +1,112 @@
+import argparse
+from datetime import date
+import pytest
+from gh_stats import plan
+from gh_stats.api import last_page_from_link
+from gh_stats.filters import RepoFilter
+from gh_stats.plan import PlanNode, build_plan, format_plan
+
+def _args(**overrides):
+    args = dict(org_summary=None, personal=True, discovery='prompt', branch_discovery='events', all_branches=False,
+                exclude_noise=False, merges='full', org_members_only=False, jobs=4, hedge=0)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+def test_last_page_from_link():
+    link = ('<https://api.github.com/repositories/1/commits?per_page=1&page=2>; rel="next", '
+            '<https://api.github.com/repositories/1/commits?per_page=1&page=57>; rel="last"')
+    assert last_page_from_link(link) == 57
+    assert last_page_from_link('') is None
+
+def test_optional_nodes_are_not_counted():
+    root = PlanNode("plan")
+    phase = root.add("Discovery", {"core": 3})
+    phase.add("Deep search", {"search": 40}, optional=True)
+    phase.add("Contributions", {"graphql": 1})
+
+    assert root.total() == {"core": 3, "graphql": 1}
+    assert any("option: 40 search" in line for line in root.render())
+
+def test_wall_time_uses_node_concurrency():
+    root = PlanNode("plan", jobs=1)
+    root.add("Serial", {"core": 10})
+    root.add("Concurrent", {"core": 10}, jobs=4)
+    assert root.wall_time(4) == pytest.approx(10 * 0.4 + 10 * 0.4 / 4)
+
+def test_org_summary_plan_extrapolates_sampled_commits(mocker):
+    repos = [{'full_name': f'acme/r{i}', 'pushed_at': '2099-01-01T00:00:00Z'} for i in range(20)]
+    repos += [{'full_name': f'acme/old{i}', 'pushed_at': '2001-01-01T00:00:00Z'} for i in range(5)]
+    mocker.patch.object(plan, 'get_org_repos', return_value=repos)
+    counts = mocker.patch.object(plan, 'count_listing', return_value=30)
+
+    root = build_plan(_args(org_summary='acme', exclude_noise=True), 'me', True,
+                      date(2024, 1, 1), date(2024, 1, 31), [], RepoFilter())
+
+    assert counts.call_count == plan.PLAN_SAMPLE_REPOS
+    # 1 list page + 25 listings + 20 repos x 30 commits / 100 + 600 stats + 25 .gitattributes
+    assert root.total() == {"core": 1 + 25 + 6 + 600 + 25}
+
+    # --hedge 5 adds at most 5% duplicate stats requests
+    root = build_plan(_args(org_summary='acme', hedge=5), 'me', True,
+                      date(2024, 1, 1), date(2024, 1, 31), [], RepoFilter())
+    assert root.total() == {"core": 1 + 25 + 6 + 600 + 30}
+
+def test_org_summary_plan_lists_every_org(mocker):
+    listed = {'acme': [{'full_name': 'acme/a', 'pushed_at': '2099-01-01T00:00:00Z'}],
+              'globex': [{'full_name': f'globex/g{i}', 'pushed_at': '2099-01-01T00:00:00Z'} for i in range(150)]}
+    mocker.patch.object(plan, 'get_org_repos', side_effect=lambda org, limit=None: listed[org])
+    mocker.patch.object(plan, 'count_listing', return_value=0)
+
+    root = build_plan(_args(org_summary='acme,globex'), 'me', True,
+                      date(2024, 1, 1), date(2024, 1, 31), [], RepoFilter())
+
+    discovery = root.children[0]
+    assert [node.label for node in discovery.children] == ["Org repo list: acme", "Org repo list: globex"]
+    # 1 + 2 list pages, then one listing per repo
+    assert root.total() == {"core": 3 + 151}
+
+def test_personal_plan_lists_orgs_and_scopes_commits_to_planned_repos(mocker):
+    mocker.patch.object(plan, 'get_user_events', return_value=([], None))
+    mocker.patch.object(plan, 'active_branches_from_events', return_value={'bob/site': {'main'}})
+    # The user's commits anywhere, far more than in the planned repos
+    mocker.patch.object(plan, 'get_search_commit_count', return_value=5000)
+    listed = {'acme': [{'full_name': 'acme/a', 'pushed_at': '2099-01-01T00:00:00Z'}],
+              'globex': [{'full_name': 'globex/g', 'pushed_at': '2099-01-01T00:00:00Z'}]}
+    mocker.patch.object(plan, 'get_org_repos', side_effect=lambda org, limit=None: listed[org])
+    counts = mocker.patch.object(plan, 'count_listing', return_value=4)
+
+    root = build_plan(_args(personal=False), 'bob', False, date.today(), date.today(), ['acme', 'globex'], RepoFilter())
+
+    discovery = root.children[0]
+    assert [node.label for node in discovery.children] == ["Events API", "Org repo list: acme", "Org repo list: globex"]
+    # bob/site is out of scope (no --personal): only the two org repos are planned
+    assert counts.call_count == 2
+    assert all('author=bob' in call.args[0] for call in counts.call_args_list)
+    stats = next(node for node in root.children if node.label == "Commit stats")
+    assert stats.requests == {"core": 8}
+    assert "2 of 2 planned repos probed" in stats.detail
+
+def test_personal_plan_labels_the_search_fallback_as_an_upper_bound(mocker):
+    mocker.patch.object(plan, 'get_user_events', return_value=([], None))
+    mocker.patch.object(plan, 'active_branches_from_events', return_value={'me/site': {'main'}})
+    mocker.patch.object(plan, 'get_search_commit_count', return_value=50)
+    mocker.patch.object(plan, 'count_listing', return_value=None)
+
+    root = build_plan(_args(), 'me', True, date.today(), date.today(), [], RepoFilter())
+
+    stats = next(node for node in root.children if node.label == "Commit stats")
+    assert "upper bound from search" in stats.detail
+
+def test_format_plan_reports_rate_limit_fit():
+    root = PlanNode("plan", jobs=1)
+    root.add("Commit stats", {"core": 6000})
+    text = format_plan(root, 4, {"core": (5000, 5000, 0)})
+    assert "Total: ~6000 requests (6000 core)" in text
+    assert "exceeds by 1000" in text
+    assert "at a fixed --jobs 4" in text
+
+def test_format_plan_states_concurrency_growth():
+    root = PlanNode("plan")
+    root.add("Commit stats", {"core": 100})
+    text = format_plan(root, 4, max_jobs=8)
+    assert "~10s at --jobs 4, ~5s if concurrency grows to --max-jobs 8" in text
@@ -0,0 +1,83 @@
+from gh_stats import api
+from gh_stats.ratelimit import AdaptiveLimiter
+from gh_stats.singleflight import SingleFlight
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def complete(limiter, count, latency=0.1, healthy=True):
+    for _ in range(count):
+        limiter.acquire()
+        limiter.release(latency, healthy)
+
+def test_limit_grows_by_one_per_healthy_window():
+    limiter = AdaptiveLimiter(2, 4, clock=FakeClock())
+
+    complete(limiter, 2)
+    assert limiter.limit == 3
+    complete(limiter, 3)
+    assert limiter.limit == 4
+    # Never above the maximum
+    complete(limiter, 20)
+    assert limiter.limit == limiter.peak == 4
+
+def test_throttle_halves_once_per_window_and_pauses():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(8, 8, clock=clock)
+
+    for _ in range(3):
+        limiter.acquire()
+    # The requests in flight are throttled together: one cut
+    for _ in range(3):
+        limiter.throttle(30)
+    assert limiter.limit == 4
+    assert limiter.throttled == 3
+
+    # New requests wait out the Retry-After pause; the next cut needs a full window
+    clock.now = 30
+    complete(limiter, 1, healthy=False)
+    assert limiter.limit == 4
+    complete(limiter, 1, healthy=False)
+    assert limiter.limit == 2
+
+def test_sustained_latency_spike_cuts_the_limit():
+    limiter = AdaptiveLimiter(16, 16, clock=FakeClock())
+    complete(limiter, 10, latency=0.2)
+
+    complete(limiter, 1, latency=0.5)
+    assert limiter.limit == 16
+    # A single slow answer (e.g. a huge commit) is not overload
+    complete(limiter, 1, latency=2.0)
+    complete(limiter, 1, latency=0.2)
+    complete(limiter, 2, latency=2.0)
+    assert limiter.limit == 16
+    complete(limiter, 1, latency=2.0)
+    assert limiter.limit == 8
+
+def test_secondary_rate_limit_is_retried_after_retry_after(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    limiter = AdaptiveLimiter(4, 4)
+    mocker.patch.object(api, '_limiter', limiter)
+    throttled = mocker.Mock(returncode=1, stdout='HTTP/2.0 403 Forbidden\nRetry-After: 0\n\n'
+                                                  '{"message": "You have exceeded a secondary rate limit."}')
+    ok = mocker.Mock(returncode=0, stdout='HTTP/2.0 200 OK\nContent-Type: application/json\n\n{"login": "me"}')
+    run = mocker.patch('gh_stats.api.subprocess.run', side_effect=[throttled, ok])
+
+    assert api.run_gh_cmd(['api', 'user']) == {'login': 'me'}
+    assert run.call_count == 2
+    assert run.call_args[0][0][:3] == ['gh', 'api', '-i']
+    assert limiter.throttled == 1
+    assert limiter.limit == 2
+
+def test_errors_are_not_retried(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    mocker.patch.object(api, '_limiter', AdaptiveLimiter(4, 4))
+    run = mocker.patch('gh_stats.api.subprocess.run', return_value=mocker.Mock(
+        returncode=1, stdout='HTTP/2.0 404 Not Found\n\n{"message": "Not Found"}'))
+
+    assert api.run_gh_cmd(['api', 'repos/acme/gone']) is None
+    assert run.call_count == 1
@@ -0,0 +1,64 @@
+import datetime
+import threading
+from gh_stats import scanner
+from gh_stats.schedule import ScanHistory, estimate_cost
+
+def test_history_round_trip(tmp_path):
+    history = ScanHistory(str(tmp_path))
+    history.record('acme/big', 300, 30)
+    history.save()
+
+    reloaded = ScanHistory(str(tmp_path))
+    assert reloaded.estimate('acme/big', 60) == 600
+    assert reloaded.estimate('acme/new', 60) is None
+
+def test_history_ranks_before_size(tmp_path):
+    history = ScanHistory(str(tmp_path))
+    history.record('acme/busy', 50, 10)
+    assert estimate_cost('acme/busy', 10, history, size=10) > estimate_cost('acme/huge', 10, history, size=90000)
+    assert estimate_cost('acme/huge', 10, history, size=90000) > estimate_cost('acme/tiny', 10, history, size=5)
+
+def test_history_keeps_scopes_apart(tmp_path):
+    history = ScanHistory(str(tmp_path))
+    history.record('acme/api', 300, 30, 'team')
+    history.record('acme/api', 3, 30, 'user=alice paths=docs/')
+
+    assert history.estimate('acme/api', 30, 'team') == 300
+    assert history.estimate('acme/api', 30, 'user=alice paths=docs/') == 3
+    assert history.estimate('acme/api', 30, 'user=alice') is None
+
+def test_scan_scope_names_mode_authors_and_paths():
+    from gh_stats.filters import AuthorFilter, PathScope
+    team = scanner.TeamScan(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31),
+                            author_filter=AuthorFilter(include=['Bob', 'alice'], exclude_bots=True))
+    personal = scanner.RepoScan('Alice', datetime.date(2024, 1, 1), datetime.date(2024, 1, 31),
+                                path_scope=PathScope(['docs/']))
+
+    assert team.history_scope('acme/api') == 'team authors=alice,bob no-bots'
+    assert personal.history_scope('acme/api') == 'user=alice paths=docs'
+
+def test_longest_first_lists_costliest_repos_first(mocker, tmp_path):
+    mocker.patch.object(scanner, 'print_progress')
+    mocker.patch.object(scanner, 'print_progress_done')
+    history = ScanHistory(str(tmp_path))
+    history.record('acme/busy', 400, 31, 'team')
+    listed = []
+    lock = threading.Lock()
+
+    def list_commits(repo, *args, **kwargs):
+        with lock:
+            listed.append(repo)
+        return [{'sha': repo, 'commit': {'author': {'date': '2024-01-02T00:00:00Z'}}}] if repo == 'acme/busy' else []
+
+    mocker.patch('gh_stats.api.get_repo_all_commits', side_effect=list_commits)
+    mocker.patch.object(scanner, 'get_commit_diffstat', return_value=(1, 0, [('a.py', 1, 0)]))
+
+    scanner.scan_org_team_stats(
+        [('acme/tiny', 'tiny'), ('acme/large', 'large'), ('acme/busy', 'busy')],
+        datetime.date(2024, 1, 1), datetime.date(2024, 1, 31),
+        jobs=1, history=history, repo_sizes={'acme/tiny': 10, 'acme/large': 5000, 'acme/busy': 20},
+    )
+
+    assert listed == ['acme/busy', 'acme/large', 'acme/tiny']
+    # This run's listings are recorded for the next one
+    assert ScanHistory(str(tmp_path)).estimate('acme/large', 31, 'team') == 0
@@ -0,0 +1,90 @@
+import re
+from datetime import date
+import pytest
+from gh_stats.api import search_user_commits
+from gh_stats.ratelimit import RateBudget
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def test_rate_budget_bursts_then_spaces_requests():
+    clock = FakeClock()
+    budget = RateBudget(30, 60, clock=clock, sleep=clock.sleep)
+
+    for _ in range(31):
+        budget.acquire()
+
+    # 30 requests go out at once, the 31st waits for one token (2s)
+    assert clock.sleeps == [pytest.approx(2.0)]
+
+@pytest.fixture
+def mock_run_cmd(mocker):
+    return mocker.patch('gh_stats.api.run_gh_cmd')
+
+def test_search_bisects_windows_over_the_cap(mock_run_cmd):
+    """
+    Scenario: the full range has 1,500 hits; each half fits under the 1,000 cap.
+    """
+    windows = []
+
+    def run(args, silent=False):
+        url = args[-1]
+        since, until = re.search(r'committer-date:([^.]+)\.\.([^&+]+)', url).groups()
+        page = int(re.search(r'&page=(\d+)', url).group(1))
+        windows.append((since, until))
+        if len(windows) == 1:
+            return {'total_count': 1500, 'items': [{'repository': {'full_name': 'user/top'}}]}
+        return {'total_count': 150, 'items': [{'repository': {'full_name': f'user/{since[:10]}-p{page}'}}]}
+
+    mock_run_cmd.side_effect = run
+    budget = RateBudget(1000)
+
+    repos = search_user_commits('user', date(2024, 1, 1), date(2024, 1, 31), budget=budget)
+
+    # 1 full-range query + 2 halves x 2 pages
+    assert mock_run_cmd.call_count == 5
+    assert len(repos) == 5
+    halves = sorted(set(windows[1:]))
+    assert halves[0][0] == windows[0][0] and halves[1][1] == windows[0][1]
+
+def _item(sha, repo):
+    return {'sha': sha, 'repository': {'full_name': repo}, 'commit': {'author': {'date': '2024-01-02T00:00:00Z'}}}
+
+def test_search_collects_hits_as_commit_lists(mock_run_cmd):
+    mock_run_cmd.return_value = {'total_count': 2, 'items': [_item('a', 'user/one'), _item('b', 'user/two')]}
+    hits = {}
+
+    repos = search_user_commits('user', date(2024, 1, 1), date(2024, 1, 31), budget=RateBudget(1000), hits=hits)
+
+    assert repos == {'user/one', 'user/two'}
+    assert [c['sha'] for c in hits['user/one']['commits']] == ['a']
+    assert hits['user/one']['complete'] and hits['user/two']['complete']
+
+def test_scanner_uses_complete_search_hits(mocker):
+    from gh_stats import scanner
+    mocker.patch.object(scanner, 'print_progress')
+    mocker.patch.object(scanner, 'print_progress_done')
+    list_commits = mocker.patch.object(scanner, 'get_repo_commits', return_value=[])
+    mocker.patch.object(scanner, 'get_commit_diffstat', return_value=(3, 1, []))
+    hits = {
+        'user/one': {'commits': [_item('a', 'user/one')], 'complete': True},
+        'user/two': {'commits': [_item('b', 'user/two')], 'complete': False},
+    }
+
+    stats, _ = scanner.scan_repositories(
+        [('user/one', 'one'), ('user/two', 'two')], {}, 'user',
+        date(2024, 1, 1), date(2024, 1, 31), search_hits=hits,
+    )
+
+    assert stats['user/one']['commits'] == 1
+    # Only the repo with incomplete hits is listed again
+    assert [call[0][0] for call in list_commits.call_args_list] == ['user/two']
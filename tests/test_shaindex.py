@@ -0,0 +1,104 @@
+import datetime
+import time
+import pytest
+from gh_stats import scanner
+from gh_stats.shaindex import ShaIndex
+
+REPO_INFO = {
+    'acme/tool': {'fork': False},
+    'alice/tool': {'fork': True, 'parent': {'full_name': 'acme/tool'}, 'source': {'full_name': 'acme/tool'}},
+    'alice/mirror': {'fork': False},
+}
+
+def _index(policy='prefer-upstream', username='alice'):
+    return ShaIndex(policy, username=username, repo_info=lambda repo: REPO_INFO.get(repo, {}))
+
+def _commit(sha):
+    return {'sha': sha, 'commit': {'author': {'date': '2024-01-02T00:00:00Z'}}}
+
+def test_prefer_upstream_attributes_to_parent():
+    index = _index()
+    index.add('alice/tool', [_commit('a'), _commit('b')])
+    index.add('acme/tool', [_commit('a')])
+
+    assert index.shared_count == 1
+    assert index.owner('a') == 'acme/tool'
+    assert not index.counts_in('alice/tool', 'a')
+    # Commits only in the fork still count there
+    assert index.counts_in('alice/tool', 'b')
+
+def test_prefer_org_attributes_away_from_personal_repo():
+    index = _index('prefer-org')
+    index.add('alice/mirror', [_commit('a')])
+    index.add('acme/tool', [_commit('a')])
+    assert index.owner('a') == 'acme/tool'
+
+def test_count_both_counts_everywhere():
+    index = _index('count-both')
+    index.add('alice/tool', [_commit('a')])
+    index.add('acme/tool', [_commit('a')])
+    assert index.counts_in('alice/tool', 'a') and index.counts_in('acme/tool', 'a')
+
+def test_unshared_commits_skip_metadata_lookups():
+    lookups = []
+    index = ShaIndex(repo_info=lambda repo: lookups.append(repo) or {})
+    index.add('acme/tool', [_commit('a')])
+    index.add('acme/other', [_commit('b')])
+    assert index.counts_in('acme/tool', 'a') and index.counts_in('acme/other', 'b')
+    assert lookups == []
+
+@pytest.mark.parametrize('policy, expected', [
+    ('prefer-upstream', {'acme/tool': 1, 'alice/tool': 0}),
+    ('count-both', {'acme/tool': 1, 'alice/tool': 1}),
+])
+def test_scan_fetches_shared_commit_once(mocker, policy, expected):
+    mocker.patch.object(scanner, 'print_progress')
+    mocker.patch.object(scanner, 'print_progress_done')
+    mocker.patch.object(scanner, 'get_repo_commits', return_value=[_commit('a')])
+    fetch = mocker.patch.object(scanner, 'get_commit_diffstat', return_value=(5, 1, [('src/x.py', 5, 1)]))
+
+    stats, _ = scanner.scan_repositories(
+        [('alice/tool', 'tool'), ('acme/tool', 'tool')], {}, 'alice',
+        datetime.date(2024, 1, 1), datetime.date(2024, 1, 31),
+        sha_index=_index(policy),
+    )
+
+    assert fetch.call_count == 1
+    assert {repo: stats[repo]['commits'] for repo in expected} == expected
+
+def test_diffstat_is_dropped_once_every_listing_repo_has_it():
+    index = _index()
+    index.add('alice/tool', [_commit('a')])
+    index.add('acme/tool', [_commit('a')])
+    fetch = lambda: (1, 0, [('x.py', 1, 0)])
+
+    index.diffstat('a', fetch)
+    assert index.retained == 1
+    assert index.fetched_diffstat('a') == (1, 0, [('x.py', 1, 0)])
+    assert index.retained == 0
+
+def test_commit_counted_before_its_upstream_is_listed_moves_there(mocker):
+    mocker.patch.object(scanner, 'print_progress')
+    mocker.patch.object(scanner, 'print_progress_done')
+    index = _index()
+
+    def list_commits(repo, *args, **kwargs):
+        if repo == 'acme/tool':
+            # List the upstream only after the fork has counted the commit
+            deadline = time.monotonic() + 1
+            while index.claimed('a') is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+        return [_commit('a')]
+
+    mocker.patch.object(scanner, 'get_repo_commits', side_effect=list_commits)
+    mocker.patch.object(scanner, 'get_commit_diffstat', return_value=(5, 1, [('src/x.py', 5, 1)]))
+
+    scan = scanner.RepoScan('alice', datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), sha_index=index, jobs=2)
+    scan.submit('alice/tool', 'tool')
+    scan.submit('acme/tool', 'tool')
+    stats, repos_with_commits = scan.finish()
+
+    assert index.claimed('a') == 'alice/tool'
+    assert repos_with_commits == 1
+    assert {repo: (s['commits'], s['added']) for repo, s in stats.items()} == {'acme/tool': (1, 5)}
+    assert stats['acme/tool']['breakdown'].languages
@@ -0,0 +1,75 @@
+import threading
+import time
+from gh_stats import api
+from gh_stats.singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait()
+        return "payload"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", fetch))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(1)
+
+    assert calls == [1]
+    assert results == ["payload"] * 5
+    assert flight.calls == 1 and flight.coalesced == 4
+
+def test_results_are_memoized_but_failures_are_not():
+    flight = SingleFlight()
+    assert flight.do("ok", lambda: "x") == "x"
+    assert flight.do("ok", lambda: "y") == "x"
+    assert flight.do("fail", lambda: None) is None
+    assert flight.do("fail", lambda: "retried") == "retried"
+    assert flight.do("volatile", lambda: 1, memoize=False) == 1
+    assert flight.do("volatile", lambda: 2, memoize=False) == 2
+    assert flight.memo_hits == 1
+
+def test_memo_drops_least_recently_used_results():
+    flight = SingleFlight(capacity=10, sizeof=len)
+    flight.do("a", lambda: "aaaa")
+    flight.do("b", lambda: "bbbb")
+    flight.do("a", lambda: "new")  # a is now the most recently used
+    flight.do("c", lambda: "cccc")
+    flight.do("huge", lambda: "x" * 11)
+
+    assert flight.peek("a") == "aaaa"
+    assert flight.peek("b") is None
+    assert flight.peek("c") == "cccc"
+    assert flight.peek("huge") is None
+
+def test_run_gh_cmd_memoizes_identical_requests(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    run = mocker.patch('gh_stats.api.subprocess.run', return_value=mocker.Mock(stdout='{"login": "me"}', returncode=0))
+
+    first = api.run_gh_cmd(['api', 'user'])
+    first['login'] = 'changed'
+    assert api.run_gh_cmd(['api', 'user']) == {'login': 'me'}
+    assert run.call_count == 1
+
+    # Commit details and rate limits are not kept for the run
+    api.run_gh_cmd(['api', 'repos/acme/tool/commits/0123abcd'])
+    api.run_gh_cmd(['api', 'repos/acme/tool/commits/0123abcd'])
+    api.run_gh_cmd(['api', 'rate_limit'])
+    api.run_gh_cmd(['api', 'rate_limit'])
+    assert run.call_count == 5
+    assert api.get_request_stats() == (5, 1)
+
+    # Nor are commit listing, compare and search pages, which are read once
+    for endpoint in ('repos/acme/tool/commits?since=2024-01-01T00:00:00Z&per_page=100&page=1',
+                     'repos/acme/tool/compare/main...dev?per_page=100&page=1',
+                     'search/commits?q=author:me&per_page=100&page=1'):
+        api.run_gh_cmd(['api', endpoint])
+        api.run_gh_cmd(['api', endpoint])
+    assert run.call_count == 11
@@ -0,0 +1,132 @@
+from gh_stats import api
+from gh_stats.ratelimit import AdaptiveLimiter
+from gh_stats.singleflight import SingleFlight
+from gh_stats.tokens import TokenPool, load_tokens, parse_tokens
+
+def response(status, body='{}', **headers):
+    head = [f'HTTP/2.0 {status}'] + [f"{name.replace('_', '-')}: {value}" for name, value in headers.items()]
+    return '\n'.join(head) + '\n\n' + body
+
+def test_parse_tokens_skips_comments_and_duplicates(tmp_path, monkeypatch):
+    assert parse_tokens("# ci tokens\nghp_a\nghp_b, ghp_c\n\nghp_a\n") == ['ghp_a', 'ghp_b', 'ghp_c']
+
+    token_file = tmp_path / 'tokens'
+    token_file.write_text("ghp_file\n", encoding='utf-8')
+    monkeypatch.setenv('GH_STATS_TOKENS', 'ghp_env1,ghp_env2')
+    assert load_tokens(str(token_file)) == ['ghp_file']
+    assert load_tokens() == ['ghp_env1', 'ghp_env2']
+
+def test_pool_routes_to_the_token_with_most_budget():
+    pool = TokenPool(['a', 'b'], clock=lambda: 1000)
+    first, second = pool.tokens
+    pool.update(first, {'x-ratelimit-resource': 'core', 'x-ratelimit-remaining': '10', 'x-ratelimit-reset': '4600'})
+    pool.update(second, {'x-ratelimit-resource': 'core', 'x-ratelimit-remaining': '4000', 'x-ratelimit-reset': '4600'})
+
+    assert pool.choose('core') is second
+    # Search budgets are tracked separately
+    pool.update(second, {'x-ratelimit-resource': 'search', 'x-ratelimit-remaining': '0', 'x-ratelimit-reset': '1060'})
+    assert pool.choose('search') is first
+    # Identity requests stay on the first token
+    assert pool.choose('core', identity=True) is first
+
+def test_exhausted_token_is_full_again_after_reset():
+    now = [1000]
+    pool = TokenPool(['a', 'b'], clock=lambda: now[0])
+    first, second = pool.tokens
+    pool.update(first, {'x-ratelimit-resource': 'core', 'x-ratelimit-remaining': '0', 'x-ratelimit-reset': '2000'})
+    pool.update(second, {'x-ratelimit-resource': 'core', 'x-ratelimit-remaining': '5', 'x-ratelimit-reset': '4600'})
+    assert pool.choose('core') is second
+
+    now[0] = 2000
+    assert pool.choose('core') is first
+
+def test_request_without_access_falls_over_to_the_next_token(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    mocker.patch.object(api, '_limiter', AdaptiveLimiter(4, 4))
+    mocker.patch.object(api, '_tokens', TokenPool(['public', 'private']))
+    seen = []
+
+    def run(cmd, capture_output, encoding, env):
+        seen.append(env['GH_TOKEN'])
+        if env['GH_TOKEN'] == 'public':
+            return mocker.Mock(returncode=1, stdout=response(404, '{"message": "Not Found"}'))
+        return mocker.Mock(returncode=0, stdout=response(200, '{"full_name": "acme/secret"}'))
+
+    mocker.patch('gh_stats.api.subprocess.run', side_effect=run)
+
+    assert api.run_gh_cmd(['api', 'repos/acme/secret']) == {'full_name': 'acme/secret'}
+    assert api.run_gh_cmd(['api', 'repos/acme/secret/commits?per_page=100']) is not None
+    # The first token is not tried again for the repo
+    assert seen == ['public', 'private', 'private']
+
+def test_private_repo_commits_fall_over_without_a_prior_repo_request(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    mocker.patch.object(api, '_limiter', AdaptiveLimiter(4, 4))
+    pool = TokenPool(['public', 'private'])
+    mocker.patch.object(api, '_tokens', pool)
+    seen = []
+
+    def run(cmd, capture_output, encoding, env):
+        seen.append((env['GH_TOKEN'], cmd[-1]))
+        if env['GH_TOKEN'] == 'public':
+            return mocker.Mock(returncode=1, stdout=response(404, '{"message": "Not Found"}'))
+        return mocker.Mock(returncode=0, stdout=response(200, '[{"sha": "a1"}]'))
+
+    mocker.patch('gh_stats.api.subprocess.run', side_effect=run)
+
+    assert api.run_gh_cmd(['api', 'repos/acme/secret/commits?per_page=100']) == [{'sha': 'a1'}]
+    # The 404 is checked against the repo itself, which the first token cannot see either
+    assert seen == [('public', 'repos/acme/secret/commits?per_page=100'), ('public', 'repos/acme/secret'),
+                    ('private', 'repos/acme/secret/commits?per_page=100')]
+    assert 'acme/secret' in pool.tokens[0].denied
+
+def test_missing_file_in_a_repo_keeps_the_token(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    mocker.patch.object(api, '_limiter', AdaptiveLimiter(4, 4))
+    pool = TokenPool(['a', 'b'])
+    mocker.patch.object(api, '_tokens', pool)
+    seen = []
+
+    def run(cmd, capture_output, encoding, env):
+        seen.append((env['GH_TOKEN'], cmd[-1]))
+        if cmd[-1] == 'repos/acme/app':
+            return mocker.Mock(returncode=0, stdout=response(200, '{"full_name": "acme/app"}'))
+        return mocker.Mock(returncode=1, stdout=response(404, '{"message": "Not Found"}'))
+
+    mocker.patch('gh_stats.api.subprocess.run', side_effect=run)
+
+    assert api.run_gh_cmd(['api', 'repos/acme/app/contents/.gitattributes']) is None
+    assert api.run_gh_cmd(['api', 'repos/acme/app/contents/.mailmap']) is None
+    # The token sees the repo, so a 404 inside it is an answer: no other token is
+    # tried, none is denied, and each token checks the repo at most once
+    assert [path for _, path in seen].count('repos/acme/app/contents/.gitattributes') == 1
+    assert [path for _, path in seen].count('repos/acme/app/contents/.mailmap') == 1
+    assert len(seen) == len(set(seen))
+    assert all(not token.denied for token in pool.tokens)
+
+def test_refused_token_is_denied_only_when_the_repo_probe_fails(mocker):
+    mocker.patch.object(api, '_requests', SingleFlight())
+    mocker.patch.object(api, '_limiter', AdaptiveLimiter(4, 4))
+    pool = TokenPool(['sso', 'ok'])
+    mocker.patch.object(api, '_tokens', pool)
+    seen = []
+
+    def run(cmd, capture_output, encoding, env):
+        seen.append((env['GH_TOKEN'], cmd[-1]))
+        if env['GH_TOKEN'] == 'sso' and cmd[-1] != 'repos/acme/app':
+            return mocker.Mock(returncode=1, stdout=response(403, '{"message": "Resource protected"}'))
+        return mocker.Mock(returncode=0, stdout=response(200, '[]'))
+
+    mocker.patch('gh_stats.api.subprocess.run', side_effect=run)
+
+    assert api.run_gh_cmd(['api', 'repos/acme/app/branches']) == []
+    # The token still sees the repo, so it is not kept off it
+    assert seen == [('sso', 'repos/acme/app/branches'), ('sso', 'repos/acme/app'), ('ok', 'repos/acme/app/branches')]
+    assert not pool.tokens[0].denied
+
+def test_rate_limits_are_summed_over_the_pool(mocker):
+    mocker.patch.object(api, '_tokens', TokenPool(['a', 'b']))
+    payload = '{"resources": {"core": {"remaining": 100, "limit": 5000, "reset": 1700}}}'
+    mocker.patch('gh_stats.api.subprocess.run', return_value=mocker.Mock(returncode=0, stdout=response(200, payload)))
+
+    assert api.get_rate_limits() == {'core': (200, 10000, 1700)}
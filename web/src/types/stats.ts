@@ -26,6 +26,21 @@ export interface StatsData {
   highlights?: Highlights;
   portrait?: Portrait;
   arena?: ArenaEntry[];
+  languages?: LanguageStats[];
+  paths?: PathNode[];
+}
+
+export interface LanguageStats {
+  name: string;
+  added: number;
+  deleted: number;
+}
+
+export interface PathNode {
+  path: string;
+  added: number;
+  deleted: number;
+  children?: PathNode[];
 }
 
 export interface RepoStats {